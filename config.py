@@ -15,6 +15,7 @@ from src.utils.load_settings import (load_settings,
                                  load_folder_map,
                                  load_paths,
                                  load_spreadsheet_specs)
+from src.managers.identity_store import IdentityStore
 
 
 # Globals Class
@@ -23,7 +24,7 @@ class Globals:
     def __init__(self):
         """Initialize settings from load_settings"""
         self.refresh_globals()
-        self.observers = {}
+        self.watcher = None  # Shared WatcherService, see src/utils/observers.py
 
         # Current Version
         self.current_version = __version__
@@ -47,11 +48,20 @@ class Globals:
         self.splitter = None
         self.preview_pane = None
         self.pdf_viewer = None
+        self.thumbnailer = None  # Mailbox ThumbnailCache, see qt_thumbnails.py
+        self.print_queue = None  # Shared PrintQueue, see src/managers/print_queue.py
+        self.print_signaler = None
+        self.printers = []  # Last discovered printers, see cached_printers()
+        self.printers_updated_at = 0.0
+        self.printer_discovery = None
+        self.printer_listeners = []  # Callbacks taking the new printer list
+        self.print_status = None
         self.github_check_checkbox = None
         self.beta_checkbox = None
         self.window_checkbox = None
         self.printer_combo = None  # The combobox that stores the printer value
         self.legacy_checkbox = None
+        self.merge_print_checkbox = None
         self.logging_level_box = None
         self.inbox_entry_box = None
         self.archive_entry_box = None
@@ -80,7 +90,7 @@ class Globals:
         self.refresh_send_buttons = None
         self.process_buttons_frame = None
         self.title = None
-        self.file_identity = {}
+        self.file_identity = IdentityStore()  # filename -> identity, written back lazily
         self.theme_dict = None
         self.theme_path = None
         self.inbox_button = None
@@ -205,6 +215,7 @@ class Globals:
         self.saved_x = settings.get("saved_x", -1)
         self.saved_y = settings.get("saved_y", -1)
         self.default_printer = settings.get("default_printer", "")
+        self.merge_print_jobs = settings.get("merge_print_jobs", False)
         self.github_check = settings.get("github_check", False)
         self.beta = settings.get("beta", False)
         self.dynamic_window_size = settings.get("dynamic_window_size", True)
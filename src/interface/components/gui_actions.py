@@ -5,6 +5,7 @@ from tkinter import messagebox
 from src.managers.autoname.pdfsearch import apply_auto_naming
 from src.managers.data_processing import parse_invoices, parse_credit_cards
 from src.managers.file_management import archive_files
+from src.managers.identity_store import IdentityStore
 from src.managers.import_export import export_history, import_history
 from src.utils.save_settings import save_metadata
 from src.utils.toast import show_toast
@@ -36,7 +37,16 @@ def pdf_button(globals, companies=None, directory=None, file_list=None):
     logging.debug(f"Attempting to auto-name files: {file_list}")
 
     search_dir = os.path.normpath(directory or globals.sources['inbox'])
-    changes = apply_auto_naming(globals, search_dir, file_list)
+
+    # Keep thumbnail rendering out of the way while auto-name reads the files
+    thumbnailer = getattr(globals, 'thumbnailer', None)
+    if thumbnailer:
+        thumbnailer.pause()
+    try:
+        changes = apply_auto_naming(globals, search_dir, file_list)
+    finally:
+        if thumbnailer:
+            thumbnailer.resume()
 
     if changes == 0:
         if not globals.legacy_mode:
@@ -105,9 +115,13 @@ def smart_spreadsheet_button(globals, file_list=None):
     purchases = []
     unknown = []
 
+    # Files the background identity load hasn't reached yet are read now
+    identities = (globals.file_identity.identities([os.path.basename(path) for path in file_list])
+                  if isinstance(globals.file_identity, IdentityStore) else globals.file_identity)
+
     for full_path in file_list:
         filename = os.path.basename(full_path)
-        file_type = globals.file_identity.get(filename, "Invoice")  # default to Invoice if untagged
+        file_type = identities.get(filename, "Invoice")  # default to Invoice if untagged
 
         if file_type == "Invoice":
             invoices.append(full_path)
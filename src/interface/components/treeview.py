@@ -1,7 +1,7 @@
 # Interface/Components/treeview.py
 import os
 import logging
-from pypdf import PdfReader
+from src.managers.identity_store import IdentityStore, DEFAULT_IDENTITY
 import customtkinter as ctk
 if not hasattr(ctk, "CTkScrollableFrame"):
     logging.critical(f"CTkScrollableFrame missing.")
@@ -22,8 +22,8 @@ class Treeview:
             self.get_dir = get_dir
         else:
             self.get_dir = lambda: str(get_dir)
-        if not hasattr(self.globals, "file_identity"):
-            self.globals.file_identity = {}
+        if not isinstance(getattr(self.globals, "file_identity", None), IdentityStore):
+            self.globals.file_identity = IdentityStore()
         self._build_ui()
 
     def _build_ui(self):
@@ -49,6 +49,7 @@ class Treeview:
         else:
             logging.info(f"Inbox folder not found.")
             return
+        self.globals.file_identity.load(folder_path, files)
 
         for idx, file in enumerate(files):
             row = ctk.CTkFrame(self.selection_frame,
@@ -62,12 +63,9 @@ class Treeview:
             icons = [self.globals.invoice_icon, self.globals.card_icon, self.globals.po_icon]
             types = ["Invoice", "Card", "Purchase"]
 
-            full_path = os.path.join(self.get_dir(), file)
-            saved_type = self._load_identity(full_path)
-
+            saved_type = self.globals.file_identity.get(file, DEFAULT_IDENTITY)
             if saved_type in types:
                 identity_state["cycle"] = types.index(saved_type)
-            self.globals.file_identity[file] = saved_type
 
             identity = ctk.CTkButton(
                 row,
@@ -129,26 +127,6 @@ class Treeview:
                 l=label,
                 f=file: self._start_rename(e, l, f, folder_path))
 
-    def _load_identity(self, filepath):
-        """Read the Identity metadata from a PDF using pypdf.
-        Returns 'Invoice' if missing."""
-        try:
-            reader = PdfReader(filepath)
-            if reader.metadata:
-                # Try our custom field first
-                identity = reader.metadata.get("/Identity")
-                if identity:
-                    return str(identity)
-                # Fallback to Subject if we used that
-                subject = reader.metadata.get("/Subject")
-                if subject:
-                    return str(subject)
-            return "Invoice"  # Default
-        except Exception as e:
-            logging.debug(
-                f"Could not read metadata from {os.path.basename(filepath)}: {e}")
-            return "Invoice"
-
     def _cycle_identity(self, state, button, icons, filename):
         state["cycle"] = (state["cycle"] + 1) % len(icons)
         new_icon = icons[state["cycle"]]
@@ -223,6 +201,8 @@ class Treeview:
                         self._rows[i] = (row, new_name)
                         break
 
+                self.globals.file_identity.rename(filename, new_name)
+
                 # Update selected set if this file was selected
                 if filename in self._selected:
                     self._selected.remove(filename)
@@ -306,6 +286,7 @@ class Treeview:
                 os.path.join(folder_path, f)) and f.lower().endswith('.pdf')]
         if extension:
             files = [f for f in files if f.lower().endswith(extension)]
+        self.globals.file_identity.load(folder_path, files)
 
         for idx, file in enumerate(files):
             row = ctk.CTkFrame(
@@ -318,12 +299,9 @@ class Treeview:
             icons = [self.globals.invoice_icon, self.globals.card_icon, self.globals.po_icon]
             types = ["Invoice", "Card", "Purchase"]
 
-            full_path = os.path.join(self.get_dir(), file)
-            saved_type = self._load_identity(full_path)
-
+            saved_type = self.globals.file_identity.get(file, DEFAULT_IDENTITY)
             if saved_type in types:
                 identity_state["cycle"] = types.index(saved_type)
-            self.globals.file_identity[file] = saved_type
 
             identity = ctk.CTkButton(
                 row,
@@ -111,9 +111,8 @@ def create_interface(globals):
                 globals.root.update_idletasks()
 
         globals.update_file_counts = update_file_counts
-        globals.observers = {}
         if globals.inbox:
-            globals.observers['inbox'] = setup_observer(
+            setup_observer(
                 globals,
                 globals.inbox,
                 key='inbox')
@@ -2,7 +2,7 @@
 from tkinter import messagebox
 import customtkinter as ctk
 from src.utils.save_settings import save_all_settings
-from src.managers.printers import query_printers
+from src.managers.printers import cached_printers
 from PySide6.QtWidgets import QMessageBox
 import src.utils.fonts as fonts
 from CTkToolTip import CTkToolTip
@@ -87,11 +87,23 @@ def create_general_settings_tab(globals, settings_tab):
                 text="Printer",
                 font=fonts.heading_font).pack(side="left", padx=(0, 12))
 
-    ctk.CTkComboBox(printer_frame,
-                    variable=globals.default_printer_var,
-                    values=query_printers(),
-                    state="readonly",
-                    width=150).pack(side="left")
+    printer_box = ctk.CTkComboBox(printer_frame,
+                                  variable=globals.default_printer_var,
+                                  values=cached_printers(globals),
+                                  state="readonly",
+                                  width=150)
+    printer_box.pack(side="left")
+
+    def update_printers(printers):
+        printer_box.configure(values=printers)
+
+    def forget_printers(event):
+        if update_printers in globals.printer_listeners:
+            globals.printer_listeners.remove(update_printers)
+
+    # Discovery refills the list in the background; stop once the tab is gone
+    globals.printer_listeners.append(update_printers)
+    printer_box.bind("<Destroy>", forget_printers)
     
     # Version Check
     version_frame = ctk.CTkFrame(settings_tab,
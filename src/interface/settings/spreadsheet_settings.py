@@ -6,6 +6,7 @@ from customtkinter import CTkImage
 import src.utils.fonts as fonts
 from src.utils.save_settings import save_all_settings
 from src.utils.load_settings import load_data_path
+from src.managers.autoname.custom_search import custom_field_names
 from PIL import Image
 import logging
 import subprocess
@@ -31,7 +32,9 @@ def create_spreadsheet_settings_tab(globals, spreadsheet_tab):
         logging.critical(
             f"Could not create scrollable frame: {e} - Using regular CTkFrame instead.")
 
-    components_list = ["Company", "Date", "Invoice #", "Card Number", ""]
+    components_list = ["Company", "Date", "Invoice #", "Card Number",
+                       "Total", "Tax", "Sales Tax", "Terms", "Description",
+                       *custom_field_names(), ""]
 
     # Invoices
     globals.invoice_sheet_label = ctk.CTkLabel(
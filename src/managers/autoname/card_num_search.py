@@ -2,7 +2,144 @@
 import re
 import os
 import logging
-from src.managers.autoname.search_helpers import extract_normalized_text
+from src.managers.autoname.search_helpers import (extract_normalized_text,
+                                              as_masked)
+from src.managers.autoname.pattern_packs import search_with_packs, pack_value
+
+
+# How far past a keyword or mask a trigger may reach
+CARD_WINDOW = 120  # characters
+
+# Card triggers in priority order; the first one whose first match gives
+# 4 digits wins. Each starts at a keyword or mask (see CARD_ANCHORS) and is
+# only tried inside the window after one, so its cost no longer depends
+# on how far the rest of the document runs.
+CARD_TRIGGERS = [
+    # 1. Highest priority: Masked format with x's/* (now tolerates 'j' in last-4)
+    r'(?:c/c#|cc#|visa|mastercard|credit|chip|payment)\s*[:#]?[\s-]*[x*]{8,16}\s*([0-9~olIj]{4})\b',
+
+    # 2. ccard style (unchanged — no need for 'j' here)
+    r'(?:payment|ccard|credit\s*card)\s*[:#]?\s*ccard[o ]?([0-9~ol]{4})\b',
+
+    # 3. visa chip + mask
+    r'(?:uisa|visa|mastercard)\s*chip\s*(x{8,16})\s*([0-9~ol]{4})\b',
+    r'(?:visa|visaj|mastercard|amex|discover)\s*(?:ending\s*in|ending\s*with|last\s*4|xxxx)\s*([0-9ol]{4})\b',
+    r'(?:visa|mastercard|amex|discover)\s*\*{3,}\s*([0-9ol]{4})\b',
+    r'(?:card\s*(?:number|#))\s*[:#]?\s*([0-9ol]{4})\b',
+    r'(?:chip\s*\(visa\)|visa|credit)\s*\*{3,}\s*([0-9ol]{4})\b',
+    r'(?:mastercard|mc|visa|amex|discover|card)\s*[-–—:,]?\s*(\d{4})\b',
+    r'(?:(?:visa|mastercard|amex|discover|card)\s*)?(?:[#*xX]{4}\s*){3}([0-9olIj]{4})\b',
+
+    # 4. Common c/c# or card # + mask (now also tolerates 'j')
+    r'(?:c/c#|cc#|card\s*#?|visa\s*(?:credit)?)\s*[:#]?\s*(?:x{8,16}|\*{8,16}|[x*\.]{8,16})\s*([0-9~olIj]{4})\b',
+
+    # 5. visa nearby + mask (kept strict — no 'j' tolerance to avoid junk)
+    r'(?:visa|mastercard).*?(?:x{8,16}|\*{8,16}|[*x.]{8,16})\s*([0-9ol]{4})\b',
+
+    # 6. Payment keywords + mask (kept strict)
+    r'(?:visa|mastercard|credit|payment|charged?|c/c#).*?(x{8,16}|xxxxxxxxxxxx|\*{8,16})\s*([0-9ol]{4})\b',
+
+    # 7. Loose fallback mask (kept strict — no 'j')
+    r'(?:x{8,16}|\*{8,16}|[*x]{12,16})\s*([0-9ol]{4})\b',
+
+    # 8. Original safety net (kept strict)
+    r'(visa|mastercard)\s*[: ]?\s*(x{8,16}|\*{8,16})\s*([0-9ol]{4})',
+]
+_CARD_TRIGGERS = [re.compile(pattern) for pattern in CARD_TRIGGERS]
+
+# Every position a trigger can start at: a card keyword or the start of a
+# mask. Found with a lookahead so overlapping ones ("card" in "mastercard")
+# are all reported. Keep in sync when adding triggers.
+CARD_ANCHORS = re.compile(r'(?=(?P<keyword>c/c#|cc#|visa|uisa|mastercard|amex|discover|credit|'
+                          r'chip|payment|ccard|card|mc|charge)|(?P<mask>[#*xX]{4}))')
+
+# Triggers that can start at a mask, and the ones that can't start at a keyword
+_MASK_LED = (8, 12)
+_MASK_ONLY = (12,)
+_WORD_TAIL = re.compile(r'\w{0,16}')
+
+
+def _window_end(text, start, limit):
+    """End of the window after start, moved past a word cut in half so \b stays honest."""
+    end = start + CARD_WINDOW
+    if end >= limit:
+        return limit
+    return _WORD_TAIL.match(text, end, limit).end()
+
+
+def find_card_number(text, segments=None):
+    """
+    Finds the last 4 digits of the card a receipt was paid with.
+
+        Keyword and mask positions are found in one pass, then each trigger
+        (in priority order) is matched only at the positions it can start
+        at and only within CARD_WINDOW characters, so the work is linear in
+        the length of the text however many keywords it repeats. A trigger's first
+        match decides for that trigger; if its digits don't validate, the
+        next trigger is tried.
+
+        Arguments:
+            text:       Normalized text
+            segments:   (start, end) ranges to search, ex: the visible parts
+                        of a MaskedText; all of text if None
+
+        Returns (card_number, matched_text, priority) or None
+    """
+    windows = {"keyword": [], "mask": []}
+    for segment_start, segment_end in segments or [(0, len(text))]:
+        for anchor in CARD_ANCHORS.finditer(text, segment_start, segment_end):
+            start = anchor.start()
+            windows[anchor.lastgroup].append((start, _window_end(text, start, segment_end)))
+    if not windows["keyword"] and not windows["mask"]:
+        return None
+    windows["any"] = sorted(windows["keyword"] + windows["mask"])
+
+    for priority, trigger in enumerate(_CARD_TRIGGERS):
+        if priority in _MASK_ONLY:
+            candidates = windows["mask"]
+        else:
+            candidates = windows["any" if priority in _MASK_LED else "keyword"]
+        match = None
+        for start, end in candidates:
+            match = trigger.match(text, start, end)
+            if match:
+                break
+        if not match:
+            continue
+
+        # Capture the "digits" group (last group in most patterns)
+        candidate = card_digits(match.groups()[-1], CARD_TRIGGERS[priority])
+        if candidate:
+            return (candidate, match.group(0), priority)  # First valid wins
+    return None
+
+
+def card_digits(raw, pattern):
+    """Returns the 4 card digits in a captured group after OCR fixes, or None."""
+    candidate = raw.strip().lower()
+    logging.info(
+        f"Pattern matched: {pattern} becomes raw candidate: {candidate}")
+
+    # Fix OCR errors: O to 0, L to 1, I to 1 (add more if needed)
+    candidate = candidate.replace(
+        'o', '0').replace(
+            'l', '1').replace(
+                'i', '1')
+
+    # Validate: Exactly 4 digits now?
+    if re.match(r'^\d{4}$', candidate):
+        return candidate.upper()
+    return None
+
+
+def _builtin_card(text, segments):
+    found = find_card_number(text, segments)
+    return (found[0], found[1], CARD_TRIGGERS[found[2]]) if found else None
+
+
+def _pack_card(match, pattern):
+    candidate = card_digits(pack_value(match), pattern.source)
+    return (candidate, match.group(0), pattern.source) if candidate else None
 
 
 def card_number_search(directory=None, file_list=None, normalized_texts=None):
@@ -17,38 +154,6 @@ def card_number_search(directory=None, file_list=None, normalized_texts=None):
 
     search_dir = directory.strip() if directory else None
 
-    # Patterns
-    triggers = [
-        # 1. Highest priority: Masked format with x's/* (now tolerates 'j' in last-4)
-        r'(?:c/c#|cc#|visa|mastercard|credit|chip|payment)\s*[:#]?[\s-]*[x*]{8,16}\s*([0-9~olIj]{4})\b',
-
-        # 2. ccard style (unchanged — no need for 'j' here)
-        r'(?:payment|ccard|credit\s*card)\s*[:#]?\s*ccard[o ]?([0-9~ol]{4})\b',
-
-        # 3. visa chip + mask
-        r'(?:uisa|visa|mastercard)\s*chip\s*(x{8,16})\s*([0-9~ol]{4})\b',
-        r'(?:visa|visaj|mastercard|amex|discover)\s*(?:ending\s*in|ending\s*with|last\s*4|xxxx)\s*([0-9ol]{4})\b',
-        r'(?:visa|mastercard|amex|discover)\s*\*{3,}\s*([0-9ol]{4})\b',
-        r'(?:card\s*(?:number|#))\s*[:#]?\s*([0-9ol]{4})\b',
-        r'(?:chip\s*\(visa\)|visa|credit)\s*\*{3,}\s*([0-9ol]{4})\b',
-        r'(?:mastercard|mc|visa|amex|discover|card)\s*[-–—:,]?\s*(\d{4})\b',
-        r'(?:visa|mastercard|amex|discover|card)?\s*(?:[#*xX]{4}\s*){3}([0-9olIj]{4})\b',
-
-        # 4. Common c/c# or card # + mask (now also tolerates 'j')
-        r'(?:c/c#|cc#|card\s*#?|visa\s*(?:credit)?)\s*[:#]?\s*(?:x{8,16}|\*{{8,16}|[x*\.]{8,16})\s*([0-9~olIj]{4})\b',
-
-        # 5. visa nearby + mask (kept strict — no 'j' tolerance to avoid junk)
-        r'(?:visa|mastercard).*?(?:x{8,16}|\*{{8,16}|[*x.]{8,16})\s*([0-9ol]{4})\b',
-
-        # 6. Payment keywords + mask (kept strict)
-        r'(?:visa|mastercard|credit|payment|charged?|c/c#).*?(x{8,16}|xxxxxxxxxxxx|\*{{8,16})\s*([0-9ol]{4})\b',
-
-        # 7. Loose fallback mask (kept strict — no 'j')
-        r'(?:x{8,16}|\*{{8,16}|[*x]{12,16})\s*([0-9ol]{4})\b',
-
-        # 8. Original safety net (kept strict)
-        r'(visa|mastercard)\s*[: ]?\s*(x{8,16}|\*{{8,16})\s*([0-9ol]{4})']
-
     try:
         if search_dir and not os.path.isdir(search_dir):
             logging.error(f"Invalid directory: {search_dir}")
@@ -73,36 +178,17 @@ def card_number_search(directory=None, file_list=None, normalized_texts=None):
                     continue
                 normalized = extract_normalized_text(full_path)
 
+            normalized = as_masked(normalized)
             if not normalized:
                 results[filename] = None
                 continue
 
             logging.debug(
-                f"Contains 'visa' or 'mastercard': {'visa' in normalized or 'mastercard' in normalized}")
-
-            card_num = None
-            matched_card = None
-            matched_pattern = None
-            for pattern in triggers:
-                match = re.search(pattern, normalized)
-                if match:
-                    # Capture the "digits" group (last group in most patterns)
-                    candidate = match.groups()[-1].strip().lower()
-                    logging.info(
-                        f"Pattern matched: {pattern} becomes raw candidate: {candidate}")
-
-                    # Fix OCR errors: O to 0, L to 1, I to 1 (add more if needed)
-                    candidate = candidate.replace(
-                        'o', '0').replace(
-                            'l', '1').replace(
-                                'i', '1')
-
-                    # Validate: Exactly 4 digits now?
-                    if re.match(r'^\d{4}$', candidate):
-                        card_num = candidate.upper()
-                        matched_card = match.group(0)
-                        matched_pattern = pattern
-                        break  # First valid wins
+                f"Contains 'visa' or 'mastercard': {'visa' in normalized.text or 'mastercard' in normalized.text}")
+
+            found = search_with_packs("card", normalized.text, normalized.segments(),
+                                      _builtin_card, _pack_card)
+            card_num, matched_card, matched_pattern = found or (None, None, None)
 
             if card_num:
                 logging.info(
@@ -4,7 +4,9 @@ import os
 import re
 from src.utils.load_settings import load_company_map
 from src.managers.autoname.search_helpers import (extract_normalized_text,
-                                              normalize_text)
+                                              normalize_text,
+                                              as_masked,
+                                              segment_search)
 
 
 def company_search(companies=None, directory=None, file_list=None, normalized_texts=None):
@@ -47,6 +49,7 @@ def company_search(companies=None, directory=None, file_list=None, normalized_te
                     continue
                 normalized = extract_normalized_text(full_path)
 
+            normalized = as_masked(normalized)
             if not normalized:
                 results[filename] = None
                 continue
@@ -59,7 +62,8 @@ def company_search(companies=None, directory=None, file_list=None, normalized_te
                     if keyword.lower() in ['llc', 'inc']:
                         continue
                     normalized_keyword = normalize_text(keyword)
-                    match = re.search(rf'\b{re.escape(normalized_keyword)}\b', normalized)
+                    match = segment_search(re.compile(rf'\b{re.escape(normalized_keyword)}\b'),
+                                           normalized.text, normalized.segments())
                     if match:
                         company = comp
                         matched_keyword = match.group(0)
@@ -0,0 +1,396 @@
+# Managers/Autoname/custom_search.py
+import os
+import re
+import time
+import logging
+import threading
+import multiprocessing
+from collections import namedtuple
+from src.utils.load_settings import load_data_path
+from src.managers.autoname.search_helpers import (extract_normalized_text,
+                                              as_masked,
+                                              segment_search,
+                                              parse_amount,
+                                              field_text,
+                                              MONEY)
+from src.managers.autoname.pattern_packs import WatchedJsonFile, compile_pattern, pack_value
+from src.managers.autoname.rule_worker import rule_worker
+
+CUSTOM_FIELDS_FILENAME = "custom_fields.json"
+
+RULE_TIME_BUDGET = 250     # ms a regex rule may run per document, unless it sets timeout_ms
+MAX_TIME_BUDGET = 5000     # ms, the most a rule may ask for
+RULE_TIMEOUT_LIMIT = 2     # timeouts before a rule is skipped for the rest of the batch
+WORKER_START_TIMEOUT = 30  # seconds to wait for the worker process to start
+
+ANCHOR_GAP = 10  # spaces, colons, # and dashes allowed between an anchor and its value
+
+# What an anchor rule captures after its anchor. Built from pieces that
+# can't backtrack badly, so anchor rules run in-process without a budget.
+VALUE_TYPES = {
+    "word": r"([a-z0-9][\w\-/.#]{0,40})",
+    "number": r"(\d[\d\-/.]{0,30})",
+    "amount": MONEY,
+    "date": r"(\d{1,2}[/\-.]\d{1,2}[/\-.]\d{2,4})",
+    "text": r"([\w\-/.&']+(?:\s[\w\-/.&']+){0,5})",
+}
+
+# Names the app already writes as fields or that PDF readers reserve
+RESERVED_NAMES = {"company", "date", "invoicenumber", "cardnumber", "identity",
+                  "total", "tax", "salestax", "terms", "description",
+                  "title", "author", "subject", "keywords", "creator", "producer",
+                  "creationdate", "moddate", "trapped"}
+
+# Names become metadata keys, so they're kept to letters, digits, spaces and dashes
+VALID_NAME = re.compile(r"[A-Za-z][A-Za-z0-9 \-]{0,39}")
+
+# kind is "anchor" or "regex"; timeout is the regex budget in seconds
+CustomField = namedtuple("CustomField", "name kind source regex value_type timeout")
+
+# What a rule found; start/end is the span in the normalized text
+CustomMatch = namedtuple("CustomMatch", "value matched start end")
+
+_fields = None
+_fields_lock = threading.Lock()
+
+
+class CustomFields(WatchedJsonFile):
+    """
+    User-defined fields loaded from custom_fields.json in the config folder.
+
+        Each field has a name, which is what the rename components and
+        metadata use, and one rule:
+
+            Anchor rule:    {"anchor": "po #", "value": "word"} takes the
+                            value of the given type (see VALUE_TYPES) that
+                            follows the anchor phrase
+            Regex rule:     {"pattern": "...", "timeout_ms": 250} takes the
+                            group named value, else the last group, of the
+                            first match; it runs in a worker process so it
+                            can be stopped after its time budget
+
+        Disabled fields and invalid entries are skipped with a warning. The
+        file is reloaded when it changes on disk.
+
+        Arguments:
+            path:       custom_fields.json to load
+    """
+    def names(self):
+        """Returns the enabled field names in file order."""
+        return [field.name for field in self.current()]
+
+    def _parse(self, data):
+        """Validates and compiles the fields into a list of CustomField."""
+        if data is None:
+            return []
+        entries = data["fields"]
+        if not isinstance(entries, list):
+            raise TypeError("'fields' must be a list")
+
+        fields, seen = [], set()
+        for position, entry in enumerate(entries):
+            name = entry.get("name") if isinstance(entry, dict) else None
+            if not isinstance(name, str) or not name.strip():
+                logging.warning(f"{CUSTOM_FIELDS_FILENAME}: skipped field #{position + 1}, it needs a name")
+                continue
+            name = name.strip()
+            if entry.get("enabled", True) is False:
+                continue
+            if not VALID_NAME.fullmatch(name):
+                logging.warning(f"Custom field '{name}' skipped: names may only use letters, digits, "
+                                f"spaces and dashes")
+                continue
+            key = metadata_key(name).lower()
+            if key in RESERVED_NAMES or key in seen:
+                logging.warning(f"Custom field '{name}' skipped: the name is already in use")
+                continue
+            try:
+                fields.append(_parse_field(name, entry))
+                seen.add(key)
+            except (ValueError, TypeError) as e:
+                logging.warning(f"Custom field '{name}' skipped: {e}")
+
+        logging.info(f"Loaded {len(fields)} custom fields from {CUSTOM_FIELDS_FILENAME}")
+        return fields
+
+
+def _parse_field(name, entry):
+    """Returns the CustomField for one entry, or raises ValueError."""
+    if "anchor" in entry:
+        anchor = entry["anchor"]
+        value_type = entry.get("value", "word")
+        if not isinstance(anchor, str) or not anchor.strip():
+            raise ValueError("anchor must be a non-empty string")
+        if value_type not in VALUE_TYPES:
+            raise ValueError(f"value must be one of {', '.join(VALUE_TYPES)}")
+        source = (re.escape(anchor.strip().lower())
+                  + rf"[\s:#\-]{{0,{ANCHOR_GAP}}}?" + VALUE_TYPES[value_type])
+        return CustomField(name, "anchor", source, compile_pattern(source), value_type, None)
+
+    pattern = entry.get("pattern")
+    if not isinstance(pattern, str) or not pattern:
+        raise ValueError("it needs an anchor or a pattern")
+    try:
+        re.compile(pattern)  # Only to report errors early; it's compiled again in the worker
+    except re.error as e:
+        raise ValueError(f"invalid regex: {e}")
+    budget = entry.get("timeout_ms", RULE_TIME_BUDGET)
+    if not isinstance(budget, (int, float)) or budget <= 0:
+        raise ValueError("timeout_ms must be a positive number")
+    budget = min(budget, MAX_TIME_BUDGET)
+    return CustomField(name, "regex", pattern, None, None, budget / 1000)
+
+
+def metadata_key(name):
+    """The PDF metadata key a field is written under, without the leading slash."""
+    return name.replace(" ", "")
+
+
+def get_custom_fields():
+    """Returns the shared CustomFields, loading custom_fields.json on first use."""
+    global _fields
+    with _fields_lock:
+        if _fields is None:
+            try:
+                path = load_data_path("config", CUSTOM_FIELDS_FILENAME)
+            except Exception as e:
+                logging.error(f"Unable to locate {CUSTOM_FIELDS_FILENAME}: {e}")
+                path = CUSTOM_FIELDS_FILENAME
+            _fields = CustomFields(path)
+        return _fields
+
+
+def custom_field_names():
+    """Returns the enabled custom field names, ex: for the rename component lists."""
+    try:
+        return get_custom_fields().names()
+    except Exception as e:
+        logging.error(f"Unable to read custom field names: {e}")
+        return []
+
+
+def custom_value(field, raw):
+    """Cleans a captured value for use in a filename, or None if nothing usable is left."""
+    if field.value_type == "amount":
+        amount = parse_amount(raw)
+        return field_text(amount) if amount else None
+    value = re.sub(r'[\\/:*?"<>|]', '-', raw.strip(" .,;:#-")).strip()
+    if not value:
+        return None
+    if field.value_type == "text":
+        return " ".join(word.capitalize() for word in value.split())
+    return value.upper()
+
+
+class RuleTimings:
+    """
+    Per-rule run times for one auto-name batch.
+
+        Every rule is timed, anchor rules included, so slow ones stand out
+        in the log when the batch ends.
+    """
+    def __init__(self):
+        self._times = {}  # name: [runs, total seconds, slowest, timeouts]
+
+    def record(self, name, seconds, timed_out=False):
+        times = self._times.setdefault(name, [0, 0.0, 0.0, 0])
+        times[0] += 1
+        times[1] += seconds
+        times[2] = max(times[2], seconds)
+        times[3] += 1 if timed_out else 0
+
+    def timeouts(self, name):
+        return self._times.get(name, [0, 0.0, 0.0, 0])[3]
+
+    def summary(self):
+        """Returns {name: (runs, total ms, slowest ms, timeouts)}, slowest total first."""
+        rows = {name: (runs, total * 1000, slowest * 1000, timeouts)
+                for name, (runs, total, slowest, timeouts) in self._times.items()}
+        return dict(sorted(rows.items(), key=lambda row: row[1][1], reverse=True))
+
+    def log(self):
+        for name, (runs, total, slowest, timeouts) in self.summary().items():
+            message = (f"Custom field '{name}': {runs} documents, {total:.1f} ms total, "
+                       f"{total / runs:.2f} ms average, {slowest:.2f} ms slowest")
+            if timeouts:
+                logging.warning(f"{message}, {timeouts} timeouts")
+            else:
+                logging.info(message)
+
+
+class CustomFieldRunner:
+    """
+    Runs the custom field rules over a batch of documents.
+
+        Anchor rules run in-process. Regex rules are user-written, so they
+        run in a worker process started on first need; if one runs past its
+        budget the worker is stopped (and restarted for the next rule), and
+        after RULE_TIMEOUT_LIMIT timeouts the rule is skipped for the rest of
+        the batch. Call close() when the batch is done to log the timings
+        and stop the worker.
+    """
+    def __init__(self):
+        self.timings = RuleTimings()
+        self._process = None
+        self._connection = None
+        self._document = None  # The text the worker holds
+        self._failed = False   # The worker couldn't be started this batch
+
+    def search(self, masked):
+        """
+        Runs every enabled custom field over a document.
+
+            Arguments:
+                masked:     The document's MaskedText
+
+            Returns {field name: CustomMatch} for the fields found
+        """
+        text, segments = masked.text, masked.segments()
+        found = {}
+        for field in get_custom_fields().current():
+            if self.timings.timeouts(field.name) >= RULE_TIMEOUT_LIMIT:
+                continue
+            if field.kind == "regex" and not self._worker_ready():
+                continue
+            start = time.perf_counter()
+            if field.kind == "anchor":
+                match = segment_search(field.regex, text, segments)
+                result = (pack_value(match), match.group(0), match.start(), match.end()) if match else None
+                timed_out = False
+            else:
+                result, timed_out = self._run_regex(field, text, segments)
+            self.timings.record(field.name, time.perf_counter() - start, timed_out)
+
+            value = custom_value(field, result[0]) if result else None
+            if value:
+                found[field.name] = CustomMatch(value, *result[1:])
+        if found:
+            logging.info(f"Custom fields found: { {name: hit.value for name, hit in found.items()} }")
+        return found
+
+    def _run_regex(self, field, text, segments):
+        """Runs a regex rule in the worker; returns ((value, matched, start, end) or None, timed_out)."""
+        try:
+            if self._document is not text:
+                self._connection.send(("text", text, segments))
+                self._document = text
+            self._connection.send(("rule", field.source))
+            if not self._connection.poll(field.timeout):
+                logging.warning(f"Custom field '{field.name}' ran past its {field.timeout * 1000:.0f} ms "
+                                f"budget and was stopped")
+                self._stop()
+                return None, True
+            reply = self._connection.recv()
+        except Exception as e:
+            logging.error(f"Custom field '{field.name}' could not run: {e}")
+            self._stop()
+            return None, False
+
+        if reply[0] == "error":
+            logging.error(f"Custom field '{field.name}' failed: {reply[1]}")
+            return None, False
+        return (reply[1:] if reply[0] == "match" else None), False
+
+    def _worker_ready(self):
+        """Starts the worker if it isn't running; False if it can't be started."""
+        if self._process and self._process.is_alive():
+            return True
+        if self._failed:
+            return False
+        try:
+            self._start()
+            return True
+        except Exception as e:
+            logging.error(f"Unable to start the custom field worker, regex rules are skipped: {e}")
+            self._failed = True
+            self._stop()
+            return False
+
+    def _start(self):
+        context = multiprocessing.get_context("spawn")
+        self._connection, child = context.Pipe()
+        self._process = context.Process(target=rule_worker, args=(child,), daemon=True)
+        self._process.start()
+        child.close()
+        self._document = None
+        if not self._connection.poll(WORKER_START_TIMEOUT):
+            raise TimeoutError("custom field worker did not start")
+        self._connection.recv()
+
+    def _stop(self):
+        if self._process and self._process.is_alive():
+            try:
+                self._process.terminate()
+                self._process.join(1)
+            except Exception as e:
+                logging.error(f"Unable to stop the custom field worker: {e}")
+        if self._connection:
+            self._connection.close()
+        self._process = self._connection = self._document = None
+
+    def close(self):
+        """Logs the batch's rule timings and stops the worker."""
+        self.timings.log()
+        if self._connection:
+            try:
+                self._connection.send(None)
+            except Exception:
+                pass
+        self._stop()
+
+
+def custom_field_search(directory=None, file_list=None, normalized_texts=None, runner=None):
+    """
+    Returns dict: {original_filename: {field name: CustomMatch}}
+    Runs the user-defined fields from custom_fields.json.
+    Pass a CustomFieldRunner to share its worker and timings across calls;
+    otherwise one is made and closed here.
+    Does NOT rename.
+    """
+    if not file_list:
+        return {}
+
+    search_dir = directory.strip() if directory else None
+    own_runner = runner is None
+    runner = runner or CustomFieldRunner()
+
+    try:
+        if search_dir and not os.path.isdir(search_dir):
+            logging.error(f"Invalid directory: {search_dir}")
+            return {}
+
+        filenames = [os.path.basename(f) for f in file_list]
+
+        results = {}
+
+        for filename in filenames:
+            full_path = os.path.join(search_dir, filename) if search_dir else None
+            if full_path and not os.path.isfile(full_path):
+                results[filename] = {}
+                continue
+
+            if normalized_texts and filename in normalized_texts:
+                normalized = normalized_texts[filename]
+            else:
+                if not full_path:
+                    results[filename] = {}
+                    continue
+                normalized = extract_normalized_text(full_path)
+
+            normalized = as_masked(normalized)
+            if not normalized:
+                results[filename] = {}
+                continue
+
+            results[filename] = runner.search(normalized)
+
+        logging.info(f"Custom field search results: "
+                     f"{ {name: {field: hit.value for field, hit in found.items()} for name, found in results.items()} }")
+        return results
+
+    except Exception as e:
+        logging.error(f"Error in custom_field_search: {e}")
+        return {}
+    finally:
+        if own_runner:
+            runner.close()
@@ -1,15 +1,40 @@
 # Managers/Autoname/date_search.py
 import logging
-import re
 import os
 from src.utils.load_settings import load_company_map
 from src.managers.autoname.search_helpers import (extract_normalized_text,
+                                              as_masked,
+                                              find_dates,
+                                              best_date,
                                               date_patterns)
+from src.managers.autoname.pattern_packs import get_pattern_packs, find_pack_dates, BUILTIN
+
+
+def packed_dates(text, segments):
+    """
+    Finds dates with the built-in patterns and any pattern pack date patterns.
+
+        Priorities follow the packs' order: pack patterns ahead of the
+        built-in ones get lower numbers than every built-in pattern, and
+        those after it higher ones.
+    """
+    dates = []
+    priority = 0
+    for pattern in get_pattern_packs().plan("date"):
+        if pattern is BUILTIN:
+            dates += [date._replace(priority=priority + date.priority)
+                      for date in find_dates(text, segments)]
+            priority += len(date_patterns)
+        else:
+            dates += find_pack_dates(pattern, text, segments, priority)
+            priority += 1
+    return sorted(dates)
 
 
 def date_search(companies=None, directory=None, file_list=None, normalized_texts=None):
     """
-    Returns dict: {original_filename: (date_str, matched_date) or None}
+    Returns dict: {original_filename: (date_str, matched_date, dates) or None}
+    dates holds every DateMatch found, so callers can scrub them all.
     Always searches regardless of current filename.
     Does NOT rename.
     """
@@ -44,24 +69,17 @@ def date_search(companies=None, directory=None, file_list=None, normalized_texts
                     continue
                 normalized = extract_normalized_text(full_path)
 
+            normalized = as_masked(normalized)
             if not normalized:
                 results[filename] = None
                 continue
 
-            found = None
-            matched_date = None
-            for pattern, formatter in date_patterns:
-                match = re.search(pattern, normalized)
-                if match:
-                    formatted = formatter(match)
-                    if formatted and formatted.count('-') == 2:
-                        found = formatted
-                        matched_date = match.group(0)
-                        break
-
-            results[filename] = (found, matched_date) if found else None
+            dates = packed_dates(normalized.text, normalized.segments())
+            best = best_date(dates)
+            results[filename] = (best.value, best.text, dates) if best else None
 
-        logging.info(f"Date search results: {results}")
+        summary = {name: result[:2] if result else None for name, result in results.items()}
+        logging.info(f"Date search results: {summary}")
         return results
 
     except Exception as e:
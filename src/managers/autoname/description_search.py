@@ -0,0 +1,48 @@
+# Managers/Autoname/description_search.py
+import re
+from src.managers.autoname.search_helpers import FieldStage, first_by_priority
+
+DESCRIPTION_WORDS = 6  # Longest description kept, in words
+
+# Column headers and filler that follow a description label in table layouts
+HEADER_WORDS = {"qty", "quantity", "unit", "price", "amount", "total", "rate", "hours", "each",
+                "ea", "item", "items", "description", "uom", "ext", "extended", "cost", "line",
+                "no", "no.", "#", "of", "the", "and"}
+
+# Text a description may hold; stops at digits and money so prices aren't swallowed
+_WORDS = r"([a-z][a-z&/\-.' ]{2,80}?)"
+
+# Patterns for lowercase normalized text, in priority order. Normalized
+# text is one line, so each description ends where a number starts.
+DESCRIPTION_TRIGGERS = [
+    # 1. Labelled description, skipping a row of column headers
+    rf'\b(?:description|desc\.?)\s*(?:of\s+(?:work|services?|goods))?\s*[:#]?\s*'
+    rf'(?:(?:qty|quantity|unit\s+price|price|amount|total|rate|hours|uom)\s+)*{_WORDS}\s*(?=\d|\$|$)',
+
+    # 2. What the invoice is for
+    rf'\b(?:for|re|regarding|services?\s+rendered|work\s+performed)\s*:\s*{_WORDS}\s*(?=\d|\$|$)',
+
+    # 3. A line item after its item number
+    rf'\bitem\s*(?:#|no\.?|number)?\s*[:#]?\s*[a-z]*\d[a-z0-9\-]*\s+{_WORDS}\s*(?=\d|\$)',
+]
+
+# Every trigger starts with one of these. Keep in sync when adding triggers.
+DESCRIPTION_ANCHORS = r'desc|for\b|re\b|regarding|services?\s|work|item'
+
+
+def description_value(raw):
+    """Trims a captured description to its first few meaningful words, ex: "Hvac Filter Service"."""
+    words = [word.strip(".-'/&") for word in raw.split()]
+    while words and words[0] in HEADER_WORDS:
+        words.pop(0)
+    words = [word for word in words if word][:DESCRIPTION_WORDS]
+    while words and words[-1] in HEADER_WORDS:
+        words.pop()
+    if not words or all(word in HEADER_WORDS for word in words) or len("".join(words)) < 3:
+        return None
+    # Keep it usable as part of a filename
+    return re.sub(r'[\\/:*?"<>|]', '-', " ".join(word.capitalize() for word in words))
+
+
+STAGE = FieldStage("description", "Description", DESCRIPTION_TRIGGERS, DESCRIPTION_ANCHORS,
+                   description_value, first_by_priority)
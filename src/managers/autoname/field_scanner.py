@@ -0,0 +1,170 @@
+# Managers/Autoname/field_scanner.py
+import os
+import re
+import logging
+from collections import namedtuple
+from functools import lru_cache
+from src.managers.autoname.search_helpers import (extract_normalized_text,
+                                              as_masked,
+                                              segment_search,
+                                              field_text,
+                                              FieldMatch)
+from src.managers.autoname.pattern_packs import (get_pattern_packs, compile_pattern,
+                                                 pack_value, BUILTIN)
+from src.managers.autoname import (total_search, tax_search, sales_tax_search,
+                                   terms_search, description_search)
+
+# Every field the scan extracts, in the order they're reported
+STAGES = [
+    total_search.STAGE,
+    tax_search.STAGE,
+    sales_tax_search.STAGE,
+    terms_search.STAGE,
+    description_search.STAGE,
+]
+STAGES_BY_FIELD = {stage.field: stage for stage in STAGES}
+
+# One pattern of the scan: priority ranks it within its field (lower wins)
+ScanPattern = namedtuple("ScanPattern", "field priority source regex builtin")
+
+
+def scan_patterns(stages=STAGES):
+    """Returns every ScanPattern for stages: pattern packs and built-in triggers in pack order."""
+    patterns = []
+    for stage in stages:
+        priority = 0
+        for pattern in get_pattern_packs().plan(stage.field):
+            if pattern is BUILTIN:
+                for source in stage.triggers:
+                    patterns.append(ScanPattern(stage.field, priority, source,
+                                                compile_pattern(source), True))
+                    priority += 1
+            else:
+                patterns.append(ScanPattern(stage.field, priority, pattern.source, pattern.regex, False))
+                priority += 1
+    return patterns
+
+
+@lru_cache(maxsize=16)
+def _scanner(anchors, sources):
+    """
+    Compiles triggers into one lookahead alternation, tried only where an anchor starts.
+
+        Each trigger is group s{i}, so lastgroup tells the first one that
+        matched at a position.
+    """
+    return re.compile(f"(?={anchors})(?="
+                      + "|".join(f"(?P<s{i}>{source})" for i, source in enumerate(sources)) + ")")
+
+
+def scan_fields(text, segments=None, stages=STAGES):
+    """
+    Extracts every field in stages from normalized text in one pass.
+
+        The built-in triggers of all stages run as one combined scanner,
+        tried only at their anchor words, so the text is walked once
+        however many fields there are. Where the scanner stops, the
+        triggers after the one it reports are matched at the same
+        position to collect every candidate; each stage then validates
+        its candidates and chooses one. Pattern pack patterns don't
+        declare anchors and are searched on their own.
+
+        Arguments:
+            text:       Normalized text
+            segments:   (start, end) ranges to search, ex: the visible parts
+                        of a MaskedText; all of text if None
+            stages:     FieldStages to run
+
+        Returns {field: FieldMatch} for the fields found
+    """
+    segments = segments or [(0, len(text))]
+    by_field = {stage.field: stage for stage in stages}
+    patterns = scan_patterns(stages)
+    combined = [pattern for pattern in patterns if pattern.builtin]
+    separate = [pattern for pattern in patterns if not pattern.builtin]
+
+    candidates = {field: [] for field in by_field}
+
+    def consider(pattern, match):
+        stage = by_field[pattern.field]
+        value = stage.value(pack_value(match))
+        if value is not None:
+            candidates[pattern.field].append(FieldMatch(
+                pattern.field, value, match.group(0), match.start(), match.end(),
+                pattern.priority, pattern.source))
+
+    if combined:
+        scanner = _scanner("|".join(stage.anchors for stage in stages),
+                           tuple(pattern.source for pattern in combined))
+        for start, end in segments:
+            for hit in scanner.finditer(text, start, end):
+                position = hit.start()
+                first = int(hit.lastgroup[1:])
+                # Triggers before the reported one don't match here; later ones might
+                for pattern in combined[first:]:
+                    match = pattern.regex.match(text, position, end)
+                    if match:
+                        consider(pattern, match)
+    for pattern in separate:
+        match = segment_search(pattern.regex, text, segments)
+        if match:
+            consider(pattern, match)
+
+    found = {}
+    for field, stage in by_field.items():
+        chosen = stage.choose(candidates[field])
+        if chosen:
+            found[field] = chosen
+    return found
+
+
+def field_search(directory=None, file_list=None, normalized_texts=None):
+    """
+    Returns dict: {original_filename: {field: FieldMatch}}
+    Runs the total, tax, sales tax, terms and description stages together.
+    Always searches regardless of current filename.
+    Does NOT rename.
+    """
+    if not file_list:
+        return {}
+
+    search_dir = directory.strip() if directory else None
+
+    try:
+        if search_dir and not os.path.isdir(search_dir):
+            logging.error(f"Invalid directory: {search_dir}")
+            return {}
+
+        filenames = [os.path.basename(f) for f in file_list]
+
+        results = {}
+
+        for filename in filenames:
+            full_path = os.path.join(search_dir, filename) if search_dir else None
+            if full_path and not os.path.isfile(full_path):
+                results[filename] = {}
+                continue
+
+            if normalized_texts and filename in normalized_texts:
+                normalized = normalized_texts[filename]
+            else:
+                if not full_path:
+                    results[filename] = {}
+                    continue
+                normalized = extract_normalized_text(full_path)
+
+            normalized = as_masked(normalized)
+            if not normalized:
+                results[filename] = {}
+                continue
+
+            results[filename] = scan_fields(normalized.text, normalized.segments())
+
+        summary = {name: {field: field_text(found.value) for field, found in fields.items()}
+                   for name, fields in results.items()}
+        logging.info(f"Field search results: {summary}")
+        return results
+
+    except Exception as e:
+        logging.error(f"Error in field_search: {e}")
+        return {}
@@ -2,12 +2,153 @@
 import re
 import os
 import logging
-from src.managers.autoname.search_helpers import extract_normalized_text
+from functools import lru_cache
+from src.managers.autoname.search_helpers import (extract_normalized_text,
+                                              as_masked,
+                                              segment_search,
+                                              segment_end)
+from src.managers.autoname.pattern_packs import search_with_packs, pack_value
+
+
+# Patterns adjusted for lowercase text (no IGNORECASE), in priority order.
+# The first pattern whose first match is a valid invoice number wins.
+INVOICE_TRIGGERS = [
+    r'order\s*#?\s*:\s*([a-z0-9]{8,30})',
+    r'(?:invoice|inv)\s*(?:no\.?|number|#)\s*[:#]?\s*([a-z0-9\-_]{3,20})',
+    r'invoice\s+no?\.?\s*[:#]?\s*([a-z0-9\-_]+)',
+    r'\binvoice\s*(?:nbr\.?|no\.?|number|#)?\s*[:.]?\s*([0-9]{4,})',
+    r'\binv(?:oice)?\b\s*(?:no\.?|number|#|[:#])?\s*([0-9]{3,})',
+    r'(?:trans(?:action)?\s*#?\s*[:#]?\s*)([0-9]{8,12})\b',
+    r'invoice\s+number\s*[:#]?\s*([a-z0-9\-_]+)',
+    r'\b(?:transaction|txn|trans)\b\s*(?:number|#|no\.?|id)?\s*[:#.]?\s*(\d{12,18})\b(?!\s*[/-]\d)',
+    r'order\s+number\s*[:#]?\s*([0-9]+)',
+    r'invoice\s*#?\s*wa\s*\d{5}\s*(?:\d{1,2}/\d{1,2}/\d{4}|\d{2}/\d{2}/\d{4})?\s*(\d{3,})\b',
+    r'(?:order\s*(?:id|number|#)?\s*[:=]?\s*)([0-9]{10,16}(?:-\d+)+)\b',
+    r'\b(\d{6,8})\b(?!\s*[/-]\d{1,2})',
+    r'invoice\s*[:#]?\s*(\d{4,}[a-z0-9\-_]*)',
+    r'order\s+id\s*[:#]?\s*([a-z0-9]+)',
+    r'order\s*#?\s*([0-9]+)',
+    r'(?<![\d/])(?<!\d{2}-\d{2})(?<!\d{2}/\d{2})(?<!\d{5}\s)\b(\d{6,8})\b(?!\s*-?\s*\d{2})',
+    r'\b(\d{6,8})\b(?![-/]\d)',
+    r'sales\s+slip\s*#?\s*[:#]?\s*(\d{4,10})\b',
+    r'(?:your\s+)?order\s+(?:number|no\.?|id|#)\s*(?:is|:|was|=)?\s*([a-z]{1,4}\d{5,12})\b',
+    r'(?:order\s+)?vs\s*([a-zA-Z]?\d{6,10})\b',
+    r'(?:id\s*#?\s*|order\s+id\s*[:#]?\s*)([a-f0-9]{20,32})\b',
+    r'(?:receipt\s*(?:#|no\.?|number)?\s*[:#]?\s*)([#-]?\d{4,8}(?:-\d{4})?)\b'
+]
+_TRIGGERS = [re.compile(pattern) for pattern in INVOICE_TRIGGERS]
+
+# Triggers that open with a fixed word, which re finds with a fast prefix
+# search, so they are searched one at a time. Any split gives the same
+# answer; this one only decides speed.
+_LITERAL_LED = [0, 1, 2, 5, 6, 8, 9, 10, 12, 13, 14, 17, 21]
+
+# Every trigger starts with one of these; the scanner only tries the
+# triggers where one begins. Keep in sync when adding triggers.
+TRIGGER_ANCHORS = r'order|inv|trans|txn|sales|your|vs|id|receipt|\b\d'
+
+# Triggers that take a bare number with no label before it. A region
+# pass only trusts them if no wider pass finds a labelled invoice number.
+_UNLABELLED = [11, 15, 16]
+WEAK_TRIGGERS = frozenset(INVOICE_TRIGGERS[i] for i in _UNLABELLED)
+
+VALID_INVOICE = re.compile(r'^[A-Z0-9\-_]{2,20}$')
+
+
+@lru_cache(maxsize=128)
+def _trigger_scanner(active):
+    """Compiles the triggers in active (sorted indices) into one lookahead alternation."""
+    return re.compile(f"(?={TRIGGER_ANCHORS})(?="
+                      + "|".join(f"(?P<t{i}>{INVOICE_TRIGGERS[i]})" for i in active) + ")")
+
+
+def find_invoice_number(text, segments=None):
+    """
+    Finds the invoice number the triggers pick out of text.
+
+        Gives the same answer as trying each trigger in turn with
+        re.search: the winner is the highest-priority trigger whose first
+        match is a valid invoice number.
+
+        Literal-led triggers are searched first, which is cheap, and set
+        the best candidate so far. The remaining triggers that rank above
+        it run together in one left-to-right pass: the scanner reports
+        the highest-priority pending trigger at each position and the
+        others are checked at that position only when it hits. Each hit
+        settles at least one trigger, and triggers ranked below the best
+        valid candidate are dropped, so the pass stops as soon as nothing
+        pending can beat it.
+
+        Arguments:
+            text:       Normalized text
+            segments:   (start, end) ranges to search, ex: the visible parts
+                        of a MaskedText; all of text if None. No match runs
+                        across the gap between two segments.
+
+        Returns (invoice, matched_text, priority) or None
+    """
+    segments = segments or [(0, len(text))]
+    best = None
+    for priority in _LITERAL_LED:
+        match = segment_search(_TRIGGERS[priority], text, segments)
+        if match:
+            candidate = match.group(1).strip().upper()
+            if VALID_INVOICE.match(candidate):
+                best = (candidate, match.group(0), priority)
+                break
+
+    limit = best[2] if best else len(INVOICE_TRIGGERS)
+    pending = [i for i in range(limit) if i not in _LITERAL_LED]
+    position = 0
+    while pending:
+        if len(pending) == 1:
+            # Nothing to combine; the trigger's own search is faster
+            hit = pending[0]
+            match = segment_search(_TRIGGERS[hit], text, segments, position)
+            if not match:
+                break
+            position = match.start()
+            first_matches = [(hit, match.group(0), match.group(1))]
+        else:
+            match = segment_search(_trigger_scanner(tuple(pending)), text, segments, position)
+            if not match:
+                break
+            position = match.start()
+            hit = int(match.lastgroup[1:])
+            first_matches = [(hit, match.group(match.lastindex), match.group(match.lastindex + 1))]
+        # Pending triggers ranked above the hit can't match here; those below might
+        end = segment_end(segments, position)
+        for i in pending:
+            if i > hit:
+                other = _TRIGGERS[i].match(text, position, end)
+                if other:
+                    first_matches.append((i, other.group(0), other.group(1)))
+
+        for priority, matched, group in first_matches:
+            pending.remove(priority)
+            candidate = group.strip().upper()
+            if VALID_INVOICE.match(candidate) and (best is None or priority < best[2]):
+                best = (candidate, matched, priority)
+        if best:
+            pending = [i for i in pending if i < best[2]]
+        position += 1
+    return best
+
+
+def _builtin_invoice(text, segments):
+    found = find_invoice_number(text, segments)
+    return (found[0], found[1], INVOICE_TRIGGERS[found[2]]) if found else None
+
+
+def _pack_invoice(match, pattern):
+    candidate = pack_value(match).strip().upper()
+    return (candidate, match.group(0), pattern.source) if VALID_INVOICE.match(candidate) else None
 
 
 def invoice_number_search(directory=None, file_list=None, normalized_texts=None):
     """
-    Returns dict: {original_filename: (inv_str, matched_inv) or None}
+    Returns dict: {original_filename: (inv_str, matched_inv, weak) or None}
+    weak is True when a trigger in WEAK_TRIGGERS found the number.
     Always searches regardless of current filename.
     Does NOT rename.
     """
@@ -16,32 +157,6 @@ def invoice_number_search(directory=None, file_list=None, normalized_texts=None)
 
     search_dir = directory.strip() if directory else None
 
-    # Patterns adjusted for lowercase text (no IGNORECASE)
-    triggers = [
-        r'order\s*#?\s*:\s*([a-z0-9]{8,30})',
-        r'(?:invoice|inv)\s*(?:no\.?|number|#)\s*[:#]?\s*([a-z0-9\-_]{3,20})',
-        r'invoice\s+no?\.?\s*[:#]?\s*([a-z0-9\-_]+)',
-        r'\binvoice\s*(?:nbr\.?|no\.?|number|#)?\s*[:.]?\s*([0-9]{4,})',
-        r'\binv(?:oice)?\b\s*(?:no\.?|number|#|[:#])?\s*([0-9]{3,})',
-        r'(?:trans(?:action)?\s*#?\s*[:#]?\s*)([0-9]{8,12})\b',
-        r'invoice\s+number\s*[:#]?\s*([a-z0-9\-_]+)',
-        r'\b(?:transaction|txn|trans)\b\s*(?:number|#|no\.?|id)?\s*[:#.]?\s*(\d{12,18})\b(?!\s*[/-]\d)',
-        r'order\s+number\s*[:#]?\s*([0-9]+)',
-        r'invoice\s*#?\s*wa\s*\d{5}\s*(?:\d{1,2}/\d{1,2}/\d{4}|\d{2}/\d{2}/\d{4})?\s*(\d{3,})\b',
-        r'(?:order\s*(?:id|number|#)?\s*[:=]?\s*)([0-9]{10,16}(?:-\d+)+)\b',
-        r'(?s)\b(\d{6,8})\b(?!\s*[/-]\d{1,2})',
-        r'invoice\s*[:#]?\s*(\d{4,}[a-z0-9\-_]*)',
-        r'order\s+id\s*[:#]?\s*([a-z0-9]+)',
-        r'order\s*#?\s*([0-9]+)',
-        r'(?<![\d/])(?<!\d{2}-\d{2})(?<!\d{2}/\d{2})(?<!\d{5}\s)\b(\d{6,8})\b(?!\s*-?\s*\d{2})',
-        r'\b(\d{6,8})\b(?![-/]\d)',
-        r'sales\s+slip\s*#?\s*[:#]?\s*(\d{4,10})\b',
-        r'(?:your\s+)?order\s+(?:number|no\.?|id|#)\s*(?:is|:|was|=)?\s*([a-z]{1,4}\d{5,12})\b',
-        r'(?:order\s+)?vs\s*([a-zA-Z]?\d{6,10})\b',
-        r'(?:id\s*#?\s*|order\s+id\s*[:#]?\s*)([a-f0-9]{20,32})\b',
-        r'(?:receipt\s*(?:#|no\.?|number)?\s*[:#]?\s*)([#-]?\d{4,8}(?:-\d{4})?)\b'
-    ]
-
     try:
         if search_dir and not os.path.isdir(search_dir):
             logging.error(f"Invalid directory: {search_dir}")
@@ -65,27 +180,17 @@ def invoice_number_search(directory=None, file_list=None, normalized_texts=None)
                     continue
                 normalized = extract_normalized_text(full_path)
 
+            normalized = as_masked(normalized)
             if not normalized:
                 results[filename] = None
                 continue
 
             logging.debug(
-                f"Contains 'order number': {'order number' in normalized}")
-
-            invoice = None
-            matched_inv = None
-            matched_pattern = None
-            for pattern in triggers:
-                match = re.search(pattern, normalized)
-                if match:
-                    candidate = match.group(1).strip().upper()
-                    logging.info(
-                        f"Pattern matched: {pattern} becomes candidate: {candidate}")
-                    if re.match(r'^[A-Z0-9\-_]{2,20}$', candidate):
-                        invoice = candidate
-                        matched_inv = match.group(0)
-                        matched_pattern = pattern
-                        break
+                f"Contains 'order number': {'order number' in normalized.text}")
+
+            found = search_with_packs("invoice", normalized.text, normalized.segments(),
+                                      _builtin_invoice, _pack_invoice)
+            invoice, matched_inv, matched_pattern = found or (None, None, None)
 
             if invoice:
                 logging.info(
@@ -94,7 +199,7 @@ def invoice_number_search(directory=None, file_list=None, normalized_texts=None)
                 logging.info(
                     f"No valid invoice found for {filename} - checked all patterns")
 
-            results[filename] = (invoice, matched_inv) if invoice else None
+            results[filename] = (invoice, matched_inv, matched_pattern in WEAK_TRIGGERS) if invoice else None
 
         logging.info(f"Invoice number search results: {results}")
         return results
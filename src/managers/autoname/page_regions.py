@@ -0,0 +1,135 @@
+# Managers/Autoname/page_regions.py
+import os
+import logging
+from src.managers.autoname.search_helpers import normalize_text
+from src.managers.autoname.text_backends import open_document, OcrDocument, DOCUMENT_TEXT_LIMIT
+
+# Where auto-naming looks first: the header and footer of page 1
+DEFAULT_REGIONS = [
+    {"page": 1, "top": 0.0, "bottom": 0.33},
+    {"page": 1, "top": 0.85, "bottom": 1.0},
+]
+
+
+def validate_region(region):
+    """Returns a page region as {"page", "top", "bottom"}, or raises ValueError."""
+    if not isinstance(region, dict):
+        raise ValueError("region must be an object")
+    page = region.get("page", 1)
+    top, bottom = region.get("top", 0.0), region.get("bottom", 1.0)
+    if not isinstance(page, int) or page < 1:
+        raise ValueError("region page must be 1 or more")
+    if not all(isinstance(value, (int, float)) for value in (top, bottom)) or not 0 <= top < bottom <= 1:
+        raise ValueError("region top and bottom must be fractions of the page, top above bottom")
+    return {"page": page, "top": float(top), "bottom": float(bottom)}
+
+
+def load_regions(settings):
+    """Returns the valid regions from the extraction_regions setting; bad entries are logged and skipped."""
+    regions = []
+    for region in settings.get("extraction_regions", DEFAULT_REGIONS) or []:
+        try:
+            regions.append(validate_region(region))
+        except ValueError as e:
+            logging.warning(f"Skipped extraction region {region}: {e}")
+    return regions
+
+
+class DocumentText:
+    """
+    Extracts a PDF's text a little at a time for region-first auto-naming.
+
+        Extraction is the expensive part of auto-naming, so levels() yields
+        the text in widening passes:
+
+            regions:    Only the configured regions, ex: the top third and
+                        the footer of page 1
+            pages:      The whole of every page a region is on
+            document:   Pages in order until DOCUMENT_TEXT_LIMIT characters,
+                        with the OCR fallback, as extract_normalized_text
+
+        The caller stops asking once it has the fields it needs. The file
+        is read through the backend open_document picks, which caches page
+        text, so a wider pass doesn't extract a page twice. region() reads
+        any other region, ex: a vendor template's, while levels() runs.
+
+        Arguments:
+            full_path:  PDF to read
+            regions:    Validated regions, see validate_region; with none,
+                        only the document pass is made
+    """
+    def __init__(self, full_path, regions):
+        self.full_path = full_path
+        self.regions = regions
+        self._document = None
+        self._region_texts = {}  # (page, top, bottom): normalized text or None
+
+    def levels(self):
+        """Yields (level, normalized text) for each pass that adds text, narrowest first."""
+        previous = None
+        try:
+            for level, extract in (("regions", self._region_text), ("pages", self._region_pages_text),
+                                   ("document", self._document_text)):
+                if level != "document" and not (self.regions and self._open().regions):
+                    continue
+                try:
+                    text = normalize_text(extract())
+                except Exception as e:
+                    logging.warning(f"{level.capitalize()} pass failed on "
+                                    f"{os.path.basename(self.full_path)}: {e}")
+                    continue
+                if text.strip() and text != previous:
+                    previous = text
+                    yield level, text
+        finally:
+            self.close()
+
+    def region(self, region):
+        """Normalized text of one validated region, or None if the backend can't read it."""
+        key = (region["page"], region["top"], region["bottom"])
+        if key not in self._region_texts:
+            document = self._open()
+            text = None
+            if document.regions and region["page"] <= document.page_count:
+                try:
+                    text = normalize_text(document.region_text(region["page"] - 1, region["top"],
+                                                               region["bottom"]))
+                except Exception as e:
+                    logging.warning(f"Region {region} failed on "
+                                    f"{os.path.basename(self.full_path)}: {e}")
+            self._region_texts[key] = text
+        return self._region_texts[key]
+
+    def close(self):
+        if self._document is not None:
+            self._document.close()
+            self._document = None
+
+    def _open(self):
+        if self._document is None:
+            self._document = open_document(self.full_path)
+        return self._document
+
+    def _region_text(self):
+        document = self._open()
+        texts = []
+        for region in self.regions:
+            if region["page"] <= document.page_count:
+                texts.append(document.region_text(region["page"] - 1, region["top"], region["bottom"]))
+        return " ".join(texts)
+
+    def _region_pages_text(self):
+        document = self._open()
+        indexes = sorted({region["page"] - 1 for region in self.regions
+                          if region["page"] <= document.page_count})
+        return " ".join(document.page_text(index) for index in indexes)
+
+    def _document_text(self):
+        text = self._open().text(DOCUMENT_TEXT_LIMIT)
+        if not text.strip() and self._document.name != "ocr":
+            logging.warning(
+                f"No text extracted from {os.path.basename(self.full_path)} Trying OCR...")
+            self.close()
+            self._document = OcrDocument(self.full_path)
+            text = self._document.text()
+        return text
@@ -0,0 +1,271 @@
+# Managers/Autoname/pattern_packs.py
+import os
+import re
+import json
+import time
+import logging
+import threading
+from collections import namedtuple
+from functools import lru_cache
+from src.utils.load_settings import load_data_path
+from src.managers.autoname.search_helpers import segment_search, month_map, DateMatch
+
+PACKS_FILENAME = "pattern_packs.json"
+FIELDS = ("invoice", "card", "date", "total", "tax", "sales_tax", "terms", "description")
+
+# The patterns built into the *_search modules take part as this pack
+BUILTIN_PACK = "builtin"
+BUILTIN_PRIORITY = 100
+DEFAULT_PRIORITY = 50  # Packs run before the built-in patterns unless told otherwise
+
+RELOAD_CHECK_INTERVAL = 1.0  # seconds between checks of the file on disk
+
+# One compiled pattern from a pack; order is the date group order, ex: "mdy"
+PackPattern = namedtuple("PackPattern", "pack source regex order")
+
+# Stands for a field's built-in patterns in PatternPacks.plan()
+BUILTIN = PackPattern(BUILTIN_PACK, None, None, None)
+
+_packs = None
+_packs_lock = threading.Lock()
+
+
+@lru_cache(maxsize=512)
+def compile_pattern(pattern):
+    """Compiles a pack pattern once, however many times the file is reloaded."""
+    return re.compile(pattern)
+
+
+def validate_pattern(field, entry):
+    """
+    Returns (source, compiled, order) for one pattern entry, or raises ValueError.
+
+        Entries are regex strings, or for dates {"pattern": ..., "order": "mdy"}
+        where order names what the first three groups hold.
+    """
+    order = None
+    if field == "date" and isinstance(entry, dict):
+        order = str(entry.get("order", "mdy")).lower()
+        entry = entry.get("pattern")
+    if not isinstance(entry, str) or not entry:
+        raise ValueError("pattern must be a non-empty string")
+
+    try:
+        regex = compile_pattern(entry)
+    except re.error as e:
+        raise ValueError(f"invalid regex: {e}")
+
+    if field == "date":
+        order = order or "mdy"
+        if sorted(order) != ["d", "m", "y"]:
+            raise ValueError(f"order must use each of d, m, y once, not {order!r}")
+        if regex.groups < 3:
+            raise ValueError("date patterns need 3 groups")
+    elif not regex.groups:
+        raise ValueError("pattern needs a capture group for the value")
+    return entry, regex, order
+
+
+def pack_value(match):
+    """The value a pack pattern captured: its group named value, else its last group."""
+    if "value" in match.re.groupindex:
+        return match.group("value") or ""
+    return match.group(match.re.groups) or ""
+
+
+def format_pack_date(groups, order):
+    """Formats the first three groups of a pack date match as MM-DD-YY, or None."""
+    parts = dict(zip(order, (group or "" for group in groups)))
+    month = parts["m"].lower()
+    month = month_map.get(month, month)
+    if not (month.isdigit() and parts["d"].isdigit() and parts["y"].isdigit()):
+        return None
+    if not (1 <= int(month) <= 12 and 1 <= int(parts["d"]) <= 31):
+        return None
+    return f"{month.zfill(2)}-{parts['d'].zfill(2)}-{parts['y'].zfill(2)[-2:]}"
+
+
+class WatchedJsonFile:
+    """
+    A JSON config file that is re-read when it changes on disk.
+
+        The file is checked at most once per RELOAD_CHECK_INTERVAL. A
+        subclass turns the JSON into whatever it serves in _parse(data),
+        which gets None when the file doesn't exist. If the file can't be
+        read or parsed, the last good result stays in use.
+
+        Arguments:
+            path:       JSON file to watch
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp = None  # (mtime_ns, size) of the loaded file
+        self._checked = float('-inf')
+        self._parsed = self._parse(None)
+
+    def current(self):
+        """Returns the parsed contents, reloading first if the file changed."""
+        self.reload_if_changed()
+        return self._parsed
+
+    def reload_if_changed(self):
+        """Reloads the file if it changed on disk since the last load."""
+        now = time.monotonic()
+        if now - self._checked < RELOAD_CHECK_INTERVAL:
+            return False
+        with self._lock:
+            self._checked = now
+            try:
+                stat = os.stat(self.path)
+                stamp = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                stamp = None
+            if stamp == self._stamp:
+                return False
+            self._stamp = stamp
+            self._parsed = self._read() if stamp else self._parse(None)
+            return True
+
+    def _read(self):
+        name = os.path.basename(self.path)
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return self._parse(data)
+        except Exception as e:
+            logging.error(f"Unable to load {name}, keeping the current version: {e}")
+            return self._parsed
+
+    def _parse(self, data):
+        raise NotImplementedError
+
+
+class PatternPacks(WatchedJsonFile):
+    """
+    Extraction patterns loaded from pattern_packs.json in the config folder.
+
+        Each pack has a name, an enabled flag, a priority (lower runs
+        first) and lists of patterns per field (see FIELDS). Patterns are
+        validated and compiled when the file is loaded; bad ones are
+        logged and skipped without losing the rest of the pack. The
+        built-in patterns take part as the pack named "builtin" (priority
+        100), which the file can disable or move. The file is reloaded
+        when it changes on disk.
+
+        Arguments:
+            path:       pattern_packs.json to load
+    """
+    def plan(self, field):
+        """
+        Returns the patterns to try for field in priority order.
+
+            BUILTIN stands for the field's built-in patterns; every other
+            entry is a PackPattern with its regex already compiled.
+        """
+        return self.current()[field]
+
+    def _parse(self, data):
+        """Validates and compiles the packs into a plan per field."""
+        if data is None:
+            return {field: [BUILTIN] for field in FIELDS}
+        packs = data["packs"]
+        if not isinstance(packs, list):
+            raise TypeError("'packs' must be a list")
+
+        # (priority, file position, patterns per field)
+        ranked = []
+        builtin = (BUILTIN_PRIORITY, -1, {field: [BUILTIN] for field in FIELDS})
+        for position, pack in enumerate(packs):
+            if not isinstance(pack, dict) or not isinstance(pack.get("name"), str):
+                logging.warning(f"{PACKS_FILENAME}: skipped pack #{position + 1}, it needs a name")
+                continue
+            name = pack["name"]
+            enabled = pack.get("enabled", True) is not False
+            priority = pack.get("priority", BUILTIN_PRIORITY if name == BUILTIN_PACK
+                                else DEFAULT_PRIORITY)
+            if not isinstance(priority, (int, float)):
+                logging.warning(f"Pattern pack '{name}': priority must be a number, using {DEFAULT_PRIORITY}")
+                priority = DEFAULT_PRIORITY
+
+            if name == BUILTIN_PACK:
+                builtin = (priority, position, {field: [BUILTIN] for field in FIELDS}) if enabled else None
+                continue
+            if not enabled:
+                logging.debug(f"Pattern pack '{name}' is disabled")
+                continue
+
+            patterns = {}
+            for field in FIELDS:
+                entries = pack.get(field, [])
+                if not isinstance(entries, list):
+                    logging.warning(f"Pattern pack '{name}': '{field}' must be a list, skipped")
+                    continue
+                patterns[field] = []
+                for entry in entries:
+                    try:
+                        source, regex, order = validate_pattern(field, entry)
+                    except ValueError as e:
+                        logging.warning(f"Pattern pack '{name}': skipped {field} pattern {entry!r}: {e}")
+                        continue
+                    patterns[field].append(PackPattern(name, source, regex, order))
+            ranked.append((priority, position, patterns))
+
+        if builtin:
+            ranked.append(builtin)
+        ranked.sort(key=lambda pack: pack[:2])
+        plans = {field: [pattern for _, _, patterns in ranked for pattern in patterns.get(field, [])]
+                 for field in FIELDS}
+        logging.info(f"Loaded {len(ranked) - (1 if builtin else 0)} pattern packs from {PACKS_FILENAME}")
+        return plans
+
+
+def get_pattern_packs():
+    """Returns the shared PatternPacks, loading pattern_packs.json on first use."""
+    global _packs
+    with _packs_lock:
+        if _packs is None:
+            try:
+                path = load_data_path("config", PACKS_FILENAME)
+            except Exception as e:
+                logging.error(f"Unable to locate {PACKS_FILENAME}: {e}")
+                path = PACKS_FILENAME
+            _packs = PatternPacks(path)
+        return _packs
+
+
+def search_with_packs(field, text, segments, builtin, candidate):
+    """
+    Runs a field's patterns in priority order and returns the first result.
+
+        Arguments:
+            field:      "invoice", "card" or "date"
+            text:       Normalized text
+            segments:   Visible (start, end) ranges of text
+            builtin:    builtin(text, segments) runs the built-in patterns,
+                        returning a result or None
+            candidate:  candidate(match, pack_pattern) turns the first match
+                        of a pack pattern into a result, or None if invalid
+
+        Returns the first result that isn't None
+    """
+    for pattern in get_pattern_packs().plan(field):
+        if pattern is BUILTIN:
+            result = builtin(text, segments)
+        else:
+            match = segment_search(pattern.regex, text, segments)
+            result = candidate(match, pattern) if match else None
+        if result:
+            return result
+    return None
+
+
+def find_pack_dates(pattern, text, segments, priority):
+    """Returns a DateMatch with the given priority for every match of a pack date pattern."""
+    dates = []
+    for start, end in segments:
+        for match in pattern.regex.finditer(text, start, end):
+            value = format_pack_date(match.group(1, 2, 3), pattern.order)
+            if value:
+                dates.append(DateMatch(match.start(), match.end(), match.group(0), value, priority))
+    return dates
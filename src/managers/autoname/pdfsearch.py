@@ -2,25 +2,45 @@
 import re
 import logging
 import os
-from src.utils.load_settings import load_company_map
-from src.managers.autoname.search_helpers import (extract_normalized_text,
-                                              normalize_text,
+from src.utils.load_settings import load_company_map, load_settings
+from src.managers.autoname.search_helpers import (normalize_text,
                                               write_pdf_metadata,
                                               get_field_order,
-                                              date_patterns)
+                                              field_text,
+                                              MaskedText)
 from src.managers.autoname.company_search import company_search
 from src.managers.autoname.date_search import date_search
 from src.managers.autoname.inv_num_search import invoice_number_search
 from src.managers.autoname.card_num_search import card_number_search
-from pypdf import PdfReader
+from src.managers.autoname.field_scanner import field_search, STAGES
+from src.managers.autoname.custom_search import CustomFieldRunner, metadata_key
+from src.managers.autoname.vendor_templates import apply_vendor_templates, get_vendor_templates
+from src.managers.autoname.page_regions import DocumentText, load_regions
+from src.managers.autoname.text_backends import get_backend_stats
+from src.managers.pdf_metadata import read_info
+
+# Searched for when the rename order names no fields
+DEFAULT_WANTED = ["Company", "Date", "Invoice #"]
+
+# Written to metadata only when they're part of the rename order
+ORDER_ONLY_FIELDS = ("Company", "Date", "Invoice #")
 
 
 def apply_auto_naming(globals, directory, file_list=None):
     """
-    Master auto-namer: extracts text once per file,
-    calls company/date/invoice searches sequentially,
-    scrubs matches from normalized text between calls,
-    and renames based on progressive logic.
+    Master auto-namer.
+
+        Each file is read region first (see DocumentText). Every pass runs
+        the company, date, invoice and card searches in turn, masking
+        their matches in the normalized text between calls. Total, tax,
+        sales tax, terms and description are then scanned in one pass,
+        and the user's custom fields are run. Once the company is known,
+        the vendor's templates are tried first.
+
+        The text widens only while a field the rename order needs is
+        missing, or was found only by a weak pattern. A wider pass
+        replaces a weak value with a reliable one. Files are then
+        renamed based on progressive logic.
     """
     # Return if no files are sent
     if not file_list:
@@ -34,43 +54,23 @@ def apply_auto_naming(globals, directory, file_list=None):
         logging.error(f"Invalid directory: {search_dir}")
         return 0
 
-    # Extract normalized texts once for all files (batch optimization)
-    normalized_texts = {}
-    for full_path in file_list:
-        if not os.path.isfile(full_path):
-            continue
-        filename = os.path.basename(full_path)
-        normalized = extract_normalized_text(full_path)
-        normalized_texts[filename] = normalized
-
-        logging.debug(f"Normalized text length: {len(normalized)}\n")
-        logging.debug(f"\nCurrent Normalized Text: {normalized}\n")
-
-    if not normalized_texts:
-        return 0
-
-    # Step 1: Search for companies (always, no skips)
-    company_results = company_search(
-        directory=search_dir,
-        file_list=file_list,
-        normalized_texts=normalized_texts)
-
-    # Step 2: Apply company results, build initial new_parts, scrub if applied
     renamed = 0
+    custom_runner = CustomFieldRunner()
     valid_companies = {normalize_text(c) for c in load_company_map().values()}
+    regions = load_regions(load_settings())
 
     for full_path in file_list:
-        filename = os.path.basename(full_path)
-        if filename not in normalized_texts:
+        if not os.path.isfile(full_path):
             continue
+        filename = os.path.basename(full_path)
 
         # Check the identity
         identity = "Invoice"  # default fallback
 
         try:
-            reader = PdfReader(full_path)
-            if reader.metadata and "/Identity" in reader.metadata:
-                identity = reader.metadata["/Identity"]
+            metadata = read_info(full_path)
+            if "/Identity" in metadata:
+                identity = metadata["/Identity"]
                 logging.info(
                     f"Identity read from metadata for {filename}: {identity}")
             else:
@@ -86,120 +86,35 @@ def apply_auto_naming(globals, directory, file_list=None):
         logging.info(f"Processing: {filename}")
         logging.info(f"  Original parts: {parts}")
 
-        new_parts = parts[:]
-
-        # Apply company if found and different/missing
-        company_result = company_results.get(filename)
-        if company_result:
-            company, matched, keyword_tuple = company_result
-            norm_company = normalize_text(company)
-            if not parts or normalize_text(parts[0]) != norm_company:
-                if norm_company in valid_companies:  # Safety check
-                    new_parts = [company.capitalize()]
-                    logging.info(f"  Applied company: {company}")
-
-                    # Scrub all keywords from the text
-                    for kw in keyword_tuple:
-                        if kw.lower() in ['llc', 'inc']:
-                            continue
-                        normalized_kw = normalize_text(kw)
-                        if normalized_kw:
-                            new_text = re.sub(
-                                rf'\b{re.escape(normalized_kw)}\b',
-                                '',
-                                normalized_texts[filename])
-
-                            if new_text != normalized_texts[filename]:
-                                normalized_texts[filename] = new_text
-                                logging.debug(
-                                    f"  Scrubbed matched company keyword: {normalized_kw}")
-                                logging.debug(
-                                    f"\nCurrent Normalized Text: {normalized_texts[filename]}\n")
-                                logging.debug(
-                                    f"Normalized text length: {len(normalized_texts[filename])}\n")
-
-        # Step 3: Now search for dates using updated texts
-        date_results = date_search(
-            directory=search_dir,
-            file_list=file_list,
-            normalized_texts=normalized_texts)
-
-        # Apply date if we have exactly company so far
-        if len(new_parts) == 1:
-            date_result = date_results.get(filename)
-            if date_result:
-                date, matched = date_result
-                new_parts.append(date)
-                logging.info(f"  Applied date: {date}")
-
-                old_length = len(normalized_texts[filename])
-
-                # 1. Scrub the single matched date we used for naming (as before)
-                if matched:
-                    new_text = re.sub(rf'\b{re.escape(matched)}\b', '', normalized_texts[filename])
-                    if new_text != normalized_texts[filename]:
-                        normalized_texts[filename] = new_text
-                        logging.debug(f"  Scrubbed matched date: {matched}")
-                        logging.debug(f"  Length: {old_length} becomes {len(normalized_texts[filename])}")
-
-                # 2. Exhaustively scrub ALL possible dates using all patterns
-                scrubbed_any = False
-                for pattern, _ in date_patterns:
-                    new_text = re.sub(pattern, ' ', normalized_texts[filename])
-                    if new_text != normalized_texts[filename]:
-                        normalized_texts[filename] = new_text.strip()
-                        logging.debug(
-                            f"  Scrubbed additional dates with pattern: {pattern}")
-                        scrubbed_any = True
-
-                if scrubbed_any:
-                    logging.debug(
-                        f"\nCurrent Normalized Text after all date scrubs: \n{normalized_texts[filename]}\n")
-                    logging.debug(
-                        f"Normalized text length after date scrubs: {len(normalized_texts[filename])}\n")
-
-        # Step 4: Now search for invoices using updated texts
-        invoice_results = invoice_number_search(
-            directory=search_dir,
-            file_list=file_list,
-            normalized_texts=normalized_texts)
-
-        # Apply invoice if we have exactly company + date
-        if len(new_parts) == 2:
-            invoice_result = invoice_results.get(filename)
-            if invoice_result:
-                invoice, matched = invoice_result
-                new_parts.append(invoice)
-                logging.info(f"  Applied invoice: {invoice}")
-                if matched:
-                    normalized_texts[filename] = re.sub(
-                        rf'\b{re.escape(matched)}\b', '', normalized_texts[filename])
-                    logging.debug(f"  Scrubbed matched invoice: {matched}")
-
-                    logging.debug(
-                        f"\nCurrent Normalized Text: {normalized_texts[filename]}\n")
-                    logging.debug(
-                        f"Normalized text length: {len(normalized_texts[filename])}\n")
-
-        # Step 5: Search for the last 4 digits of a card number if present
-        card_results = card_number_search(
-            directory=search_dir,
-            file_list=file_list,
-            normalized_texts=normalized_texts)
-
         # Get user-defined field order based on the file's Identity
         order = get_field_order(globals, identity, filename)
+        wanted = [field for field in order if field] or DEFAULT_WANTED
 
-        # Map field names to their extracted values (only if found)
+        # Search the configured regions first and widen only while a wanted
+        # field is missing or weak. A field keeps the value from the
+        # narrowest pass, unless that value is weak and a wider one isn't
         available = {}
-        if company_result:
-            available["Company"] = company_result[0].strip()
-        if date_results.get(filename) and date_results[filename][0]:
-            available["Date"] = date_results[filename][0]
-        if invoice_results.get(filename) and invoice_results[filename][0]:
-            available["Invoice #"] = invoice_results[filename][0]
-        if card_results.get(filename) and card_results[filename][0]:
-            available["Card Number"] = card_results[filename][0]
+        weak = set()
+        document = DocumentText(full_path, regions)
+        for level, normalized in document.levels():
+            logging.debug(f"Normalized {level} text length: {len(normalized)}\n")
+            logging.debug(f"\nCurrent Normalized Text: {normalized}\n")
+            found, found_weak = search_fields(search_dir, full_path, normalized, parts,
+                                              valid_companies, custom_runner, document)
+            for field, value in found.items():
+                if field in available and (field not in weak or field in found_weak):
+                    continue
+                available[field] = value
+                if field in found_weak:
+                    weak.add(field)
+                else:
+                    weak.discard(field)
+            missing = [field for field in wanted if field not in available or field in weak]
+            if not missing:
+                logging.info(f"  Found {wanted} in the {level} pass")
+                break
+            logging.info(f"  Missing or weak {missing} after the {level} pass")
+        document.close()
 
         # Build new_parts using the user-chosen order
         # Skip any field that is empty ("") or not found
@@ -232,8 +147,10 @@ def apply_auto_naming(globals, directory, file_list=None):
                 key = f"/{field.replace(' #', 'Number').replace(' ', '')}"
                 meta[key] = available[field]
 
-        if "Card Number" in available:
-            meta["/CardNumber"] = available["Card Number"]
+        # Every other field found is written whether or not it's in the order
+        for field, value in available.items():
+            if field not in ORDER_ONLY_FIELDS:
+                meta[f"/{metadata_key(field)}"] = value
 
         if meta:
             metadata_to_write[filename] = meta
@@ -254,5 +171,169 @@ def apply_auto_naming(globals, directory, file_list=None):
             logging.error(f"Rename failed for {filename}: {e}")
 
     logging.info(f"Total renamed: {renamed}")
+    get_vendor_templates()[1].save()
+    get_backend_stats().save()
+    custom_runner.close()
 
     return renamed
+
+
+def _mask_template_hit(masked, hit):
+    """Masks a vendor template match; one found in the template's region is masked by its text."""
+    if hit.start is not None:
+        masked.mask_spans([(hit.start, hit.end)])
+    elif hit.matched.strip():
+        masked.mask_matches(re.escape(hit.matched.strip()))
+
+
+def search_fields(search_dir, full_path, normalized, parts, valid_companies, custom_runner,
+                  document=None):
+    """
+    Runs every search over one pass of a file's text.
+
+        Arguments:
+            search_dir:         Folder the file is in
+            full_path:          The file
+            normalized:         Normalized text of this pass
+            parts:              Words of the current filename
+            valid_companies:    Normalized company_map values
+            custom_runner:      The batch's CustomFieldRunner
+            document:           The file's DocumentText, for vendor template regions
+
+        Returns ({field name: value}, weak) for the fields found, ex:
+        ({"Company": "Acme"}, set()). weak holds the fields found only by a
+        pattern that a wider pass should be allowed to overrule.
+    """
+    filename = os.path.basename(full_path)
+    normalized_texts = {filename: MaskedText(normalized)}
+    new_parts = parts[:]
+
+    # Step 1: Search for the company
+    company_result = company_search(
+        directory=search_dir,
+        file_list=[full_path],
+        normalized_texts=normalized_texts).get(filename)
+
+    # Step 2: Apply company if found and different/missing, mask keywords if applied
+    if company_result:
+        company, matched, keyword_tuple = company_result
+        norm_company = normalize_text(company)
+        if not parts or normalize_text(parts[0]) != norm_company:
+            if norm_company in valid_companies:  # Safety check
+                new_parts = [company.capitalize()]
+                logging.info(f"  Applied company: {company}")
+
+                # Mask all keywords in one pass, longest first so "acme corp" beats "acme"
+                keywords = sorted({normalize_text(kw) for kw in keyword_tuple
+                                   if kw.lower() not in ['llc', 'inc']} - {""},
+                                  key=len, reverse=True)
+                if keywords:
+                    masked = normalized_texts[filename].mask_matches(
+                        rf'\b(?:{"|".join(re.escape(kw) for kw in keywords)})\b')
+                    logging.debug(f"  Masked {masked} matched company keywords: {keywords}")
+                    logging.debug(
+                        f"Visible text length: {len(normalized_texts[filename])}\n")
+
+    # Vendor templates go first; the generic searches only run for fields they miss
+    template_hits = {}
+    if company_result:
+        template_hits = apply_vendor_templates(company_result[0], normalized_texts[filename],
+                                               document.region if document else None)
+
+    # Step 3: Now search for dates using updated texts
+    if "date" in template_hits:
+        hit = template_hits["date"]
+        date_results = {filename: (hit.value, hit.matched, [hit])}
+    else:
+        date_results = date_search(
+            directory=search_dir,
+            file_list=[full_path],
+            normalized_texts=normalized_texts)
+
+    # Apply date if we have exactly company so far
+    if len(new_parts) == 1:
+        date_result = date_results.get(filename)
+        if date_result:
+            date, matched, dates = date_result
+            new_parts.append(date)
+            logging.info(f"  Applied date: {date} (matched '{matched}')")
+
+            # Mask every date candidate from the same scan, the chosen one included
+            old_length = len(normalized_texts[filename])
+            if "date" in template_hits:
+                _mask_template_hit(normalized_texts[filename], template_hits["date"])
+            else:
+                normalized_texts[filename].mask_spans((d.start, d.end) for d in dates)
+            logging.debug(f"  Masked {len(dates)} dates")
+            logging.debug(f"  Visible length: {old_length} becomes {len(normalized_texts[filename])}")
+
+    # Step 4: Now search for invoices using updated texts
+    if "invoice" in template_hits:
+        hit = template_hits["invoice"]
+        invoice_results = {filename: (hit.value, hit.matched, False)}
+    else:
+        invoice_results = invoice_number_search(
+            directory=search_dir,
+            file_list=[full_path],
+            normalized_texts=normalized_texts)
+
+    # Apply invoice if we have exactly company + date
+    if len(new_parts) == 2:
+        invoice_result = invoice_results.get(filename)
+        if invoice_result:
+            invoice, matched, _ = invoice_result
+            new_parts.append(invoice)
+            logging.info(f"  Applied invoice: {invoice}")
+            if "invoice" in template_hits:
+                _mask_template_hit(normalized_texts[filename], template_hits["invoice"])
+                logging.debug(f"  Masked template invoice match: {matched}")
+            elif matched:
+                normalized_texts[filename].mask_matches(rf'\b{re.escape(matched)}\b')
+                logging.debug(f"  Masked matched invoice: {matched}")
+                logging.debug(
+                    f"Visible text length: {len(normalized_texts[filename])}\n")
+
+    # Step 5: Search for the last 4 digits of a card number if present
+    if "card" in template_hits:
+        hit = template_hits["card"]
+        card_results = {filename: (hit.value, hit.matched)}
+    else:
+        card_results = card_number_search(
+            directory=search_dir,
+            file_list=[full_path],
+            normalized_texts=normalized_texts)
+
+    # Step 6: Total, tax, sales tax, terms and description in one shared scan
+    if all(stage.field in template_hits for stage in STAGES):
+        field_results = {}
+    else:
+        field_results = field_search(
+            directory=search_dir,
+            file_list=[full_path],
+            normalized_texts=normalized_texts).get(filename, {})
+    for stage in STAGES:
+        if stage.field in template_hits:
+            field_results[stage.field] = template_hits[stage.field]
+
+    # Step 7: User-defined fields, searched in the unmasked text
+    custom_results = custom_runner.search(MaskedText(normalized_texts[filename].text))
+
+    # Map field names to their extracted values (only if found)
+    available = {}
+    weak = set()
+    if company_result:
+        available["Company"] = company_result[0].strip()
+    if date_results.get(filename) and date_results[filename][0]:
+        available["Date"] = date_results[filename][0]
+    if invoice_results.get(filename) and invoice_results[filename][0]:
+        available["Invoice #"] = invoice_results[filename][0]
+        if invoice_results[filename][2]:
+            weak.add("Invoice #")
+    if card_results.get(filename) and card_results[filename][0]:
+        available["Card Number"] = card_results[filename][0]
+    for stage in STAGES:
+        if stage.field in field_results:
+            available[stage.label] = field_text(field_results[stage.field].value)
+    for name, hit in custom_results.items():
+        available[name] = hit.value
+    return available, weak
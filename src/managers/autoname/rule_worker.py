@@ -0,0 +1,54 @@
+# Managers/Autoname/rule_worker.py
+import re
+
+# Kept free of app imports: this module is loaded again in the worker process
+
+
+def rule_worker(connection):
+    """
+    Runs custom field regexes for custom_search in a separate process.
+
+        The parent can stop this process whenever a rule runs past its time
+        budget, which isn't possible for a regex running in the app's own
+        process.
+
+        Messages received:
+            ("text", text, segments):   The document the next rules search
+            ("rule", pattern):          Search the document for pattern
+            None:                       Stop
+
+        Replies to a rule with ("match", value, matched, start, end),
+        ("none",) or ("error", message)
+    """
+    compiled = {}
+    text, segments = "", []
+    connection.send(("ready",))
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        if message[0] == "text":
+            _, text, segments = message
+            continue
+
+        pattern = message[1]
+        try:
+            if pattern not in compiled:
+                compiled[pattern] = re.compile(pattern)
+            regex = compiled[pattern]
+            reply = ("none",)
+            for start, end in segments:
+                match = regex.search(text, start, end)
+                if match:
+                    if "value" in regex.groupindex:
+                        value = match.group("value")
+                    else:
+                        value = match.group(regex.groups)
+                    reply = ("match", value or "", match.group(0), match.start(), match.end())
+                    break
+        except Exception as e:
+            reply = ("error", str(e))
+        connection.send(reply)
@@ -0,0 +1,19 @@
+# Managers/Autoname/sales_tax_search.py
+from src.managers.autoname.search_helpers import FieldStage, MONEY, money_value, first_by_priority
+from src.managers.autoname.tax_search import RATE
+
+# Patterns for lowercase normalized text, in priority order
+SALES_TAX_TRIGGERS = [
+    # 1. Sales tax, optionally with its rate
+    rf'\bsales\s*(?:&|and)?\s*use\s+tax\s*{RATE}\s*[:#]?\s*{MONEY}',
+    rf'\bsales\s*tax\s*{RATE}\s*[:#]?\s*{MONEY}',
+
+    # 2. A single jurisdiction's tax line
+    rf'\b(?:state|county|city|local)\s+(?:sales\s+)?tax\s*{RATE}\s*[:#]?\s*{MONEY}',
+]
+
+# Every trigger starts with one of these. Keep in sync when adding triggers.
+SALES_TAX_ANCHORS = r'sales|state|county|city|local'
+
+STAGE = FieldStage("sales_tax", "Sales Tax", SALES_TAX_TRIGGERS, SALES_TAX_ANCHORS, money_value,
+                   first_by_priority)
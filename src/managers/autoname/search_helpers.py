@@ -1,8 +1,14 @@
 # Managers/Autoname/search_helpers.py
 import logging
-import pdfplumber
+import re
+import bisect
+from decimal import Decimal, InvalidOperation
 import os
 import platform
+from collections import namedtuple
+from src.managers.pdf_metadata import update_info
+from src.managers.metadata_index import get_index
+from src.managers.autoname.text_backends import open_document, DOCUMENT_TEXT_LIMIT
 
 os_name = platform.platform()
 
@@ -33,22 +39,269 @@ month_map = {
     'dec': '12', 'december': '12'
 }
 
+# Month names as they appear in normalized text, longest first so "march" beats "mar"
+MONTHS = "|".join(sorted(month_map, key=len, reverse=True))
+SHORT_MONTHS = "|".join(month for month in month_map if len(month) == 3)
+
+# (pattern, formatter) in priority order; each formatter gets the pattern's 3 groups
 date_patterns = [
-    (r'\b(\d{4})-(\d{2})-(\d{2})\b', lambda m: f"{m.group(2)}-{m.group(3)}-{m.group(1)[-2:]}"),
-    (r'\b(\d{1,2})/(\d{1,2})/(\d{4})\b', lambda m: f"{m.group(1).zfill(2)}-{m.group(2).zfill(2)}-{m.group(3)[-2:]}"),
-    (r'\b(\d{2})-([a-z]{3})-(\d{4})\b', lambda m: f"{month_map.get(m.group(2), '')}-{m.group(1)}-{m.group(3)[-2:]}" if month_map.get(m.group(2)) else None),
-    (r'\b(\d{1,2})\.(\d{1,2})\.(\d{2})\b', lambda m: f"{m.group(1).zfill(2)}-{m.group(2).zfill(2)}-{m.group(3)}"),
-    (r'\b([a-z]+)\s+(\d{1,2})\s+(\d{4})\b', lambda m: f"{month_map.get(m.group(1), '')}-{m.group(2).zfill(2)}-{m.group(3)[-2:]}" if month_map.get(m.group(1)) else None),
-    (r'\b([a-z]+)\s+(\d{1,2})(?:st|nd|rd|th)?\s*(\d{4})\b', lambda m: f"{month_map.get(m.group(1), '')}-{m.group(2).zfill(2)}-{m.group(3)[-2:]}" if month_map.get(m.group(1)) else None),
-    (r'\b(\d{1,2})[/-](\d{1,2})[/-](\d{2,4})\b', lambda m: f"{m.group(1).zfill(2)}-{m.group(2).zfill(2)}-{m.group(3).zfill(4)[-2:]}"),
+    (r'\b(\d{4})-(\d{2})-(\d{2})\b', lambda g: f"{g[1]}-{g[2]}-{g[0][-2:]}"),
+    (r'\b(\d{1,2})/(\d{1,2})/(\d{4})\b', lambda g: f"{g[0].zfill(2)}-{g[1].zfill(2)}-{g[2][-2:]}"),
+    (rf'\b(\d{{2}})-({SHORT_MONTHS})-(\d{{4}})\b', lambda g: f"{month_map[g[1]]}-{g[0]}-{g[2][-2:]}"),
+    (r'\b(\d{1,2})\.(\d{1,2})\.(\d{2})\b', lambda g: f"{g[0].zfill(2)}-{g[1].zfill(2)}-{g[2]}"),
+    (rf'\b({MONTHS})\s+(\d{{1,2}})\s+(\d{{4}})\b', lambda g: f"{month_map[g[0]]}-{g[1].zfill(2)}-{g[2][-2:]}"),
+    (rf'\b({MONTHS})\s+(\d{{1,2}})(?:st|nd|rd|th)?\s*(\d{{4}})\b', lambda g: f"{month_map[g[0]]}-{g[1].zfill(2)}-{g[2][-2:]}"),
+    (r'\b(\d{1,2})[/-](\d{1,2})[/-](\d{2,4})\b', lambda g: f"{g[0].zfill(2)}-{g[1].zfill(2)}-{g[2].zfill(4)[-2:]}"),
 ]
 
+# All date patterns as one alternation inside a lookahead, so a single
+# scan reports every candidate, including ones that overlap each other
+DATE_SCANNER = re.compile("(?=" + "|".join(f"(?P<date{priority}>{pattern})"
+                                            for priority, (pattern, _) in enumerate(date_patterns)) + ")")
+_DATE_GROUPS = [(DATE_SCANNER.groupindex[f"date{priority}"], formatter)
+                for priority, (_, formatter) in enumerate(date_patterns)]
+
+DateMatch = namedtuple("DateMatch", "start end text value priority")
+
+
+def find_dates(text, segments=None):
+    """
+    Finds every date candidate in normalized text in one pass.
+
+        Arguments:
+            text:       Normalized text
+            segments:   (start, end) ranges to search; all of text if None
+
+        Returns DateMatch(start, end, text, value, priority) tuples in text
+        order, where value is formatted MM-DD-YY and priority is the index
+        of the pattern in date_patterns (lower wins).
+    """
+    dates = []
+    for segment_start, segment_end in segments or [(0, len(text))]:
+        for match in DATE_SCANNER.finditer(text, segment_start, segment_end):
+            for priority, (group, formatter) in enumerate(_DATE_GROUPS):
+                start = match.start(group)
+                if start < 0:
+                    continue
+                value = formatter(match.group(group + 1, group + 2, group + 3))
+                if value and value.count('-') == 2:
+                    dates.append(DateMatch(start, match.end(group), match.group(group), value, priority))
+                break
+    return dates
+
+
+def best_date(dates):
+    """Returns the DateMatch from the highest priority pattern, earliest first, or None."""
+    return min(dates, key=lambda date: (date.priority, date.start), default=None)
+
+
+def remove_spans(text, spans):
+    """Returns text with each (start, end) span replaced by a space, in one pass."""
+    pieces = []
+    position = 0
+    for start, end in sorted(spans):
+        if end <= position:
+            continue
+        pieces.append(text[position:max(start, position)])
+        pieces.append(" ")
+        position = end
+    pieces.append(text[position:])
+    return "".join(pieces)
+
+
+class MaskedText:
+    """
+    Normalized text plus the spans earlier search stages have claimed.
+
+        The text itself never changes. Scrubbing a company keyword, date
+        or invoice number masks its span instead of rebuilding the string,
+        and later stages search only the visible segments between masks
+        (with pos/endpos, so nothing is copied). A mask acts like the
+        space the old scrubbing left behind: no match runs across one.
+
+        Arguments:
+            text:       Normalized text
+    """
+    def __init__(self, text):
+        self.text = text
+        self._masks = []  # Sorted, non-overlapping [start, end) spans
+        self._segments = None
+
+    def __bool__(self):
+        return bool(self.text)
+
+    def __len__(self):
+        """Number of visible characters."""
+        return len(self.text) - sum(end - start for start, end in self._masks)
+
+    def __str__(self):
+        """The visible text, masks replaced by spaces. Builds a copy; meant for logging."""
+        return remove_spans(self.text, self._masks)
+
+    def mask_spans(self, spans):
+        """Masks each (start, end) span. Returns how many were given."""
+        spans = [(start, end) for start, end in spans if end > start]
+        if not spans:
+            return 0
+        merged = []
+        for start, end in sorted(self._masks + spans):
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        self._masks = merged
+        self._segments = None
+        return len(spans)
+
+    def mask_matches(self, pattern):
+        """Masks every match of pattern (a regex string or compiled) in the visible text."""
+        if isinstance(pattern, str):
+            pattern = re.compile(pattern)
+        return self.mask_spans(match.span() for start, end in self.segments()
+                               for match in pattern.finditer(self.text, start, end))
+
+    def is_masked(self, position):
+        """True if the character at position is masked."""
+        i = bisect.bisect_right(self._masks, (position, float('inf'))) - 1
+        return i >= 0 and self._masks[i][0] <= position < self._masks[i][1]
+
+    def segments(self):
+        """Returns the visible (start, end) ranges in text order."""
+        if self._segments is None:
+            segments = []
+            position = 0
+            for start, end in self._masks:
+                if start > position:
+                    segments.append((position, start))
+                position = max(position, end)
+            if position < len(self.text):
+                segments.append((position, len(self.text)))
+            self._segments = segments
+        return self._segments
+
+
+def as_masked(text):
+    """Wraps plain normalized text in a MaskedText; MaskedText is returned as is."""
+    return text if isinstance(text, MaskedText) else MaskedText(text)
+
+
+def segment_search(pattern, text, segments, pos=0):
+    """
+    Returns the first match of a compiled pattern at or after pos that
+    lies wholly inside one of segments, or None.
+    """
+    for start, end in segments:
+        if end <= pos:
+            continue
+        match = pattern.search(text, max(start, pos), end)
+        if match:
+            return match
+    return None
+
+
+def segment_end(segments, position):
+    """Returns the end of the segment holding position, or position if it's masked."""
+    i = bisect.bisect_right(segments, (position, float('inf'))) - 1
+    if i >= 0 and segments[i][0] <= position < segments[i][1]:
+        return segments[i][1]
+    return position
+
+
+# ---- Amounts ----
+
+# Currency markers as they appear in normalized text -> ISO code
+CURRENCIES = {
+    "usd": "USD", "us$": "USD", "$": "USD", "cad": "CAD", "c$": "CAD", "aud": "AUD", "a$": "AUD",
+    "eur": "EUR", "€": "EUR", "gbp": "GBP", "£": "GBP", "jpy": "JPY", "¥": "JPY",
+}
+CURRENCY = "|".join(re.escape(marker) for marker in sorted(CURRENCIES, key=len, reverse=True))
+
+# A number with optional thousands separators (, . ' or space) and cents
+_NUMBER = r"\d{1,3}(?:[,.' ]\d{3})+(?:[.,]\d{2})?|\d+(?:[.,]\d{2})?"
+_CENTS = r"\d{1,3}(?:[,.' ]\d{3})*[.,]\d{2}|\d+[.,]\d{2}"
+
+# Money in one group: a currency marker and any number, or a number with cents
+MONEY = (rf"((?:{CURRENCY})\s?-?(?:{_NUMBER})(?:\s?(?:{CURRENCY}))?"
+         rf"|-?(?:{_CENTS})(?:\s?(?:{CURRENCY}))?)(?![\d.,]\d)")
+
+Amount = namedtuple("Amount", "value currency text")
+
+
+def parse_amount(text, decimal=None):
+    """
+    Parses money text like "$1,234.56", "1.234,56 eur" or "12,50" into an Amount.
+
+        The decimal separator is whichever of . and , comes last when both
+        appear, else the single separator if 1 or 2 digits follow it, else
+        there are no cents. Pass decimal="," or "." to force it.
+
+        Returns Amount(value: Decimal, currency: ISO code or None, text) or None
+    """
+    raw = text.strip()
+    currency = None
+    for marker in re.findall(CURRENCY, raw):
+        currency = CURRENCIES[marker]
+    number = re.sub(rf"{CURRENCY}|\s", "", raw)
+    negative = number.startswith("-")
+    number = number.lstrip("-").replace("'", "")
+    if not number or not number[0].isdigit():
+        return None
+
+    if decimal is None:
+        last_comma, last_dot = number.rfind(","), number.rfind(".")
+        if last_comma >= 0 and last_dot >= 0:
+            decimal = "," if last_comma > last_dot else "."
+        elif max(last_comma, last_dot) >= 0:
+            separator = "," if last_comma >= 0 else "."
+            cents = number.rsplit(separator, 1)[1]
+            decimal = separator if number.count(separator) == 1 and len(cents) in (1, 2) else None
+    thousands = {",", "."} - {decimal}
+    for separator in thousands:
+        number = number.replace(separator, "")
+    if decimal:
+        number = number.replace(decimal, ".")
+    try:
+        value = Decimal(number)
+    except InvalidOperation:
+        return None
+    return Amount(-value if negative else value, currency, raw)
+
+
+# ---- Field stages ----
+
+# One field of the shared field scan (see field_scanner.py). triggers are
+# regexes in priority order whose last group (or group named value) holds
+# the value, and every trigger starts with one of anchors; value(raw)
+# parses and validates it, returning None to reject; choose(candidates)
+# picks the result from every valid FieldMatch.
+FieldStage = namedtuple("FieldStage", "field label triggers anchors value choose")
+FieldMatch = namedtuple("FieldMatch", "field value matched start end priority source")
+
+
+def first_by_priority(candidates):
+    """The candidate from the highest priority trigger, earliest first."""
+    return min(candidates, key=lambda candidate: (candidate.priority, candidate.start), default=None)
+
+
+def field_text(value):
+    """Text for a field value in filenames and metadata; amounts get 2 decimals."""
+    if isinstance(value, Amount):
+        return f"{value.value:.2f}"
+    return str(value)
+
+
+def money_value(raw):
+    """Parses a captured amount, rejecting zero and negative amounts."""
+    amount = parse_amount(raw)
+    return amount if amount and amount.value > 0 else None
+
 
 def normalize_text(text):
     """
-    Normalize text by removing commas, extra spaces, and converting to lowercase.
+    Normalize text by removing commas not between digits, extra spaces, and converting to lowercase.
+    Commas between digits stay so amounts like 1,234.56 or 12,50 can be read.
     """
-    text = text.replace(',', '')  # Remove commas
+    text = re.sub(r'(?<!\d),|,(?!\d)', '', text)  # Remove commas
     return ' '.join(text.split()).lower()  # Returns normalized text
 
 
@@ -87,22 +340,20 @@ def extract_text_with_ocr(full_path):
 
 
 def extract_normalized_text(full_path):
-    """Extract and normalize text from a single PDF file."""
+    """Extract and normalize text from a single PDF file with the fastest usable backend."""
     text = ""
+    document = None
     try:
-        with pdfplumber.open(full_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + " "
-                if len(text) > 5000:
-                    break
+        document = open_document(full_path)
+        text = document.text(DOCUMENT_TEXT_LIMIT)
     except Exception as e:
         logging.warning(
-            f"pdfplumber failed on {os.path.basename(full_path)}: {e}")
-        text = extract_text_with_ocr(full_path)
+            f"Text extraction failed on {os.path.basename(full_path)}: {e}")
+    finally:
+        if document is not None:
+            document.close()
 
-    if not text.strip():
+    if not text.strip() and (document is None or document.name != "ocr"):
         logging.warning(
             f"No text extracted from {os.path.basename(full_path)} Trying OCR...")
         text = extract_text_with_ocr(full_path)
@@ -115,23 +366,17 @@ def write_pdf_metadata(file_metadata_dict: dict[str, dict], inbox_dir: str):
     file_metadata_dict: 
     {filename: {"Company": "Acme", "InvoiceDate": "2025-01-15", ...}}
     """
-    import os
-    from pypdf import PdfReader, PdfWriter
     updated = 0
     for filename, new_fields in file_metadata_dict.items():
         path = os.path.join(inbox_dir, filename)
         if not os.path.isfile(path):
             continue
         try:
-            reader = PdfReader(path)
-            writer = PdfWriter()
-            writer.append(reader)
-            meta = reader.metadata or {}
-            meta.update(new_fields)
-            writer.add_metadata(meta)
-            with open(path, "wb") as f:
-                writer.write(f)
-            updated += 1
+            if update_info(path, new_fields):
+                updated += 1
+                index = get_index()
+                if index is not None:
+                    index.record_write(path, new_fields)
         except Exception as e:
             logging.warning(f"Metadata write failed {filename}: {e}")
     logging.info(f"Updated metadata on {updated} files")
@@ -0,0 +1,21 @@
+# Managers/Autoname/tax_search.py
+from src.managers.autoname.search_helpers import FieldStage, MONEY, money_value, first_by_priority
+
+# An optional rate after the tax label, ex: "(8.5%)"
+RATE = r'(?:\(?\s*\d{1,2}(?:[.,]\d+)?\s*%\s*\)?)?'
+
+# Patterns for lowercase normalized text, in priority order. Sales tax has
+# its own stage; this one is the total tax on the document.
+TAX_TRIGGERS = [
+    # 1. Labelled tax totals
+    rf'\b(?:total\s+tax(?:es)?|tax\s+total|tax\s+amount|total\s+vat|vat\s+amount)\s*{RATE}\s*[:#]?\s*{MONEY}',
+
+    # 2. Plain tax, vat, gst or hst (not a tax id, exemption or rate line)
+    rf'(?<!sales\s)(?<!sales)\b(?:tax(?:es)?|vat|gst|hst)\b'
+    rf'(?!\s*(?:id|exempt|rate|number|no\.?|#|registration|reg\.?)\b)\s*{RATE}\s*[:#]?\s*{MONEY}',
+]
+
+# Every trigger starts with one of these. Keep in sync when adding triggers.
+TAX_ANCHORS = r'total|tax|vat|gst|hst'
+
+STAGE = FieldStage("tax", "Tax", TAX_TRIGGERS, TAX_ANCHORS, money_value, first_by_priority)
@@ -0,0 +1,42 @@
+# Managers/Autoname/terms_search.py
+import re
+from src.managers.autoname.search_helpers import FieldStage, first_by_priority
+
+# Patterns for lowercase normalized text, in priority order
+TERMS_TRIGGERS = [
+    # 1. Early payment discount, ex: "2% 10 net 30"
+    r'\b(\d{1,2}(?:\.\d+)?\s*%\s*\d{1,2}\s*(?:days\s*)?net\s*\d{1,3})\b',
+
+    # 2. Labelled terms
+    r'\b(?:payment\s+)?terms\s*[:#]?\s*(net\s*\d{1,3}|due\s+(?:up)?on\s+receipt|upon\s+receipt|'
+    r'c\.?o\.?d\.?|prepaid|eom|\d{1,3}\s+days)\b',
+
+    # 3. Terms anywhere
+    r'\b(net\s*\d{1,3})(?:\s*days)?\b',
+    r'\b(due\s+(?:up)?on\s+receipt|cash\s+on\s+delivery|payable\s+(?:up)?on\s+receipt)\b',
+]
+
+# Every trigger starts with one of these. Keep in sync when adding triggers.
+TERMS_ANCHORS = r'\b\d|payment|terms|net|due|cash|payable'
+
+
+def terms_value(raw):
+    """Normalizes captured terms, ex: "net30" -> "Net 30", "due on receipt" -> "Due Upon Receipt"."""
+    raw = " ".join(raw.split())
+    net = re.fullmatch(r'net\s*(\d{1,3})', raw)
+    if net:
+        return f"Net {int(net.group(1))}" if int(net.group(1)) else None
+    days = re.fullmatch(r'(\d{1,3})\s+days', raw)
+    if days:
+        return f"Net {int(days.group(1))}"
+    discount = re.fullmatch(r'(\d{1,2}(?:\.\d+)?)\s*%\s*(\d{1,2})\s*(?:days\s*)?net\s*(\d{1,3})', raw)
+    if discount:
+        return f"{discount.group(1)}% {discount.group(2)} Net {discount.group(3)}"
+    if "receipt" in raw:
+        return "Due Upon Receipt"
+    if re.fullmatch(r'c\.?o\.?d\.?|cash on delivery', raw):
+        return "COD"
+    return {"prepaid": "Prepaid", "eom": "EOM"}.get(raw)
+
+
+STAGE = FieldStage("terms", "Terms", TERMS_TRIGGERS, TERMS_ANCHORS, terms_value, first_by_priority)
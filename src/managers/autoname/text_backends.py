@@ -0,0 +1,534 @@
+# Managers/Autoname/text_backends.py
+import os
+import json
+import time
+import logging
+import threading
+from src.utils.load_settings import load_data_path
+
+try:
+    from pypdf import PdfReader
+    PYPDF_AVAILABLE = True
+except ImportError:
+    PYPDF_AVAILABLE = False
+
+try:
+    from pdfminer.pdfparser import PDFParser
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdfpage import PDFPage
+    from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+    from pdfminer.converter import PDFPageAggregator
+    from pdfminer.layout import LTChar, LTContainer
+    PDFMINER_AVAILABLE = True
+except ImportError:
+    PDFMINER_AVAILABLE = False
+
+try:
+    import pdfplumber
+    PDFPLUMBER_AVAILABLE = True
+except ImportError:
+    PDFPLUMBER_AVAILABLE = False
+
+STATS_FILENAME = "extraction_stats.json"
+MAX_FILE_RECORDS = 500  # files kept in the stats, oldest dropped first
+
+DOCUMENT_TEXT_LIMIT = 5000  # characters; a full read stops at the page that passes this
+
+# Text a backend gives for page 1 counts as usable if it has at least this
+# many characters, mostly letters, digits and spaces, in word-sized runs
+MIN_USABLE_CHARS = 20
+MIN_CLEAN_RATIO = 0.6
+MAX_AVERAGE_WORD = 20
+
+# Backends a file is tried with, fastest first until enough files are timed
+DEFAULT_ORDER = ("pypdf", "pdfminer", "pdfplumber")
+MIN_TIMED_FILES = 5  # page 1 probes a backend needs before its measured speed ranks it
+
+# Per-backend totals kept in the stats
+BACKEND_TOTALS = {"files": 0, "pages": 0, "seconds": 0.0, "unusable": 0, "probes": 0, "probe_seconds": 0.0}
+
+_stats = None
+_stats_lock = threading.Lock()
+
+
+def usable_text(text):
+    """True if extracted text looks like words, not nothing, (cid:x) codes or run-together glyphs."""
+    stripped = text.strip()
+    if len(stripped) < MIN_USABLE_CHARS or "(cid:" in stripped:
+        return False
+    clean = sum(1 for char in stripped if char.isalnum() or char.isspace())
+    words = stripped.split()
+    return (clean / len(stripped) >= MIN_CLEAN_RATIO
+            and len(stripped) / max(len(words), 1) <= MAX_AVERAGE_WORD)
+
+
+class BackendDocument:
+    """
+    An open PDF read through one extraction backend.
+
+        Page text is cached, so reading a region and later the whole page,
+        or the whole document, doesn't extract a page twice where the
+        backend can avoid it. Time spent extracting is added up and
+        recorded in the BackendStats when the document is closed.
+
+        Arguments:
+            full_path:  PDF to read
+    """
+    name = ""
+    regions = True  # False if the backend can only read the whole document
+
+    def __init__(self, full_path):
+        self.full_path = full_path
+        self.seconds = 0.0        # spent extracting, the probe included
+        self.probe_seconds = 0.0  # spent deciding on this backend
+        self.pages_read = 0
+        self.chars = 0
+        self._pages = {}
+        self._closed = False
+        self._open()
+
+    @property
+    def page_count(self):
+        raise NotImplementedError
+
+    def page_text(self, index):
+        """Text of one page (0-based), extracted once."""
+        if index not in self._pages:
+            start = time.perf_counter()
+            self._pages[index] = self._page_text(index) or ""
+            self.seconds += time.perf_counter() - start
+            self.pages_read += 1
+            self.chars += len(self._pages[index])
+        return self._pages[index]
+
+    def region_text(self, index, top, bottom):
+        """Text between two fractions of a page's height, measured from the top."""
+        before, start = self.seconds, time.perf_counter()
+        text = self._region_text(index, top, bottom) or ""
+        # The call is counted once; a page_text() inside it already added its part
+        self.seconds = before + time.perf_counter() - start
+        return text
+
+    def text(self, limit=DOCUMENT_TEXT_LIMIT):
+        """Text of the pages in order until it passes limit characters."""
+        text = ""
+        for index in range(self.page_count):
+            page_text = self.page_text(index)
+            if page_text:
+                text += page_text + " "
+            if len(text) > limit:
+                break
+        return text
+
+    def close(self):
+        """Closes the file and records the backend's timing for it."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._close()
+        except Exception as e:
+            logging.debug(f"Unable to close {os.path.basename(self.full_path)}: {e}")
+        get_backend_stats().record(self)
+
+    def discard(self):
+        """Closes without recording, for a backend that wasn't kept."""
+        self._closed = True
+        try:
+            self._close()
+        except Exception as e:
+            logging.debug(f"Unable to close {os.path.basename(self.full_path)}: {e}")
+
+    def _open(self):
+        raise NotImplementedError
+
+    def _page_text(self, index):
+        raise NotImplementedError
+
+    def _region_text(self, index, top, bottom):
+        return self.page_text(index)
+
+    def _close(self):
+        pass
+
+
+class PypdfDocument(BackendDocument):
+    """pypdf's plain text extraction: no layout analysis, the fastest backend."""
+    name = "pypdf"
+
+    def _open(self):
+        self._reader = PdfReader(self.full_path)
+        self._fragments = {}  # page index: [(y, text)] from the visitor
+
+    @property
+    def page_count(self):
+        return len(self._reader.pages)
+
+    def _page_text(self, index):
+        fragments = []
+
+        def visit(text, cm, tm, font, size):
+            # Baseline height on the page, in PDF units from the bottom
+            fragments.append((tm[4] * cm[1] + tm[5] * cm[3] + cm[5], text))
+
+        text = self._reader.pages[index].extract_text(visitor_text=visit)
+        self._fragments[index] = fragments
+        return text
+
+    def _region_text(self, index, top, bottom):
+        self.page_text(index)  # Collects the fragments
+        box = self._reader.pages[index].mediabox
+        height = float(box.top) - float(box.bottom)
+        low, high = float(box.top) - height * bottom, float(box.top) - height * top
+        return "".join(text for y, text in self._fragments[index] if low <= y <= high)
+
+
+class PdfminerDocument(BackendDocument):
+    """pdfminer without layout analysis: characters in content order, spaced by their gaps."""
+    name = "pdfminer"
+
+    def _open(self):
+        self._file = open(self.full_path, 'rb')
+        document = PDFDocument(PDFParser(self._file))
+        self._page_objects = list(PDFPage.create_pages(document))
+        manager = PDFResourceManager()
+        self._device = PDFPageAggregator(manager, laparams=None)
+        self._interpreter = PDFPageInterpreter(manager, self._device)
+        self._chars = {}  # page index: [(x0, y0, x1, y1, text)]
+
+    @property
+    def page_count(self):
+        return len(self._page_objects)
+
+    def _page_chars(self, index):
+        if index not in self._chars:
+            self._interpreter.process_page(self._page_objects[index])
+            self._chars[index] = list(_layout_chars(self._device.get_result()))
+        return self._chars[index]
+
+    def _page_text(self, index):
+        return _join_chars(self._page_chars(index))
+
+    def _region_text(self, index, top, bottom):
+        box = self._page_objects[index].mediabox
+        height = box[3] - box[1]
+        low, high = box[3] - height * bottom, box[3] - height * top
+        return _join_chars([char for char in self._page_chars(index) if low <= char[1] <= high])
+
+    def _close(self):
+        self._file.close()
+
+
+def _layout_chars(container):
+    """Yields (x0, y0, x1, y1, text) for every character in a layout, figures included, in order."""
+    for item in container:
+        if isinstance(item, LTChar):
+            yield item.x0, item.y0, item.x1, item.y1, item.get_text()
+        elif isinstance(item, LTContainer):
+            yield from _layout_chars(item)
+
+
+def _join_chars(chars):
+    """Joins characters into text, adding a space at word gaps and a newline where the line changes."""
+    parts = []
+    previous = None
+    for x0, y0, x1, y1, text in chars:
+        if previous:
+            size = max(previous[3] - previous[1], 1.0)
+            if abs(y0 - previous[1]) > size / 2:
+                parts.append("\n")
+            elif x0 - previous[2] > size * 0.1 and text != " " and previous[4] != " ":
+                parts.append(" ")
+        parts.append(text)
+        previous = (x0, y0, x1, y1, text)
+    return "".join(parts)
+
+
+class PlumberDocument(BackendDocument):
+    """pdfplumber with its layout analysis: the slowest, but reads the most layouts."""
+    name = "pdfplumber"
+
+    def _open(self):
+        self._pdf = pdfplumber.open(self.full_path)
+
+    @property
+    def page_count(self):
+        return len(self._pdf.pages)
+
+    def _page_text(self, index):
+        return self._pdf.pages[index].extract_text()
+
+    def _region_text(self, index, top, bottom):
+        # The page keeps its parsed characters, so a crop after the probe
+        # only lays out the characters inside it
+        page = self._pdf.pages[index]
+        x0, page_top, x1, page_bottom = page.bbox
+        height = page_bottom - page_top
+        return page.crop((x0, page_top + height * top, x1, page_top + height * bottom)).extract_text()
+
+    def _close(self):
+        self._pdf.close()
+
+
+class OcrDocument(BackendDocument):
+    """OCR of the page images, for PDFs without a usable text layer. Reads the whole document at once."""
+    name = "ocr"
+    regions = False
+
+    def _open(self):
+        pass
+
+    @property
+    def page_count(self):
+        return 1
+
+    def _page_text(self, index):
+        from src.managers.autoname.search_helpers import extract_text_with_ocr
+        return extract_text_with_ocr(self.full_path)
+
+
+BACKENDS = {
+    "pypdf": (PypdfDocument, PYPDF_AVAILABLE),
+    "pdfminer": (PdfminerDocument, PDFMINER_AVAILABLE),
+    "pdfplumber": (PlumberDocument, PDFPLUMBER_AVAILABLE),
+}
+
+
+class BackendStats:
+    """
+    Extraction timings per backend and the backend each file was read with.
+
+        Saved to extraction_stats.json in the local folder. Every backend
+        tried on a file has its page 1 extraction timed as a probe, kept or
+        not, and the probes rank the backends: once each installed backend
+        has MIN_TIMED_FILES of them, the one with the lowest average is
+        tried first.
+
+        Arguments:
+            path:       JSON file the stats are kept in
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = {"backends": {}, "files": {}}
+        self._changed = False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._data["backends"] = dict(data.get("backends", {}))
+            self._data["files"] = dict(data.get("files", {}))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning(f"Could not read {os.path.basename(path)}, starting over: {e}")
+
+    def _totals(self, name):
+        """The totals for a backend, filling in any missing from an older stats file."""
+        totals = self._data["backends"].setdefault(name, {})
+        for key, default in BACKEND_TOTALS.items():
+            totals.setdefault(key, default)
+        return totals
+
+    def record(self, document):
+        """Adds a closed document's timing to its backend and records it as its file's latest read."""
+        with self._lock:
+            totals = self._totals(document.name)
+            totals["files"] += 1
+            totals["pages"] += document.pages_read
+            totals["seconds"] += document.seconds
+
+            files = self._data["files"]
+            files.pop(os.path.basename(document.full_path), None)
+            files[os.path.basename(document.full_path)] = {
+                "backend": document.name,
+                "probe_ms": round(document.probe_seconds * 1000, 1),
+                "extract_ms": round(document.seconds * 1000, 1),
+                "pages": document.pages_read,
+                "chars": document.chars,
+            }
+            while len(files) > MAX_FILE_RECORDS:
+                del files[next(iter(files))]
+            self._changed = True
+        logging.info(f"Read {os.path.basename(document.full_path)} with {document.name}: "
+                     f"{document.pages_read} pages in {document.seconds * 1000:.1f} ms "
+                     f"(probe {document.probe_seconds * 1000:.1f} ms)")
+
+    def record_unusable(self, name):
+        """Counts a file a backend's text wasn't usable for."""
+        with self._lock:
+            self._totals(name)["unusable"] += 1
+            self._changed = True
+
+    def record_probe(self, name, seconds):
+        """Adds one page 1 extraction time to a backend."""
+        with self._lock:
+            totals = self._totals(name)
+            totals["probes"] += 1
+            totals["probe_seconds"] += seconds
+            self._changed = True
+
+    def needs_probes(self):
+        """Returns the installed backends with fewer than MIN_TIMED_FILES probes."""
+        with self._lock:
+            backends = self._data["backends"]
+            return [name for name in DEFAULT_ORDER if BACKENDS[name][1]
+                    and backends.get(name, {}).get("probes", 0) < MIN_TIMED_FILES]
+
+    def ranked(self):
+        """Returns the backend names to try, fastest probe first once they're all timed."""
+        if self.needs_probes():
+            return list(DEFAULT_ORDER)
+        with self._lock:
+            backends = self._data["backends"]
+            return sorted(DEFAULT_ORDER, key=lambda name: backends.get(name, {}).get("probe_seconds", 0.0)
+                          / max(backends.get(name, {}).get("probes", 0), 1))
+
+    def file_record(self, filename):
+        with self._lock:
+            return self._data["files"].get(filename)
+
+    def save(self):
+        """Writes the stats if anything changed since the last save."""
+        with self._lock:
+            if not self._changed:
+                return
+            try:
+                with open(self.path, 'w', encoding='utf-8') as f:
+                    json.dump(self._data, f, indent=4)
+                self._changed = False
+            except Exception as e:
+                logging.error(f"Failed to save {os.path.basename(self.path)}: {e}")
+                return
+            backends = dict(self._data["backends"])
+        for name, totals in backends.items():
+            per_page = totals["seconds"] * 1000 / max(totals["pages"], 1)
+            per_probe = totals["probe_seconds"] * 1000 / max(totals["probes"], 1)
+            logging.info(f"Extraction backend {name}: {totals['files']} files, {per_page:.1f} ms per page, "
+                         f"{per_probe:.1f} ms per page 1 probe, {totals['unusable']} unusable")
+
+
+def get_backend_stats():
+    """Returns the shared BackendStats, loading them on first use."""
+    global _stats
+    with _stats_lock:
+        if _stats is None:
+            try:
+                _stats = BackendStats(load_data_path("local", STATS_FILENAME))
+            except Exception as e:
+                logging.error(f"Unable to load extraction stats: {e}")
+                _stats = BackendStats(STATS_FILENAME)
+        return _stats
+
+
+def has_text_layer(full_path):
+    """Quick probe: True if any of the first pages uses a font, False if none do, None if unknown."""
+    if not PYPDF_AVAILABLE:
+        return None
+    try:
+        for page in PdfReader(full_path).pages[:3]:
+            resources = page.get("/Resources")
+            resources = resources.get_object() if resources is not None else {}
+            if "/Font" in resources:
+                return True
+            xobjects = resources.get("/XObject")
+            for xobject in (xobjects.get_object() if xobjects is not None else {}).values():
+                # Text inside form XObjects is common in exported invoices
+                xobject = xobject.get_object()
+                form_resources = xobject.get("/Resources")
+                if (xobject.get("/Subtype") == "/Form" and form_resources is not None
+                        and "/Font" in form_resources.get_object()):
+                    return True
+        return False
+    except Exception as e:
+        logging.debug(f"Text layer probe failed on {os.path.basename(full_path)}: {e}")
+        return None
+
+
+def open_document(full_path):
+    """
+    Opens a PDF with the fastest backend that gives usable text.
+
+        The probe first checks whether the PDF has a text layer at all; if
+        not it goes straight to OCR. Otherwise the backends are tried in
+        ranked order (see BackendStats.ranked) on page 1, and the first whose
+        text passes usable_text is kept, so the page read for the probe
+        isn't read again. A backend whose page 1 isn't usable, such as a
+        scanned cover sheet, is judged on its later pages, up to
+        DOCUMENT_TEXT_LIMIT, before the next one is tried. OCR is used only if no backend gives
+        usable text. Until every backend has been timed on MIN_TIMED_FILES
+        files, the ones not needed for this file are timed on its page 1
+        too, once the choice is made.
+
+        Returns an open BackendDocument; close it when done
+    """
+    filename = os.path.basename(full_path)
+    stats = get_backend_stats()
+    start = time.perf_counter()
+
+    if has_text_layer(full_path) is False:
+        logging.info(f"No text layer in {filename}, using OCR")
+        document = OcrDocument(full_path)
+        document.probe_seconds = time.perf_counter() - start
+        return document
+
+    tried = set()
+    chosen = None
+    for name in stats.ranked():
+        backend, available = BACKENDS[name]
+        if not available:
+            continue
+        tried.add(name)
+        document, sample = _probe(backend, full_path)
+        if document is None:
+            continue
+        if usable_text(sample) or _usable_after_page_1(document):
+            chosen = document
+            break
+        logging.debug(f"{name} text for {filename} isn't usable, trying the next backend")
+        stats.record_unusable(name)
+        document.discard()
+
+    if chosen is None:
+        logging.warning(f"No usable text extracted from {filename}. Trying OCR...")
+        chosen = OcrDocument(full_path)
+    chosen.probe_seconds = time.perf_counter() - start
+
+    # Times the backends the ranking doesn't know yet, a few files each
+    for name in stats.needs_probes():
+        if name not in tried:
+            document, _ = _probe(BACKENDS[name][0], full_path)
+            if document is not None:
+                document.discard()
+    return chosen
+
+
+def _usable_after_page_1(document):
+    """True if the text of the pages after page 1, up to DOCUMENT_TEXT_LIMIT, is usable. The pages read stay cached."""
+    text = ""
+    try:
+        for index in range(1, document.page_count):
+            text += document.page_text(index) + " "
+            if len(text) > DOCUMENT_TEXT_LIMIT:
+                break
+        return usable_text(text)
+    except Exception as e:
+        logging.warning(f"{document.name} failed on {os.path.basename(document.full_path)}: {e}")
+        return False
+
+
+def _probe(backend, full_path):
+    """Opens full_path with a backend and times page 1. Returns (document, text), (None, "") if it fails."""
+    document = None
+    try:
+        document = backend(full_path)
+        if not document.page_count:
+            return document, ""
+        start = time.perf_counter()
+        sample = document.page_text(0)
+        get_backend_stats().record_probe(backend.name, time.perf_counter() - start)
+        return document, sample
+    except Exception as e:
+        logging.warning(f"{backend.name} failed on {os.path.basename(full_path)}: {e}")
+        if document is not None:
+            document.discard()
+        return None, ""
@@ -0,0 +1,30 @@
+# Managers/Autoname/total_search.py
+from src.managers.autoname.search_helpers import FieldStage, MONEY, money_value
+
+# Patterns for lowercase normalized text, in priority order. Each captures
+# the amount in its last group.
+TOTAL_TRIGGERS = [
+    # 1. Amount still owed
+    rf'\b(?:grand\s+total|total\s+amount\s+due|total\s+due|amount\s+due|balance\s+due|please\s+pay)'
+    rf'\s*(?:\(\w{{3}}\))?\s*[:#]?\s*{MONEY}',
+
+    # 2. Labelled totals
+    rf'\b(?:invoice\s+total|total\s+amount|total\s+charges?|total\s+sale|amount\s+paid|total\s+paid)'
+    rf'\s*(?:\(\w{{3}}\))?\s*[:#]?\s*{MONEY}',
+
+    # 3. Bare "total" (not subtotal, sub total, total tax, total items, ...)
+    rf'(?<!sub\s)\btotal\b(?!\s*(?:tax|savings|items?|qty|quantity|weight|discount|units|pieces))'
+    rf'\s*(?:\(\w{{3}}\))?\s*[:#]?\s*{MONEY}',
+]
+
+# Every trigger starts with one of these. Keep in sync when adding triggers.
+TOTAL_ANCHORS = r'grand|total|amount|balance|please|invoice'
+
+
+def choose_total(candidates):
+    """Highest priority trigger first, then the largest amount; line totals are smaller."""
+    return min(candidates, key=lambda candidate: (candidate.priority, -candidate.value.value,
+                                                  candidate.start), default=None)
+
+
+STAGE = FieldStage("total", "Total", TOTAL_TRIGGERS, TOTAL_ANCHORS, money_value, choose_total)
@@ -0,0 +1,241 @@
+# Managers/Autoname/vendor_templates.py
+import os
+import re
+import json
+import logging
+import threading
+from collections import namedtuple
+from src.utils.load_settings import load_data_path
+from src.managers.autoname.search_helpers import segment_search
+from src.managers.autoname.pattern_packs import (WatchedJsonFile, FIELDS, compile_pattern,
+                                                 validate_pattern, pack_value, format_pack_date)
+from src.managers.autoname.inv_num_search import VALID_INVOICE
+from src.managers.autoname.card_num_search import card_digits
+from src.managers.autoname.field_scanner import STAGES_BY_FIELD
+from src.managers.autoname.page_regions import validate_region
+
+TEMPLATES_FILENAME = "vendor_templates.json"
+STATS_FILENAME = "vendor_template_stats.json"
+
+TEMPLATE_WINDOW = 120  # characters searched after a field anchor
+
+# region is where the fields are searched, ex: {"page": 1, "top": 0.0, "bottom": 0.33}
+VendorTemplate = namedtuple("VendorTemplate", "name company anchors fields region")
+TemplateField = namedtuple("TemplateField", "source regex order anchor window")
+
+# What a template found for one field; start/end is the span to mask, None
+# if it was found in the template's region rather than the pass's text
+TemplateMatch = namedtuple("TemplateMatch", "value matched start end template")
+
+_templates = None
+_stats = None
+_templates_lock = threading.Lock()
+
+
+class VendorTemplates(WatchedJsonFile):
+    """
+    Per-vendor extraction templates loaded from vendor_templates.json.
+
+        Templates are keyed by the company_map value company_search finds.
+        A template lists anchor phrases that confirm the layout (one must
+        appear), a regex per field and optionally the page region its
+        fields are searched in. A field may name its own anchor, in which
+        case its regex is searched only in the window after that phrase.
+        Disabled templates and invalid entries are skipped with a warning.
+        The file is reloaded when it changes on disk.
+
+        Arguments:
+            path:       vendor_templates.json to load
+    """
+    def for_company(self, company):
+        """Returns the enabled templates for a company, in file order."""
+        return self.current().get((company or "").lower(), [])
+
+    def _parse(self, data):
+        """Validates and compiles templates into {company: [VendorTemplate]}."""
+        if data is None:
+            return {}
+        templates = data["templates"]
+        if not isinstance(templates, list):
+            raise TypeError("'templates' must be a list")
+
+        by_company = {}
+        for position, entry in enumerate(templates):
+            if not isinstance(entry, dict) or not isinstance(entry.get("company"), str):
+                logging.warning(f"{TEMPLATES_FILENAME}: skipped template #{position + 1}, it needs a company")
+                continue
+            company = entry["company"]
+            name = str(entry.get("name") or f"{company} #{position + 1}")
+            if entry.get("enabled", True) is False:
+                continue
+            try:
+                anchors = [compile_pattern(re.escape(phrase.lower())) for phrase in entry.get("anchors", [])]
+                region = validate_region(entry["region"]) if "region" in entry else None
+                fields = {}
+                for field, spec in entry.get("fields", {}).items():
+                    if field not in FIELDS:
+                        raise ValueError(f"unknown field '{field}'")
+                    spec = spec if isinstance(spec, dict) else {"pattern": spec}
+                    source, regex, order = validate_pattern(
+                        field, spec if field == "date" else spec.get("pattern"))
+                    anchor = spec.get("anchor")
+                    anchor = compile_pattern(re.escape(anchor.lower())) if anchor else None
+                    window = int(spec.get("window", TEMPLATE_WINDOW))
+                    fields[field] = TemplateField(source, regex, order, anchor, window)
+            except (ValueError, TypeError, AttributeError) as e:
+                logging.warning(f"Vendor template '{name}' skipped: {e}")
+                continue
+            if not fields:
+                logging.warning(f"Vendor template '{name}' has no fields, skipped")
+                continue
+            by_company.setdefault(company.lower(), []).append(
+                VendorTemplate(name, company, anchors, fields, region))
+
+        logging.info(f"Loaded {sum(len(t) for t in by_company.values())} vendor templates "
+                     f"for {len(by_company)} companies")
+        return by_company
+
+
+class TemplateStats:
+    """
+    Hit counters per vendor template, saved to vendor_template_stats.json.
+
+        tried counts documents a template was applied to; hits and misses
+        count, per field, whether its regex produced a valid value.
+
+        Arguments:
+            path:       JSON file the counters are kept in
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._changed = False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self._counts = json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning(f"Could not read {os.path.basename(path)}, starting over: {e}")
+
+    def record(self, template, found):
+        """Counts one document a template was applied to; found holds the fields it matched."""
+        with self._lock:
+            counts = self._counts.setdefault(template.name, {"tried": 0, "hits": {}, "misses": {}})
+            counts["tried"] += 1
+            for field in template.fields:
+                bucket = counts["hits"] if field in found else counts["misses"]
+                bucket[field] = bucket.get(field, 0) + 1
+            self._changed = True
+
+    def hit_rates(self):
+        """Returns {template name: (tried, fields hit, fields tried)}, busiest first."""
+        with self._lock:
+            rates = {name: (counts["tried"], sum(counts["hits"].values()),
+                            sum(counts["hits"].values()) + sum(counts["misses"].values()))
+                     for name, counts in self._counts.items()}
+        return dict(sorted(rates.items(), key=lambda item: item[1][0], reverse=True))
+
+    def save(self):
+        """Writes the counters if anything changed since the last save."""
+        with self._lock:
+            if not self._changed:
+                return
+            try:
+                with open(self.path, 'w', encoding='utf-8') as f:
+                    json.dump(self._counts, f, indent=4)
+                self._changed = False
+            except Exception as e:
+                logging.error(f"Failed to save {os.path.basename(self.path)}: {e}")
+                return
+        for name, (tried, hit, total) in self.hit_rates().items():
+            rate = f"{hit / total:.0%}" if total else "n/a"
+            logging.info(f"Vendor template '{name}': {tried} documents, {hit}/{total} fields hit ({rate})")
+
+
+def get_vendor_templates():
+    """Returns the shared (VendorTemplates, TemplateStats), loading them on first use."""
+    global _templates, _stats
+    with _templates_lock:
+        if _templates is None:
+            try:
+                _templates = VendorTemplates(load_data_path("config", TEMPLATES_FILENAME))
+                _stats = TemplateStats(load_data_path("local", STATS_FILENAME))
+            except Exception as e:
+                logging.error(f"Unable to load vendor templates: {e}")
+                _templates = VendorTemplates(TEMPLATES_FILENAME)
+                _stats = TemplateStats(STATS_FILENAME)
+        return _templates, _stats
+
+
+def _field_match(field, spec, text, segments):
+    """Returns the first match of a template field, searched after its anchor if it has one."""
+    if spec.anchor is None:
+        return segment_search(spec.regex, text, segments)
+    for start, end in segments:
+        for anchor in spec.anchor.finditer(text, start, end):
+            match = spec.regex.search(text, anchor.end(), min(end, anchor.end() + spec.window))
+            if match:
+                return match
+    return None
+
+
+def _field_value(field, spec, match):
+    """Turns a template match into the field's value, or None if it isn't valid."""
+    if field == "date":
+        return format_pack_date(match.group(1, 2, 3), spec.order)
+    if field == "card":
+        return card_digits(pack_value(match), spec.source)
+    if field in STAGES_BY_FIELD:
+        return STAGES_BY_FIELD[field].value(pack_value(match))
+    candidate = pack_value(match).strip().upper()
+    return candidate if VALID_INVOICE.match(candidate) else None
+
+
+def apply_vendor_templates(company, masked, region_text=None):
+    """
+    Runs the templates for an identified company over a document.
+
+        Templates whose anchor phrases don't appear are skipped. The first
+        template to produce a field wins it; every template applied is
+        counted in the hit stats. A template with a region has its fields
+        searched in that region's text when region_text can give it, else
+        in the whole of masked.
+
+        Arguments:
+            company:        company_map value company_search found
+            masked:         The document's MaskedText
+            region_text:    Returns a region's normalized text, or None if
+                            it can't be read, ex: DocumentText.region
+
+        Returns {field: TemplateMatch} for the fields found
+    """
+    templates, stats = get_vendor_templates()
+    text, segments = masked.text, masked.segments()
+    found = {}
+    for template in templates.for_company(company):
+        if template.anchors and not any(segment_search(anchor, text, segments)
+                                        for anchor in template.anchors):
+            logging.debug(f"Vendor template '{template.name}' anchors not found")
+            continue
+        search_text, search_segments = text, segments
+        region = region_text(template.region) if template.region and region_text else None
+        if region is not None:
+            search_text, search_segments = region, [(0, len(region))]
+        hits = {}
+        for field, spec in template.fields.items():
+            match = _field_match(field, spec, search_text, search_segments)
+            value = _field_value(field, spec, match) if match else None
+            if value:
+                start, end = (None, None) if region is not None else match.span()
+                hits[field] = TemplateMatch(value, match.group(0), start, end, template.name)
+        stats.record(template, hits)
+        for field, hit in hits.items():
+            found.setdefault(field, hit)
+        if len(found) == len(FIELDS):
+            break
+    if found:
+        logging.info(f"Vendor templates for {company} found: "
+                     f"{ {field: hit.value for field, hit in found.items()} }")
+    return found
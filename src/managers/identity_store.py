@@ -0,0 +1,331 @@
+# src/managers/identity_store.py
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from collections.abc import MutableMapping
+from src.managers.pdf_metadata import read_info, read_info_many, update_info
+from src.managers.metadata_index import get_index
+
+DEFAULT_IDENTITY = "Invoice"
+FLUSH_DELAY = 2.0  # seconds of quiet before changed identities are written
+
+
+def _identity_from_info(info):
+    """Picks the identity out of an Info dictionary; older versions wrote /Subject."""
+    if info:
+        identity = info.get("/Identity") or info.get("/Subject")
+        if identity:
+            return identity
+    return DEFAULT_IDENTITY
+
+
+def _identity_from_record(record):
+    """Picks the identity out of a metadata index record."""
+    return (record or {}).get("identity") or DEFAULT_IDENTITY
+
+
+def read_identity(path):
+    """
+    Reads the identity saved in a PDF's metadata.
+
+        Returns DEFAULT_IDENTITY if none is set or the file can't be read.
+    """
+    try:
+        return _identity_from_info(read_info(path))
+    except Exception as e:
+        logging.debug(f"Could not read metadata from {os.path.basename(path)}: {e}")
+        return DEFAULT_IDENTITY
+
+
+def read_identities(folder, filenames=None):
+    """
+    Reads identities for PDFs in a folder on a thread pool.
+
+        Arguments:
+            folder:     Directory holding the PDFs
+            filenames:  Files to read; every PDF in folder if None
+
+        Returns {filename: identity}
+    """
+    if filenames is None:
+        filenames = [f for f in os.listdir(folder) if f.lower().endswith(".pdf")
+                     and os.path.isfile(os.path.join(folder, f))]
+    paths = {os.path.join(folder, filename): filename for filename in filenames}
+    infos = read_info_many(paths)
+    return {paths[path]: _identity_from_info(info) for path, info in infos.items()}
+
+
+class IdentityStore(MutableMapping):
+    """
+    In-memory map of filename -> identity ("Invoice", "Card", "Purchase").
+
+        Identities are read once, the first time a file is loaded, from
+        the metadata index (or the PDF itself if the index has no record),
+        and every later read is served from memory. A background load
+        answers what the index already knows right away and reads the rest
+        on a worker thread, telling listeners once they're in. Assignments
+        mark the file dirty only if the value differs from what is saved
+        in the PDF, and dirty files are written by a background flush
+        shortly after the last change. flush() writes whatever is still
+        dirty right away, for callers about to move or read the files.
+
+        Arguments:
+            folder:         Directory the filenames belong to
+            flush_delay:    Seconds to wait after a change before writing
+    """
+    def __init__(self, folder=None, flush_delay=FLUSH_DELAY):
+        self.folder = folder
+        self.flush_delay = flush_delay
+        self._values = {}  # filename -> identity shown in the app
+        self._saved = {}  # filename -> identity known to be in the PDF
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # One flush at a time
+        self._timer = None
+        self._loader = None  # ThreadPoolExecutor for background loads, made on first use
+        self._loads = set()  # background loads still running
+        self._generation = 0  # bumped on folder switches so stale loads are dropped
+        self._listeners = []  # callbacks taking (folder, filenames) after a background load
+        self._renamed = {}  # old -> new filename for files renamed before their load finished
+
+    # ---- Mapping interface ----
+
+    def __getitem__(self, filename):
+        with self._lock:
+            return self._values[filename]
+
+    def __setitem__(self, filename, identity):
+        with self._lock:
+            self._values[filename] = identity
+            if self._saved.get(filename) == identity:
+                self._dirty.discard(filename)
+                return
+            self._dirty.add(filename)
+        self.schedule_flush()
+
+    def __delitem__(self, filename):
+        with self._lock:
+            del self._values[filename]
+            self._saved.pop(filename, None)
+            self._dirty.discard(filename)
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._values))
+
+    def __len__(self):
+        with self._lock:
+            return len(self._values)
+
+    # ---- Loading ----
+
+    def add_listener(self, callback):
+        """Calls callback(folder, filenames) on the loader thread after each background load."""
+        self._listeners.append(callback)
+
+    def load(self, folder, filenames, background=False):
+        """
+        Reads identities for filenames not loaded yet.
+
+            Switching to another folder writes anything still dirty to the
+            old folder and starts over.
+
+            Arguments:
+                folder:     Directory holding the PDFs
+                filenames:  Files to load
+                background: Only answer from the metadata index here. The
+                            other files show DEFAULT_IDENTITY until the
+                            loader thread has read them, then listeners
+                            are called
+        """
+        if folder != self.folder:
+            if self.folder:
+                self.flush()
+            with self._lock:
+                self.folder = folder
+                self._generation += 1
+                self._renamed.clear()
+                self._values.clear()
+                self._saved.clear()
+                self._dirty.clear()
+
+        with self._lock:
+            missing = [name for name in filenames if name not in self._values]
+            for filename in missing:
+                self._values[filename] = DEFAULT_IDENTITY  # Until it's read
+            generation = self._generation
+        if not missing:
+            return
+        index = get_index()
+        if index is not None:
+            records = index.cached_many(os.path.join(folder, filename) for filename in missing)
+            self._apply(generation, {os.path.basename(path): _identity_from_record(record)
+                                     for path, record in records.items()})
+            unread = [name for name in missing if os.path.join(folder, name) not in records]
+        else:
+            unread = missing
+        if unread and background:
+            with self._lock:
+                if self._loader is None:
+                    self._loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Identity Load")
+                future = self._loader.submit(self._background_load, folder, unread, generation)
+                self._loads.add(future)
+            future.add_done_callback(self._load_done)
+        elif unread:
+            self._apply(generation, self._read(folder, unread))
+        logging.debug(f"Loaded {len(missing) - len(unread)} file identities from the index for {folder}, "
+                      f"{len(unread)} {'queued' if background else 'read'}")
+
+    def wait(self, timeout=None):
+        """Blocks until background loads finish, for callers that act on identities."""
+        with self._lock:
+            loads = set(self._loads)
+        if loads:
+            wait_futures(loads, timeout=timeout)
+
+    def identities(self, filenames):
+        """
+        Returns {filename: identity} for files about to be acted on.
+
+            Files a background load hasn't reached yet are read now, on
+            their own, so the answer doesn't depend on the whole load
+            finishing first.
+        """
+        with self._lock:
+            folder, generation = self.folder, self._generation
+            unread = [name for name in filenames if name in self._values
+                      and name not in self._saved and name not in self._dirty]
+        if unread and folder:
+            self._apply(generation, self._read(folder, unread))
+        with self._lock:
+            return {name: self._values.get(name, DEFAULT_IDENTITY) for name in filenames}
+
+    def _read(self, folder, filenames):
+        """Returns {filename: identity} read through the metadata index, or the PDFs without one."""
+        index = get_index()
+        if index is None:
+            return read_identities(folder, filenames)
+        records = index.get_many(os.path.join(folder, filename) for filename in filenames)
+        return {os.path.basename(path): _identity_from_record(record) for path, record in records.items()}
+
+    def _apply(self, generation, identities):
+        """Stores identities read from the files, unless the folder changed meanwhile."""
+        loaded = []
+        with self._lock:
+            if generation != self._generation:
+                return loaded
+            for filename, identity in identities.items():
+                while filename in self._renamed:
+                    filename = self._renamed.pop(filename)
+                if filename in self._saved or filename not in self._values:
+                    continue
+                self._saved[filename] = identity
+                if filename in self._dirty:
+                    # Changed while loading; keep the user's value
+                    if self._values.get(filename) == identity:
+                        self._dirty.discard(filename)
+                else:
+                    self._values[filename] = identity
+                loaded.append(filename)
+        return loaded
+
+    def _background_load(self, folder, filenames, generation):
+        loaded = self._apply(generation, self._read(folder, filenames))
+        if loaded:
+            for callback in list(self._listeners):
+                try:
+                    callback(folder, loaded)
+                except Exception as e:
+                    logging.error(f"Identity listener failed: {e}")
+
+    def _load_done(self, future):
+        with self._lock:
+            self._loads.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logging.error(f"Background identity load failed: {future.exception()}")
+
+    def rename(self, old_filename, new_filename):
+        """Moves an entry to a renamed file; the PDF metadata moves with the file."""
+        with self._lock:
+            if old_filename not in self._values:
+                return
+            self._values[new_filename] = self._values.pop(old_filename)
+            if old_filename in self._saved:
+                self._saved[new_filename] = self._saved.pop(old_filename)
+            else:
+                self._saved.pop(new_filename, None)
+                self._renamed[old_filename] = new_filename  # A background load may still report it
+            if old_filename in self._dirty:
+                self._dirty.discard(old_filename)
+                self._dirty.add(new_filename)
+            else:
+                self._dirty.discard(new_filename)
+
+    def dirty(self):
+        """Returns the filenames whose identity hasn't been written yet."""
+        with self._lock:
+            return set(self._dirty)
+
+    # ---- Writing ----
+
+    def schedule_flush(self):
+        """(Re)starts the countdown to a background flush."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.flush_delay, self._background_flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _background_flush(self):
+        try:
+            self.flush()
+        except Exception as e:
+            logging.error(f"Background identity flush failed: {e}")
+
+    def flush(self, folder=None):
+        """
+        Writes dirty identities to their PDFs. Returns how many files changed.
+
+            Files that fail stay dirty and are retried by the next flush.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                folder = self.folder or folder
+                pending = {name: self._values[name] for name in self._dirty if name in self._values}
+            if not pending or not folder or not os.path.isdir(folder):
+                return 0
+
+            written = 0
+            for filename, identity in pending.items():
+                filepath = os.path.join(folder, filename)
+                if not os.path.isfile(filepath):
+                    with self._lock:
+                        self._dirty.discard(filename)
+                    continue
+                try:
+                    if update_info(filepath, {"/Identity": identity}):
+                        written += 1
+                        index = get_index()
+                        if index is not None:
+                            index.record_write(filepath, {"/Identity": identity})
+                except Exception as e:
+                    logging.warning(f"Could not save identity to {filename}: {e}")
+                    continue
+                with self._lock:
+                    self._saved[filename] = identity
+                    if self._values.get(filename) == identity:
+                        self._dirty.discard(filename)
+
+            logging.info(f"Saved identity metadata to {written} PDF files.")
+            return written
+
+    def stop(self):
+        """Cancels the pending background flush and writes everything now."""
+        if self._loader is not None:
+            self._loader.shutdown(wait=False, cancel_futures=True)
+        self.flush()
@@ -0,0 +1,321 @@
+# src/managers/metadata_index.py
+from concurrent.futures import ThreadPoolExecutor
+from src.managers.pdf_metadata import read_info, READ_WORKERS
+from src.utils.load_settings import load_data_path
+import sqlite3
+import threading
+import hashlib
+import time
+import os
+import logging
+
+INDEX_FILENAME = "metadata_index.db"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Records for files just written by Invoice Buddy are kept under this key
+# prefix plus the path until the background rehash finds their new hash
+PENDING_PREFIX = "pending:"
+
+# Records no file has pointed to for this long are dropped
+STALE_RECORD_AGE = 180 * 24 * 3600  # seconds
+
+# Info dictionary key -> index column
+FIELDS = {
+    "/Identity": "identity",
+    "/Company": "company",
+    "/Date": "date",
+    "/InvoiceNumber": "invoice",
+    "/CardNumber": "card",
+}
+COLUMNS = tuple(FIELDS.values())
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS documents (
+    hash TEXT PRIMARY KEY,
+    {", ".join(f"{column} TEXT" for column in COLUMNS)},
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    synced_at REAL
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_by_hash ON files (hash);
+"""
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def content_hash(file_path):
+    """Returns a hex digest of the file contents, read in chunks."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_index():
+    """Returns the shared MetadataIndex, opening it on first use. None if it can't be opened."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            try:
+                _index = MetadataIndex(load_data_path("local", INDEX_FILENAME))
+                _index.prune()
+            except Exception as e:
+                logging.error(f"Unable to open metadata index: {e}")
+                return None
+        return _index
+
+
+def _fields_from_info(info):
+    """Maps an Info dictionary to index columns; older versions wrote the identity to /Subject."""
+    fields = {column: info.get(key) or None for key, column in FIELDS.items()}
+    fields["identity"] = fields["identity"] or info.get("/Subject") or None
+    return fields
+
+
+class MetadataIndex:
+    """
+    SQLite sidecar holding each PDF's identity and extracted fields.
+
+        Records are keyed by content hash, so they follow files through
+        renames, moves and copies. A second table remembers the hash of
+        each path by size and mtime; while a file is unchanged its record
+        is served without reading any of its bytes. The PDF's Info
+        dictionary stays the source of truth: files the index hasn't seen
+        (or that changed on disk) are read once and recorded, and writes
+        made by Invoice Buddy are recorded as they happen, without reading
+        the file back; its new hash is worked out later on a background
+        thread. cached_many() and scan_in_background() let the interface
+        answer from the index without waiting on PDF reads.
+
+        Arguments:
+            db_path:    SQLite database file
+    """
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        # Background scans and rehashes, one at a time behind the interface
+        self._background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Metadata Background")
+        self._rehashing = set()  # paths queued for a rehash
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._background.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            self._db.close()
+
+    # ---- Lookups ----
+
+    def get(self, path):
+        """Returns {"identity": ..., "company": ..., ...} for a PDF, or None if unreadable."""
+        return self.get_many([path]).get(path)
+
+    def cached_many(self, paths):
+        """
+        Returns {path: record} for the paths unchanged since they were indexed.
+
+            Only stats the files, so it's safe to call from the interface;
+            paths missing from the result need get_many() or
+            scan_in_background().
+        """
+        records = {}
+        with self._lock:
+            for path in paths:
+                record = self._cached(path)
+                if record is not None:
+                    records[path] = record
+        return records
+
+    def scan_in_background(self, paths, callback):
+        """
+        Runs get_many() on the background thread.
+
+            Arguments:
+                paths:      PDFs to look up
+                callback:   Called with {path: record} on the background
+                            thread, so Qt callers should pass a signal's emit
+        """
+        paths = list(paths)
+
+        def scan():
+            try:
+                callback(self.get_many(paths))
+            except Exception as e:
+                logging.error(f"Background metadata scan failed: {e}")
+
+        self._background.submit(scan)
+
+    def get_many(self, paths, workers=READ_WORKERS):
+        """
+        Returns {path: record} for many PDFs.
+
+            Unchanged files are answered from the index in one query. The
+            rest are hashed (and read if their content is new) on a thread
+            pool, then recorded in a single transaction.
+        """
+        paths = list(paths)
+        records = self.cached_many(paths)
+        misses = [path for path in paths if path not in records]
+        if not misses:
+            return records
+
+        def scan(path):
+            try:
+                stat = os.stat(path)
+                digest = content_hash(path)
+                with self._lock:
+                    known = self._record(digest)
+                info = None if known else read_info(path)
+                return path, stat, digest, known, info
+            except Exception as e:
+                logging.debug(f"Could not index {os.path.basename(path)}: {e}")
+                return path, None, None, None, None
+
+        if len(misses) < 2:
+            results = [scan(path) for path in misses]
+        else:
+            with ThreadPoolExecutor(max_workers=min(workers, len(misses)),
+                                    thread_name_prefix="Metadata Index") as pool:
+                results = list(pool.map(scan, misses))
+
+        now = time.time()
+        with self._lock, self._db:
+            for path, stat, digest, known, info in results:
+                if digest is None:
+                    records[path] = None
+                    continue
+                if not known:
+                    self._store(digest, _fields_from_info(info), now)
+                    known = self._record(digest)
+                self._remember_path(path, stat, digest)
+                records[path] = known
+        logging.debug(f"Metadata index: {len(paths) - len(misses)} cached, {len(misses)} scanned")
+        return records
+
+    def _cached(self, path):
+        """Returns the record for path if the file is unchanged since it was indexed."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        row = self._db.execute(
+            "SELECT hash FROM files WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)).fetchone()
+        return self._record(row["hash"]) if row else None
+
+    def _record(self, digest):
+        row = self._db.execute(
+            f"SELECT {', '.join(COLUMNS)}, created_at, updated_at, synced_at "
+            f"FROM documents WHERE hash = ?", (digest,)).fetchone()
+        return dict(row) if row else None
+
+    # ---- Writes ----
+
+    def record_write(self, path, fields):
+        """
+        Records metadata just written to a PDF.
+
+            The write changed the file's content hash. Hashing it again
+            would read the whole file, so the previous record for path is
+            carried over to a pending key, with fields applied on top, and
+            path is remembered under that key with its new size and mtime.
+            The real hash is filled in by a background rehash.
+
+            Arguments:
+                path:       PDF that was written
+                fields:     Info entries written, ex: {"/Identity": "Card"}
+        """
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            logging.debug(f"Could not index {os.path.basename(path)}: {e}")
+            return
+        fields = {key if key.startswith("/") else f"/{key}": value for key, value in fields.items()}
+        updates = {FIELDS[key]: str(value) for key, value in fields.items() if key in FIELDS}
+        pending = PENDING_PREFIX + os.path.abspath(path)
+        with self._lock:
+            row = self._db.execute("SELECT hash FROM files WHERE path = ?",
+                                   (os.path.abspath(path),)).fetchone()
+            previous = self._record(row["hash"]) if row else None
+        if previous is None:
+            # Never indexed: take the other fields from the file itself
+            try:
+                previous = _fields_from_info(read_info(path))
+            except Exception as e:
+                logging.debug(f"Could not read metadata from {os.path.basename(path)}: {e}")
+                previous = {}
+
+        merged = {column: previous.get(column) for column in COLUMNS}
+        merged.update(updates)
+        with self._lock, self._db:
+            self._store(pending, merged, time.time(), previous.get("created_at"))
+            self._remember_path(path, stat, pending)
+            if path in self._rehashing:
+                return
+            self._rehashing.add(path)
+        self._background.submit(self._rehash, path)
+
+    def _rehash(self, path):
+        """Background thread: moves a written file's record from its pending key to its content hash."""
+        with self._lock:
+            self._rehashing.discard(path)
+        try:
+            before = os.stat(path)
+            digest = content_hash(path)
+            after = os.stat(path)
+        except OSError as e:
+            logging.debug(f"Could not rehash {os.path.basename(path)}: {e}")
+            return
+        if (before.st_size, before.st_mtime_ns) != (after.st_size, after.st_mtime_ns):
+            return  # Written again while hashing; that write queued another rehash
+        with self._lock, self._db:
+            row = self._db.execute("SELECT hash, size, mtime_ns FROM files WHERE path = ?",
+                                   (os.path.abspath(path),)).fetchone()
+            if (row is None or not row["hash"].startswith(PENDING_PREFIX)
+                    or (row["size"], row["mtime_ns"]) != (after.st_size, after.st_mtime_ns)):
+                return
+            record = self._record(row["hash"])
+            if record is not None:
+                self._store(digest, record, time.time(), record.get("created_at"))
+            self._remember_path(path, after, digest)
+            self._db.execute("DELETE FROM documents WHERE hash = ?", (row["hash"],))
+
+    def _store(self, digest, fields, now, created_at=None):
+        values = [fields.get(column) for column in COLUMNS]
+        self._db.execute(
+            f"INSERT INTO documents (hash, {', '.join(COLUMNS)}, created_at, updated_at, synced_at) "
+            f"VALUES (?, {', '.join('?' for _ in COLUMNS)}, ?, ?, ?) "
+            f"ON CONFLICT(hash) DO UPDATE SET "
+            f"{', '.join(f'{column} = excluded.{column}' for column in COLUMNS)}, "
+            f"updated_at = excluded.updated_at, synced_at = excluded.synced_at",
+            (digest, *values, created_at or now, now, now))
+
+    def _remember_path(self, path, stat, digest):
+        self._db.execute(
+            "INSERT OR REPLACE INTO files (path, size, mtime_ns, hash) VALUES (?, ?, ?, ?)",
+            (os.path.abspath(path), stat.st_size, stat.st_mtime_ns, digest))
+
+    def prune(self, max_age=STALE_RECORD_AGE):
+        """Forgets paths that no longer exist and old records no path points to."""
+        with self._lock:
+            paths = [row["path"] for row in self._db.execute("SELECT path FROM files")]
+            missing = [(path,) for path in paths if not os.path.exists(path)]
+            with self._db:
+                self._db.executemany("DELETE FROM files WHERE path = ?", missing)
+                removed = self._db.execute(
+                    "DELETE FROM documents WHERE updated_at < ? "
+                    "AND hash NOT IN (SELECT hash FROM files)",
+                    (time.time() - max_age,)).rowcount
+        if missing or removed:
+            logging.debug(f"Metadata index pruned {len(missing)} paths and {removed} records")
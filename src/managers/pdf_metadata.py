@@ -0,0 +1,745 @@
+# src/managers/pdf_metadata.py
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.observers import mark_own_write
+import tempfile
+import shutil
+import struct
+import zlib
+import re
+import os
+import logging
+
+# Bytes read from the end of the file when looking for startxref
+TAIL_SIZE = 2048
+MAX_TAIL_SIZE = 64 * 1024
+
+# Window sizes tried when parsing an object in place
+READ_SIZES = (4096, 65536, 1024 * 1024)
+
+# Threads used to read metadata for many files at once
+READ_WORKERS = 8
+
+WHITESPACE = b" \t\r\n\f\0"
+DELIMITERS = b"()<>[]{}/%"
+
+XREF_SUBSECTION = re.compile(rb"[ \t\r\n]*(\d+)[ \t]+(\d+)[ \t]*(?:\r\n|\r|\n)")
+XREF_ENTRY = re.compile(rb"(\d{10}) (\d{5}) ([nf])")
+OBJECT_HEADER = re.compile(rb"[ \t\r\n]*(\d+)[ \t\r\n]+(\d+)[ \t\r\n]+obj")
+
+Ref = namedtuple("Ref", "num gen")
+
+
+class Name(str):
+    """A PDF name, stored with its leading slash, ex: '/Identity'."""
+
+
+class String(bytes):
+    """A PDF string, stored as its raw bytes."""
+
+
+class Stream:
+    """A PDF stream: its dictionary and undecoded data."""
+    def __init__(self, dictionary, data):
+        self.dictionary = dictionary
+        self.data = data
+
+
+class PdfParseError(Exception):
+    """Raised when the fast path can't handle a file, so callers fall back to pypdf."""
+
+
+class _Incomplete(Exception):
+    """Parsing ran off the end of the bytes read so far."""
+
+
+# ---- Parsing ----
+
+class _Parser:
+    """
+    Parses PDF objects out of a bytes buffer.
+
+        Arguments:
+            complete:   data runs to the end of the source, so running out
+                        of bytes while looking ahead is not an error
+    """
+
+    def __init__(self, data, pos=0, complete=False):
+        self.data = data
+        self.pos = pos
+        self.complete = complete
+
+    def _peek(self, offset=0):
+        if self.pos + offset >= len(self.data):
+            raise _Incomplete()
+        return self.data[self.pos + offset]
+
+    def skip_whitespace(self):
+        data = self.data
+        while True:
+            while self.pos < len(data) and data[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(data) and data[self.pos] == ord('%'):
+                while self.pos < len(data) and data[self.pos] not in b"\r\n":
+                    self.pos += 1
+                continue
+            if self.pos >= len(data):
+                raise _Incomplete()
+            return
+
+    def _token(self):
+        """Reads a bare token (number or keyword)."""
+        start = self.pos
+        while self.pos < len(self.data) and self.data[self.pos] not in WHITESPACE + DELIMITERS:
+            self.pos += 1
+        if self.pos >= len(self.data) and not (self.complete and self.pos > start):
+            raise _Incomplete()
+        return self.data[start:self.pos]
+
+    def parse_object(self):
+        self.skip_whitespace()
+        char = self._peek()
+        if char == ord('<'):
+            if self._peek(1) == ord('<'):
+                return self._dictionary()
+            return self._hex_string()
+        if char == ord('['):
+            return self._array()
+        if char == ord('('):
+            return self._literal_string()
+        if char == ord('/'):
+            return self._name()
+        token = self._token()
+        if token == b"true":
+            return True
+        if token == b"false":
+            return False
+        if token == b"null":
+            return None
+        if not token:
+            raise PdfParseError(f"Unexpected byte {chr(char)!r} at {self.pos}")
+        number = self._number(token)
+        if isinstance(number, int) and number >= 0:
+            # Could be the start of an indirect reference: "12 0 R"
+            saved = self.pos
+            try:
+                self.skip_whitespace()
+                generation = self._token()
+                if generation.isdigit():
+                    self.skip_whitespace()
+                    if self._peek() == ord('R'):
+                        self.pos += 1
+                        return Ref(number, int(generation))
+            except _Incomplete:
+                if not self.complete:
+                    raise
+            self.pos = saved
+        return number
+
+    def _number(self, token):
+        try:
+            return int(token)
+        except ValueError:
+            pass
+        try:
+            return float(token)
+        except ValueError:
+            raise PdfParseError(f"Unexpected token {token!r}")
+
+    def _dictionary(self):
+        self.pos += 2
+        result = {}
+        while True:
+            self.skip_whitespace()
+            if self._peek() == ord('>') and self._peek(1) == ord('>'):
+                self.pos += 2
+                return result
+            key = self.parse_object()
+            if not isinstance(key, Name):
+                raise PdfParseError(f"Dictionary key is not a name: {key!r}")
+            result[key] = self.parse_object()
+
+    def _array(self):
+        self.pos += 1
+        result = []
+        while True:
+            self.skip_whitespace()
+            if self._peek() == ord(']'):
+                self.pos += 1
+                return result
+            result.append(self.parse_object())
+
+    def _name(self):
+        self.pos += 1
+        raw = self._token()
+        decoded = re.sub(rb"#([0-9A-Fa-f]{2})", lambda m: bytes([int(m.group(1), 16)]), raw)
+        return Name("/" + decoded.decode("latin-1"))
+
+    def _hex_string(self):
+        end = self.data.find(b">", self.pos)
+        if end < 0:
+            raise _Incomplete()
+        digits = re.sub(rb"[^0-9A-Fa-f]", b"", self.data[self.pos + 1:end])
+        if len(digits) % 2:
+            digits += b"0"
+        self.pos = end + 1
+        return String(bytes.fromhex(digits.decode("ascii")))
+
+    def _literal_string(self):
+        self.pos += 1
+        out = bytearray()
+        depth = 1
+        escapes = {ord('n'): b"\n", ord('r'): b"\r", ord('t'): b"\t", ord('b'): b"\b",
+                   ord('f'): b"\f", ord('('): b"(", ord(')'): b")", ord('\\'): b"\\"}
+        while True:
+            char = self._peek()
+            self.pos += 1
+            if char == ord('\\'):
+                nxt = self._peek()
+                self.pos += 1
+                if nxt in escapes:
+                    out += escapes[nxt]
+                elif nxt in b"01234567":
+                    digits = bytes([nxt])
+                    while len(digits) < 3 and self._peek() in b"01234567":
+                        digits += bytes([self._peek()])
+                        self.pos += 1
+                    out.append(int(digits, 8) & 0xFF)
+                elif nxt == ord('\r'):
+                    if self._peek() == ord('\n'):
+                        self.pos += 1
+                elif nxt != ord('\n'):
+                    out.append(nxt)
+            elif char == ord('('):
+                depth += 1
+                out.append(char)
+            elif char == ord(')'):
+                depth -= 1
+                if depth == 0:
+                    return String(bytes(out))
+                out.append(char)
+            else:
+                out.append(char)
+
+    def parse_indirect(self):
+        """
+        Parses 'num gen obj <object>' at the current position.
+
+            Returns (Ref, object, stream_start), where stream_start is the
+            offset just past the 'stream' keyword, or None.
+        """
+        match = OBJECT_HEADER.match(self.data, self.pos)
+        if not match:
+            if len(self.data) - self.pos < 32:
+                raise _Incomplete()
+            raise PdfParseError(f"No object header at {self.pos}")
+        self.pos = match.end()
+        ref = Ref(int(match.group(1)), int(match.group(2)))
+        value = self.parse_object()
+        if isinstance(value, dict):
+            self.skip_whitespace()
+            if self.data.startswith(b"stream", self.pos):
+                return ref, value, self.pos + len(b"stream")
+            if len(self.data) - self.pos < len(b"stream"):
+                raise _Incomplete()
+        return ref, value, None
+
+
+# ---- Serialising ----
+
+def _serialize_name(name):
+    out = bytearray(b"/")
+    for byte in name[1:].encode("latin-1", "replace"):
+        if byte < 0x21 or byte > 0x7E or byte in DELIMITERS or byte == ord('#'):
+            out += f"#{byte:02X}".encode("ascii")
+        else:
+            out.append(byte)
+    return bytes(out)
+
+
+def serialize(value):
+    """Serialises a parsed object back to PDF syntax."""
+    if isinstance(value, Name):
+        return _serialize_name(value)
+    if isinstance(value, String):
+        return b"<" + value.hex().encode("ascii") + b">"
+    if isinstance(value, Ref):
+        return f"{value.num} {value.gen} R".encode("ascii")
+    if value is True:
+        return b"true"
+    if value is False:
+        return b"false"
+    if value is None:
+        return b"null"
+    if isinstance(value, int):
+        return str(value).encode("ascii")
+    if isinstance(value, float):
+        return (f"{value:.6f}".rstrip("0").rstrip(".") or "0").encode("ascii")
+    if isinstance(value, (list, tuple)):
+        return b"[" + b" ".join(serialize(item) for item in value) + b"]"
+    if isinstance(value, dict):
+        return b"<<" + b"".join(_serialize_name(k) + b" " + serialize(v) for k, v in value.items()) + b">>"
+    raise PdfParseError(f"Cannot serialise {type(value).__name__}")
+
+
+def text_string(text):
+    """Encodes text as a PDF text string: plain ASCII, or UTF-16BE with a BOM."""
+    text = str(text)
+    if all(0x20 <= ord(char) <= 0x7E for char in text):
+        return String(text.encode("ascii"))
+    return String(b"\xfe\xff" + text.encode("utf-16-be"))
+
+
+def decode_text(value):
+    """Decodes a PDF text string to str; other values are returned as is."""
+    if isinstance(value, String):
+        if value.startswith(b"\xfe\xff"):
+            return value[2:].decode("utf-16-be", "replace")
+        if value.startswith(b"\xef\xbb\xbf"):
+            return value[3:].decode("utf-8", "replace")
+        return value.decode("latin-1")
+    return value
+
+
+# ---- Reading the cross-reference chain ----
+
+class PdfFile:
+    """
+    Reads a PDF's trailer, cross-reference sections and single objects
+    without loading the rest of the file.
+
+        Handles classic xref tables, xref streams, hybrid files and object
+        streams with Flate or no compression. Anything else raises
+        PdfParseError so callers can fall back to pypdf.
+
+        Arguments:
+            f:  File opened in binary mode
+    """
+    def __init__(self, f):
+        self.f = f
+        self.size = f.seek(0, os.SEEK_END)
+        self.startxref = self._find_startxref()
+        self.sections = []  # Newest first; each maps num -> (type, field2, field3)
+        self.trailer = None
+        self.uses_xref_streams = False
+        self._object_streams = {}
+        self._load_chain()
+
+    def _read(self, pos, count):
+        self.f.seek(pos)
+        return self.f.read(count)
+
+    def _find_startxref(self):
+        tail_size = TAIL_SIZE
+        while True:
+            start = max(0, self.size - tail_size)
+            tail = self._read(start, self.size - start)
+            index = tail.rfind(b"startxref")
+            if index >= 0:
+                match = re.match(rb"startxref\s+(\d+)", tail[index:])
+                if match:
+                    return int(match.group(1))
+            if start == 0 or tail_size >= MAX_TAIL_SIZE:
+                raise PdfParseError("startxref not found")
+            tail_size *= 4
+
+    def _parse_at(self, pos, method):
+        """Runs a _Parser method at pos, reading a larger window if it runs out."""
+        for size in READ_SIZES:
+            if size >= self.size - pos:
+                break
+            parser = _Parser(self._read(pos, size))
+            try:
+                return parser, method(parser)
+            except _Incomplete:
+                continue
+        parser = _Parser(self._read(pos, self.size - pos), complete=True)
+        try:
+            return parser, method(parser)
+        except _Incomplete:
+            raise PdfParseError(f"Truncated object at {pos}")
+
+    def _load_chain(self):
+        offset = self.startxref
+        seen = set()
+        while offset is not None:
+            if offset in seen or offset >= self.size:
+                raise PdfParseError(f"Bad xref offset {offset}")
+            seen.add(offset)
+            head = self._read(offset, 4)
+            if head == b"xref":
+                trailer = self._load_table(offset)
+                # Hybrid files keep newer entries in a stream alongside the table
+                if isinstance(trailer.get("/XRefStm"), int):
+                    self._load_stream(trailer["/XRefStm"])
+            else:
+                trailer = self._load_stream(offset)
+                if self.trailer is None:
+                    self.uses_xref_streams = True
+            if self.trailer is None:
+                self.trailer = trailer
+            prev = trailer.get("/Prev")
+            offset = prev if isinstance(prev, int) else None
+
+    def _load_table(self, offset):
+        """Indexes a classic table's subsections and returns its trailer."""
+        subsections = []
+        pos = offset + 4
+        while True:
+            window = self._read(pos, 64)
+            match = XREF_SUBSECTION.match(window)
+            if not match:
+                stripped = window.lstrip(WHITESPACE)
+                if stripped.startswith(b"trailer"):
+                    pos += len(window) - len(stripped) + len(b"trailer")
+                    break
+                raise PdfParseError(f"Malformed xref table at {offset}")
+            first, count = int(match.group(1)), int(match.group(2))
+            subsections.append((first, count, pos + match.end()))
+            pos += match.end() + count * 20
+        self.sections.append(_TableSection(self, subsections))
+        _, trailer = self._parse_at(pos, lambda parser: parser.parse_object())
+        if not isinstance(trailer, dict):
+            raise PdfParseError("Trailer is not a dictionary")
+        return trailer
+
+    def _load_stream(self, offset):
+        """Decodes an xref stream and returns its dictionary."""
+        ref, stream = self._read_indirect(offset)
+        if not isinstance(stream, Stream) or stream.dictionary.get("/Type") != "/XRef":
+            raise PdfParseError(f"No xref stream at {offset}")
+        dictionary = stream.dictionary
+        data = self._decode(stream)
+        widths = dictionary.get("/W")
+        if not (isinstance(widths, list) and len(widths) == 3):
+            raise PdfParseError("Bad /W in xref stream")
+        index = dictionary.get("/Index", [0, dictionary.get("/Size", 0)])
+        row_size = sum(widths)
+        entries = {}
+        pos = 0
+        for first, count in zip(index[0::2], index[1::2]):
+            for num in range(first, first + count):
+                row = data[pos:pos + row_size]
+                pos += row_size
+                if len(row) < row_size:
+                    raise PdfParseError("Xref stream is too short")
+                fields = []
+                column = 0
+                for width in widths:
+                    fields.append(int.from_bytes(row[column:column + width], "big") if width else None)
+                    column += width
+                kind = 1 if fields[0] is None else fields[0]
+                entries[num] = (kind, fields[1], fields[2] or 0)
+        self.sections.append(entries)
+        return dictionary
+
+    def _read_indirect(self, offset):
+        """Returns (Ref, object) for the object at offset, reading stream data if present."""
+        parser, (ref, value, stream_start) = self._parse_at(offset, lambda p: p.parse_indirect())
+        if stream_start is None:
+            return ref, value
+        length = value.get("/Length")
+        if isinstance(length, Ref):
+            length = self.get_object(length)
+        if not isinstance(length, int):
+            raise PdfParseError("Stream has no usable /Length")
+        data_start = offset + stream_start
+        eol = self._read(data_start, 2)
+        data_start += 2 if eol == b"\r\n" else 1 if eol[:1] in (b"\n", b"\r") else 0
+        return ref, Stream(value, self._read(data_start, length))
+
+    def _decode(self, stream):
+        filters = stream.dictionary.get("/Filter")
+        params = stream.dictionary.get("/DecodeParms") or {}
+        if isinstance(filters, list):
+            if len(filters) > 1:
+                raise PdfParseError("Chained stream filters")
+            filters = filters[0] if filters else None
+            params = params[0] if isinstance(params, list) and params else params
+        if filters is None:
+            data = stream.data
+        elif filters == "/FlateDecode":
+            try:
+                data = zlib.decompress(stream.data)
+            except zlib.error as e:
+                raise PdfParseError(f"Bad Flate data: {e}")
+        else:
+            raise PdfParseError(f"Unsupported filter {filters}")
+        if isinstance(params, dict) and params.get("/Predictor", 1) >= 10:
+            data = _undo_png_predictor(data, params.get("/Columns", 1))
+        return data
+
+    def lookup(self, num):
+        """Returns the newest (type, field2, field3) entry for an object number."""
+        for section in self.sections:
+            entry = section.get(num)
+            if entry is not None:
+                return entry
+        return None
+
+    def get_object(self, ref):
+        """Resolves an indirect reference; returns None for free or missing objects."""
+        entry = self.lookup(ref.num)
+        if entry is None or entry[0] == 0:
+            return None
+        if entry[0] == 1:
+            found, value = self._read_indirect(entry[1])
+            if found.num != ref.num:
+                raise PdfParseError(f"Xref points object {ref.num} at object {found.num}")
+            return value
+        if entry[0] == 2:
+            return self._from_object_stream(entry[1], entry[2])
+        raise PdfParseError(f"Unknown xref entry type {entry[0]}")
+
+    def _from_object_stream(self, stream_num, index):
+        objects = self._object_streams.get(stream_num)
+        if objects is None:
+            stream = self.get_object(Ref(stream_num, 0))
+            if not isinstance(stream, Stream):
+                raise PdfParseError(f"Object stream {stream_num} is missing")
+            data = self._decode(stream)
+            count, first = stream.dictionary.get("/N", 0), stream.dictionary.get("/First", 0)
+            header = data[:first].split()
+            offsets = [int(header[i * 2 + 1]) for i in range(count)]
+            objects = self._object_streams[stream_num] = (data, first, offsets)
+        data, first, offsets = objects
+        if index >= len(offsets):
+            raise PdfParseError(f"Object stream {stream_num} has no index {index}")
+        try:
+            return _Parser(data, first + offsets[index], complete=True).parse_object()
+        except _Incomplete:
+            raise PdfParseError(f"Truncated object in stream {stream_num}")
+
+    def info(self):
+        """Returns the Info dictionary with its values still encoded, or {}."""
+        info = self.trailer.get("/Info")
+        if isinstance(info, Ref):
+            info = self.get_object(info)
+        return dict(info) if isinstance(info, dict) else {}
+
+
+class _TableSection:
+    """Lazily reads single entries from a classic xref table."""
+    def __init__(self, pdf, subsections):
+        self.pdf = pdf
+        self.subsections = subsections
+
+    def get(self, num):
+        for first, count, pos in self.subsections:
+            if first <= num < first + count:
+                match = XREF_ENTRY.match(self.pdf._read(pos + (num - first) * 20, 20))
+                if not match:
+                    raise PdfParseError(f"Malformed xref entry for object {num}")
+                offset, generation, kind = match.groups()
+                return (1 if kind == b"n" else 0, int(offset), int(generation))
+        return None
+
+
+def _undo_png_predictor(data, columns):
+    """Reverses the PNG row filters used by xref and object streams."""
+    row_size = columns + 1
+    previous = bytearray(columns)
+    out = bytearray()
+    for start in range(0, len(data), row_size):
+        kind, row = data[start], bytearray(data[start + 1:start + row_size])
+        if kind == 2:
+            for i in range(len(row)):
+                row[i] = (row[i] + previous[i]) & 0xFF
+        elif kind == 1:
+            for i in range(1, len(row)):
+                row[i] = (row[i] + row[i - 1]) & 0xFF
+        elif kind != 0:
+            raise PdfParseError(f"Unsupported PNG predictor {kind}")
+        out += row
+        previous = row
+    return bytes(out)
+
+
+# ---- Reading metadata ----
+
+def read_info(path):
+    """
+    Reads a PDF's Info dictionary as {"/Key": "text"}.
+
+        Only the trailer, the cross-reference entries leading to the Info
+        dictionary and the dictionary itself are read, so the cost doesn't
+        grow with the document. Files the fast path can't handle
+        (encrypted, unusual filters, damaged xref) are read with pypdf.
+        Raises OSError if the file can't be opened.
+    """
+    try:
+        with open(path, "rb") as f:
+            pdf = PdfFile(f)
+            if "/Encrypt" in pdf.trailer:
+                raise PdfParseError("Encrypted document")
+            info = {}
+            for key, value in pdf.info().items():
+                if isinstance(value, Ref):
+                    value = pdf.get_object(value)
+                if isinstance(value, (String, Name, int, float)):
+                    info[str(key)] = str(decode_text(value))
+            return info
+    except PdfParseError as e:
+        logging.debug(f"Fast metadata read not possible for {path}: {e}")
+
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    return {str(key): str(value) for key, value in (reader.metadata or {}).items()}
+
+
+def read_info_many(paths, workers=READ_WORKERS):
+    """
+    Reads Info dictionaries for many PDFs on a thread pool.
+
+        Returns {path: info}; files that can't be read map to None.
+    """
+    def read(path):
+        try:
+            return read_info(path)
+        except Exception as e:
+            logging.debug(f"Could not read metadata from {os.path.basename(path)}: {e}")
+            return None
+
+    paths = list(paths)
+    if len(paths) < 2:
+        return {path: read(path) for path in paths}
+    with ThreadPoolExecutor(max_workers=min(workers, len(paths)),
+                            thread_name_prefix="Metadata Reader") as pool:
+        return dict(zip(paths, pool.map(read, paths)))
+
+
+# ---- Writing ----
+
+def update_info(path, fields):
+    """
+    Sets entries in a PDF's Info dictionary.
+
+        Appends an incremental update holding only the new Info dictionary
+        and a one-entry cross-reference section, so the cost doesn't grow
+        with the document. Files the fast path can't handle (encrypted,
+        unusual filters, damaged xref) are rewritten with pypdf into a
+        temporary file that atomically replaces the original.
+
+        Arguments:
+            path:       PDF to update
+            fields:     {"/Identity": "Card", ...}; keys may omit the slash
+
+        Returns True if the file was changed, False if it was already up to date.
+    """
+    fields = {Name(key if key.startswith("/") else f"/{key}"): str(value)
+              for key, value in fields.items()}
+    try:
+        return _append_info_update(path, fields)
+    except PdfParseError as e:
+        logging.debug(f"Incremental metadata update not possible for {path}: {e}")
+        return _rewrite_info(path, fields)
+
+
+def _append_info_update(path, fields):
+    with open(path, "r+b") as f:
+        pdf = PdfFile(f)
+        trailer = pdf.trailer
+        if "/Encrypt" in trailer:
+            raise PdfParseError("Encrypted document")
+        if not isinstance(trailer.get("/Root"), Ref) or not isinstance(trailer.get("/Size"), int):
+            raise PdfParseError("Trailer is missing /Root or /Size")
+
+        info_ref = trailer.get("/Info")
+        info = pdf.info()
+        if all(decode_text(info.get(key)) == value for key, value in fields.items()):
+            return False
+        for key, value in fields.items():
+            info[key] = text_string(value)
+
+        size = trailer["/Size"]
+        if isinstance(info_ref, Ref):
+            info_num, info_gen = info_ref
+        else:
+            info_num, info_gen = size, 0
+        size = max(size, info_num + 1)
+
+        end = pdf.size
+        obj_offset = end + 1  # After the newline that starts the update
+        body = f"{info_num} {info_gen} obj\n".encode("ascii") + serialize(info) + b"\nendobj\n"
+        xref_offset = obj_offset + len(body)
+
+        if pdf.uses_xref_streams:
+            xref = _xref_stream(trailer, size, info_num, info_gen, obj_offset, xref_offset, pdf.startxref)
+        else:
+            new_trailer = {key: value for key, value in trailer.items()
+                           if key not in ("/Prev", "/XRefStm")}
+            new_trailer[Name("/Size")] = size
+            new_trailer[Name("/Info")] = Ref(info_num, info_gen)
+            new_trailer[Name("/Prev")] = pdf.startxref
+            # Entry 0 is repeated so readers don't mistake the table for a misnumbered one
+            xref = (f"xref\n0 1\n0000000000 65535 f\r\n"
+                    f"{info_num} 1\n{obj_offset:010d} {info_gen:05d} n\r\n".encode("ascii")
+                    + b"trailer\n" + serialize(new_trailer) + b"\n")
+        update = b"\n" + body + xref + f"startxref\n{xref_offset}\n%%EOF\n".encode("ascii")
+
+        mark_own_write(path)
+        try:
+            f.seek(end)
+            f.write(update)
+            f.flush()
+            os.fsync(f.fileno())
+        except Exception:
+            # Leave the previous revision exactly as it was
+            f.truncate(end)
+            raise
+    return True
+
+
+def _xref_stream(trailer, size, info_num, info_gen, obj_offset, xref_offset, prev):
+    """Builds an uncompressed xref stream covering the Info object and itself."""
+    xref_num = size
+    offset_width = max(4, (xref_offset.bit_length() + 7) // 8)
+    rows = sorted([(info_num, obj_offset, info_gen), (xref_num, xref_offset, 0)])
+    data = b"".join(b"\x01" + offset.to_bytes(offset_width, "big") + struct.pack(">H", gen)
+                    for _, offset, gen in rows)
+    dictionary = {
+        Name("/Type"): Name("/XRef"),
+        Name("/Size"): xref_num + 1,
+        Name("/W"): [1, offset_width, 2],
+        Name("/Index"): [value for num, _, _ in rows for value in (num, 1)],
+        Name("/Root"): trailer["/Root"],
+        Name("/Info"): Ref(info_num, info_gen),
+        Name("/Prev"): prev,
+    }
+    if "/ID" in trailer:
+        dictionary[Name("/ID")] = trailer["/ID"]
+    dictionary[Name("/Length")] = len(data)
+    return (f"{xref_num} 0 obj\n".encode("ascii") + serialize(dictionary)
+            + b"\nstream\n" + data + b"\nendstream\nendobj\n")
+
+
+def _rewrite_info(path, fields):
+    """Fallback: rewrites the PDF with pypdf, swapping it in atomically."""
+    from pypdf import PdfReader, PdfWriter
+
+    reader = PdfReader(path)
+    meta = dict(reader.metadata or {})
+    if all(meta.get(key) == value for key, value in fields.items()):
+        return False
+    writer = PdfWriter(clone_from=reader)
+    meta.update(fields)
+    writer.add_metadata(meta)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temp_path = tempfile.mkstemp(dir=directory, prefix=".~", suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as f:
+            writer.write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        shutil.copymode(path, temp_path)
+        mark_own_write(path)
+        os.replace(temp_path, path)
+    except Exception:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    return True
@@ -0,0 +1,360 @@
+# src/managers/print_queue.py
+import subprocess
+import threading
+import queue
+import platform
+import time
+import tempfile
+import glob
+import re
+import os
+import logging
+from pypdf import PdfReader, PdfWriter
+if platform.platform().startswith("Windows"):
+    import win32print
+    import win32api
+
+# Files sent per lp invocation
+LP_BATCH_SIZE = 50
+
+# Limits for one merged print job; larger selections are split
+MERGE_MAX_PAGES = 200
+MERGE_MAX_BYTES = 100 * 1024 * 1024  # bytes of source PDFs
+MERGE_PREFIX = "invoicebuddy-print-"
+MERGE_STALE_AGE = 3600  # seconds before a leftover merged file is removed
+
+# How often lpstat is asked about submitted jobs, and for how long
+LPSTAT_POLL_INTERVAL = 2  # seconds
+LPSTAT_TIMEOUT = 5  # seconds
+JOB_TRACK_TIMEOUT = 600  # seconds
+
+# Job states
+QUEUED = "queued"
+SUBMITTED = "submitted"
+PRINTING = "printing"
+COMPLETED = "completed"
+SENT = "sent"  # Handed to the Windows shell, which doesn't report back
+FAILED = "failed"
+UNKNOWN = "unknown"
+FINAL_STATES = {COMPLETED, SENT, FAILED, UNKNOWN}
+
+REQUEST_ID_PATTERN = re.compile(r"request id is (\S+)")
+
+
+class PrintJob:
+    """One spooler submission: a batch of files sent with a single lp call."""
+
+    def __init__(self, files, printer, merge=False):
+        self.files = list(files)
+        self.sources = list(files)  # Original files, when files is a merged copy
+        self.printer = printer
+        self.merge = merge  # Still to be merged by the worker
+        self.temporary = False  # files are merged copies to delete after spooling
+        self.job_id = None
+        self.state = QUEUED
+        self.message = ""
+        self.submitted_at = None
+
+    @property
+    def finished(self):
+        return self.state in FINAL_STATES
+
+    def describe(self):
+        """Returns a one-line status, ex: 'ENVY-42 (3 files): printing'."""
+        count = len(self.sources)
+        text = f"{self.job_id or 'Print job'} ({count} file{'' if count == 1 else 's'}): {self.state}"
+        return f"{text} - {self.message}" if self.message else text
+
+    def __repr__(self):
+        return f"PrintJob({self.describe()})"
+
+
+def merge_for_printing(files, max_pages=MERGE_MAX_PAGES, max_bytes=MERGE_MAX_BYTES):
+    """
+    Concatenates PDFs into as few temporary files as the limits allow.
+
+        Source files are read one at a time and each part is written out
+        as soon as the next file would push it past a limit, so only one
+        part is held in memory. A single file over the limits gets a part
+        of its own.
+
+        Arguments:
+            files:      PDFs to merge, in print order
+            max_pages:  Most pages in one part
+            max_bytes:  Most source bytes in one part
+
+        Returns ([(temp_path, source_files), ...], skipped_files)
+    """
+    parts = []
+    skipped = []
+    writer, sources, pages, size = None, [], 0, 0
+
+    def flush():
+        nonlocal writer, sources, pages, size
+        if writer is not None and sources:
+            handle, path = tempfile.mkstemp(prefix=MERGE_PREFIX, suffix=".pdf")
+            with os.fdopen(handle, 'wb') as f:
+                writer.write(f)
+            writer.close()
+            parts.append((path, sources))
+        writer, sources, pages, size = None, [], 0, 0
+
+    for file in files:
+        try:
+            file_size = os.path.getsize(file)
+            reader = PdfReader(file)
+            page_count = len(reader.pages)
+            if sources and (pages + page_count > max_pages or size + file_size > max_bytes):
+                flush()
+            if writer is None:
+                writer = PdfWriter()
+            writer.append(reader)
+        except Exception as e:
+            logging.warning(f"Skipping {file} in merged print job: {e}")
+            skipped.append(file)
+            continue
+        sources.append(file)
+        pages += page_count
+        size += file_size
+    flush()
+
+    logging.debug(f"Merged {len(files) - len(skipped)} files into {len(parts)} print job(s)")
+    return parts, skipped
+
+
+def remove_stale_merges(max_age=MERGE_STALE_AGE):
+    """Deletes merged print files left behind, ex: after Windows printing."""
+    cutoff = time.time() - max_age
+    for path in glob.glob(os.path.join(tempfile.gettempdir(), f"{MERGE_PREFIX}*.pdf")):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError as e:
+            logging.debug(f"Unable to remove {path}: {e}")
+
+
+class PrintQueue:
+    """
+    Submits print jobs and tracks them on a background thread.
+
+        Files are batched into as few lp calls as possible and each
+        request ID is followed with lpstat until it leaves the queue.
+        on_update(job) is called from the worker thread whenever a job
+        changes state, so UI callers must hand it to their main thread.
+
+        Arguments:
+            on_update:          Callback taking the PrintJob that changed
+            batch_size:         Files per lp invocation
+            poll_interval:      Seconds between lpstat checks
+            merge:              Concatenate each submission into merged jobs
+            merge_max_pages:    Page limit of one merged job
+            merge_max_bytes:    Source size limit of one merged job
+    """
+    def __init__(self, on_update=None, batch_size=LP_BATCH_SIZE, poll_interval=LPSTAT_POLL_INTERVAL,
+                 merge=False, merge_max_pages=MERGE_MAX_PAGES, merge_max_bytes=MERGE_MAX_BYTES):
+        self.on_update = on_update
+        self.merge = merge
+        self.merge_max_pages = merge_max_pages
+        self.merge_max_bytes = merge_max_bytes
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.jobs = []  # Every job this session, oldest first
+        self._pending = queue.Queue()
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, files, printer=None, merge=None):
+        """
+        Queues files for printing and returns the PrintJobs created.
+
+            With merge, a single job is returned; the worker splits it into
+            more jobs if the merged document passes the merge limits.
+        """
+        merge = self.merge if merge is None else merge
+        if merge:
+            jobs = [PrintJob(files, printer, merge=True)]
+        else:
+            batch_size = self.batch_size if platform.system() != "Windows" else len(files) or 1
+            jobs = [PrintJob(files[i:i + batch_size], printer)
+                    for i in range(0, len(files), batch_size)]
+        self._enqueue(jobs)
+        return jobs
+
+    def _enqueue(self, jobs):
+        with self._lock:
+            self.jobs.extend(jobs)
+            for job in jobs:
+                self._pending.put(job)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="Print Queue", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+        for job in jobs:
+            self._notify(job)
+
+    def active_jobs(self):
+        """Returns jobs that haven't reached a final state."""
+        return [job for job in self.jobs if not job.finished]
+
+    def wait(self, timeout=None):
+        """Blocks until the worker is idle. Returns False on timeout."""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+
+    # ---- Worker thread ----
+
+    def _run(self):
+        active = []
+        while True:
+            while True:
+                try:
+                    job = self._pending.get_nowait()
+                except queue.Empty:
+                    break
+                self._submit(job)
+                if not job.finished:
+                    active.append(job)
+
+            if active:
+                self._poll(active)
+                active = [job for job in active if not job.finished]
+
+            with self._lock:
+                if not active and self._pending.empty():
+                    self._thread = None
+                    return
+
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _submit(self, job):
+        files = [file for file in job.files if os.path.isfile(file)]
+        for missing in set(job.files) - set(files):
+            logging.warning(f"File not found: {missing}")
+        if not files:
+            self._set_state(job, FAILED, "No files found")
+            return
+        job.files = files
+        if not job.temporary:
+            job.sources = list(files)
+        if job.merge:
+            job.merge = False
+            self._merge(job)
+            if job.finished:
+                return
+        job.submitted_at = time.monotonic()
+        try:
+            if platform.system() == "Windows":
+                self._submit_windows(job)
+            else:
+                self._submit_lp(job)
+        except Exception as e:
+            logging.error(f"Unable to print due to: {e}")
+            self._set_state(job, FAILED, str(e))
+        finally:
+            # lp spools its own copy; Windows print handlers read the file
+            # later, so those are left to remove_stale_merges
+            if job.temporary and platform.system() != "Windows":
+                for file in job.files:
+                    try:
+                        os.remove(file)
+                    except OSError as e:
+                        logging.debug(f"Unable to remove merged print file {file}: {e}")
+
+    def _merge(self, job):
+        """Replaces job's files with a merged copy, queueing extra parts as new jobs."""
+        remove_stale_merges()
+        try:
+            parts, skipped = merge_for_printing(job.files, self.merge_max_pages, self.merge_max_bytes)
+        except Exception as e:
+            logging.error(f"Unable to merge files for printing: {e}")
+            self._set_state(job, FAILED, f"Merge failed: {e}")
+            return
+        if not parts:
+            self._set_state(job, FAILED, "No readable PDFs to merge")
+            return
+        if skipped:
+            job.message = f"Skipped {len(skipped)} unreadable file(s)"
+
+        (path, sources), extra = parts[0], parts[1:]
+        job.files, job.sources, job.temporary = [path], sources, True
+        extra_jobs = []
+        for path, sources in extra:
+            extra_job = PrintJob([path], job.printer)
+            extra_job.sources, extra_job.temporary = sources, True
+            extra_jobs.append(extra_job)
+        if extra_jobs:
+            self._enqueue(extra_jobs)
+
+    def _submit_lp(self, job):
+        args = ["lp"]
+        if job.printer:
+            args += ["-d", job.printer]
+        result = subprocess.run(args=args + job.files, text=True, capture_output=True,
+                                timeout=LPSTAT_TIMEOUT + len(job.files))
+        if result.returncode != 0:
+            self._set_state(job, FAILED, result.stderr.strip() or f"lp exited with {result.returncode}")
+            return
+        match = REQUEST_ID_PATTERN.search(result.stdout)
+        if not match:
+            # Accepted, but there is no request ID to follow
+            self._set_state(job, UNKNOWN, result.stdout.strip())
+            return
+        job.job_id = match.group(1)
+        logging.info(f"Submitted print job {job.job_id} with {len(job.files)} files")
+        self._set_state(job, SUBMITTED)
+
+    def _submit_windows(self, job):
+        # Check to make sure printer is available
+        handle = win32print.OpenPrinter(job.printer)
+        win32print.ClosePrinter(handle)
+        for file in job.files:
+            win32api.ShellExecute(
+                0,
+                "print",
+                file,
+                f'/d:"{job.printer}"',
+                os.path.dirname(file) or ".",
+                0)
+        self._set_state(job, SENT, "Sent to the Windows print handler")
+
+    def _poll(self, active):
+        """Updates active jobs from the list of not-yet-completed spooler jobs."""
+        try:
+            result = subprocess.run(args=["lpstat", "-o"], text=True,
+                                    capture_output=True, timeout=LPSTAT_TIMEOUT)
+            queued = {line.split()[0] for line in result.stdout.splitlines() if line.strip()}
+            ok = result.returncode == 0
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logging.debug(f"lpstat failed: {e}")
+            ok = False
+
+        for job in active:
+            if not ok:
+                if time.monotonic() - job.submitted_at > JOB_TRACK_TIMEOUT:
+                    self._set_state(job, UNKNOWN, "Lost track of the job")
+            elif job.job_id in queued:
+                self._set_state(job, PRINTING)
+            else:
+                self._set_state(job, COMPLETED)
+
+    def _set_state(self, job, state, message=None):
+        """Updates a job and notifies; message=None keeps the current message."""
+        message = job.message if message is None else message
+        if job.state == state and job.message == message:
+            return
+        job.state = state
+        job.message = message
+        self._notify(job)
+
+    def _notify(self, job):
+        logging.debug(f"{job.describe()}")
+        if self.on_update:
+            try:
+                self.on_update(job)
+            except Exception as e:
+                logging.error(f"Print status callback failed: {e}")
@@ -1,147 +1,200 @@
 import subprocess
+import threading
+import tkinter
 import platform
 import logging
+import json
+import time
 import os
 from PySide6.QtWidgets import QMessageBox
+from PySide6.QtCore import QObject, Signal
+from src.managers.print_queue import PrintQueue, COMPLETED, SENT, FAILED
+from src.utils.load_settings import load_data_path
+from src.utils.toast import show_toast
 if platform.platform().startswith("Windows"):
     import win32print
-    import win32api
+
+# Printer discovery is cached in memory and on disk for this long
+PRINTER_CACHE_TTL = 300  # seconds
+PRINTER_CACHE_FILE = "printers.json"
+
+
+class _PrintSignaler(QObject):
+    """Thread-safe bridge: hands print job and printer updates to the main thread."""
+    job_updated = Signal(object)
+    printers_updated = Signal(object)  # list of printer names
+
+
+def get_print_signaler(globals):
+    """Returns the shared _PrintSignaler, creating it on first use (main thread)."""
+    if globals.print_signaler is None:
+        globals.print_signaler = _PrintSignaler()
+        globals.print_signaler.job_updated.connect(lambda job: show_job_status(globals, job))
+        globals.print_signaler.printers_updated.connect(
+            lambda printers: _store_printers(globals, printers))
+    return globals.print_signaler
+
+
+def get_print_queue(globals):
+    """Returns the shared PrintQueue, creating it on first use (main thread)."""
+    if globals.print_queue is None:
+        if globals.legacy_mode:
+            def on_update(job):
+                globals.root.after(0, lambda: show_job_status(globals, job))
+        else:
+            on_update = get_print_signaler(globals).job_updated.emit
+        globals.print_queue = PrintQueue(on_update=on_update)
+    return globals.print_queue
 
 
 def print_selected_files(globals, filenames=None):
     """
-    Prints selected files on either Windows or Linux.
+    Queues selected files for printing on either Windows or Linux.
 
         Arguments:
             globals:    Global variables
             filenames:  Files to print
     """
     # Return early if not files are selected
-    success = None
     if not filenames:
         return
 
     # Create list of full paths
-    new_file_list = []
     if not globals.legacy_mode:
-        for file in filenames:
-            new_file_list.append(os.path.normpath(os.path.join(globals.inbox, file)))
-    filenames = new_file_list
+        filenames = [os.path.normpath(os.path.join(globals.inbox, file)) for file in filenames]
+    else:
+        filenames = list(filenames)
 
     logging.debug(f"Attempting to print files: {filenames}")
 
     try:
-        if platform.platform().startswith("Linux"):
-            reply = QMessageBox.question(
-                    None,
-                    "Print?",
-                    "Would you like to print selected files?",
-                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                    QMessageBox.StandardButton.No)
-            if reply == QMessageBox.StandardButton.Yes:
-                success = print_on_linux(globals, filenames)
-            else:
-                return
-            if success:
-                QMessageBox.information(
-                    None,
-                    "Print Succeeded",
-                    "Print successful!",
-                    QMessageBox.StandardButton.Ok,
-                    QMessageBox.StandardButton.Ok)
-                return
-            else:
-                QMessageBox.warning(
-                    None,
-                    "Print Failed",
-                    "Unable to print.",
-                    QMessageBox.StandardButton.Ok,
-                    QMessageBox.StandardButton.Ok)
-        else:
-            reply = QMessageBox.question(
-                    None,
-                    "Print?",
-                    "Would you like to print selected files?",
-                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                    QMessageBox.StandardButton.No)
-            if reply == QMessageBox.StandardButton.Yes:
-                success = print_on_windows(globals, filenames)
-            else:
-                return
-            if success:
-                QMessageBox.information(
-                    None,
-                    "Print Succeeded",
-                    "Print successful!",
-                    QMessageBox.StandardButton.Ok,
-                    QMessageBox.StandardButton.Ok)
-                return
-            else:
-                QMessageBox.warning(
-                    None,
-                    "Print Failed",
-                    "Unable to print.",
-                    QMessageBox.StandardButton.Ok,
-                    QMessageBox.StandardButton.Ok)
-            return False
+        reply = QMessageBox.question(
+                None,
+                "Print?",
+                "Would you like to print selected files?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                QMessageBox.StandardButton.No)
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        get_print_queue(globals).submit(sorted(filenames), globals.default_printer,
+                                        merge=globals.merge_print_jobs)
     except Exception as e:
         logging.error(f"Could not print due to: {e}")
 
 
-def print_on_linux(globals, filenames):
+def show_job_status(globals, job):
     """
-    Prints selected documents on Linux systems.
+    Shows print job progress. Runs in the MAIN thread.
 
-        Important Variables:
-            globals:        Global variables
-            filenames:      Files to print
-                            ex: ['/home/phillip/Phillip Inbox/4012 2.pdf']
+        Arguments:
+            globals:    Global variables
+            job:        PrintJob that changed state
     """
-    try:
-        for file in filenames:
-            if not os.path.isfile(file):
-                logging.warning(f"File not found: {file}")
-                continue
-            subprocess.run(args=["lp", f"{file}", "-d", f"{globals.default_printer}"])
-        return True
-    except Exception as e:
-        logging.error(f"Unable to print due to: {e}")
-        return False
+    if globals.legacy_mode:
+        if job.state in (COMPLETED, SENT):
+            show_toast(globals, f"Printed {len(job.files)} file(s)")
+        elif job.state == FAILED:
+            show_toast(globals, f"Print failed: {job.message}", _type="error")
+        return
+
+    if globals.print_status is not None:
+        recent = globals.print_queue.jobs[-10:]
+        active = [j for j in recent if not j.finished]
+        globals.print_status.setText((active[-1] if active else job).describe())
+        globals.print_status.setToolTip("\n".join(j.describe() for j in recent))
+        globals.print_status.setVisible(True)
 
+    if job.state == FAILED:
+        QMessageBox.warning(
+            None,
+            "Print Failed",
+            f"Unable to print {len(job.files)} file(s): {job.message}",
+            QMessageBox.StandardButton.Ok,
+            QMessageBox.StandardButton.Ok)
 
-def print_on_windows(globals, filenames):
+
+def cached_printers(globals):
     """
-    Prints selected documents on Windows systems.
+    Returns the last known printers immediately.
+
+        Falls back to the on-disk cache from the previous session, and
+        starts a background refresh when the cache is older than the TTL.
+        Called while building the settings tab, so discovery starts at
+        startup without delaying the window.
+    """
+    if not globals.printers:
+        globals.printers, globals.printers_updated_at = _load_printer_cache()
+    if time.time() - globals.printers_updated_at > PRINTER_CACHE_TTL:
+        refresh_printers(globals)
+    return list(globals.printers)
+
+
+def refresh_printers(globals, force=False):
+    """
+    Queries printers on a background thread.
 
         Arguments:
-            globals:        Global variables
-            filenames:      Files to print
+            globals:    Global variables
+            force:      Refresh even if the cache is still fresh
     """
-    # Check to make sure printer is available
+    if not force and time.time() - globals.printers_updated_at <= PRINTER_CACHE_TTL:
+        return
+    if globals.printer_discovery is not None and globals.printer_discovery.is_alive():
+        return
+
+    if globals.legacy_mode:
+        def deliver(printers):
+            globals.root.after(0, lambda: _store_printers(globals, printers))
+    else:
+        deliver = get_print_signaler(globals).printers_updated.emit
+
+    def discover():
+        start = time.monotonic()
+        try:
+            printers = query_printers()
+            logging.debug(f"Found {len(printers)} printers in {time.monotonic() - start:.2f}s")
+        except Exception as e:
+            logging.error(f"Unable to query printers due to: {e}")
+            printers = None
+        deliver(printers)
+
+    globals.printer_discovery = threading.Thread(target=discover, name="Printer Discovery", daemon=True)
+    globals.printer_discovery.start()
+
+
+def _store_printers(globals, printers):
+    """Runs in the MAIN thread with freshly discovered printers."""
+    if printers is None:
+        return  # Keep showing the last known list
+    globals.printers = printers
+    globals.printers_updated_at = time.time()
     try:
-        handle = win32print.OpenPrinter(globals.default_printer)
-        win32print.ClosePrinter(handle)
+        with open(load_data_path("cache", PRINTER_CACHE_FILE), 'w', encoding='utf-8') as f:
+            json.dump({"printers": printers, "updated": globals.printers_updated_at}, f)
     except Exception as e:
-        logging.error(f"Printer not is not available: {e}")
-        return False
-    
+        logging.warning(f"Unable to save printer cache: {e}")
+
+    # Let open printer pickers refill themselves
+    for listener in list(globals.printer_listeners):
+        try:
+            listener(printers)
+        except (RuntimeError, tkinter.TclError):
+            globals.printer_listeners.remove(listener)  # Widget was destroyed
+        except Exception as e:
+            logging.error(f"Unable to update printer list: {e}")
+
+
+def _load_printer_cache():
+    """Returns (printers, updated_at) from the on-disk cache, or ([], 0)."""
     try:
-        for file in filenames:
-            if not os.path.isfile(file):
-                logging.warning(f"File not found: {file}")
-                continue
-            win32api.ShellExecute(
-                0,
-                "print",
-                file,
-                f'/d:"{globals.default_printer}"',
-                os.path.dirname(file) or ".",
-                0)
-        return True
+        with open(load_data_path("cache", PRINTER_CACHE_FILE), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return list(data.get("printers", [])), float(data.get("updated", 0))
+    except FileNotFoundError:
+        return [], 0.0
     except Exception as e:
-        logging.error(f"Failed to print due to: {e}")
-        return False
-    
+        logging.warning(f"Unable to read printer cache: {e}")
+        return [], 0.0
 
 
 def query_printers():
@@ -1,20 +1,568 @@
 # src/qt_interface/qt_components/qt_mailbox.py
-from PySide6.QtWidgets import (QWidget, QVBoxLayout, QListWidget, QListWidgetItem, 
-                               QLabel, QHBoxLayout, QPushButton, QFrame, QCheckBox,
-                               QLineEdit, QSizePolicy)
-from PySide6.QtCore import Qt, QSize, QEvent
-from PySide6.QtGui import QIcon
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QListView, QLabel,
+                               QHBoxLayout, QCheckBox, QLineEdit,
+                               QStyledItemDelegate, QStyle, QStyleOptionButton,
+                               QApplication, QAbstractItemView)
+from PySide6.QtCore import (Qt, QSize, QRect, QEvent, QModelIndex,
+                            QAbstractListModel, Signal)
+from PySide6.QtGui import QIcon, QColor, QPen, QFont
+from src.utils.load_settings import load_data_path
+from src.qt_interface.qt_components.qt_thumbnails import ThumbnailCache
+from src.managers.identity_store import IdentityStore
+from src.qt_interface.qt_preview import show_file_details
 import os
+import bisect
 import logging
 
+IDENTITY_TYPES = ["Invoice", "Card", "Purchase"]
+
+# Custom data roles
+FilenameRole = Qt.UserRole + 1
+IdentityRole = Qt.UserRole + 2
+ThumbnailRole = Qt.UserRole + 3
+
+# Past this many changes a full model reset is cheaper than row-by-row updates
+RESET_THRESHOLD = 256
+
+
+def _scan_pdfs(folder_path):
+    """Returns {filename: inode} for every PDF directly inside folder_path."""
+    listing = {}
+    try:
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                if not entry.name.lower().endswith(".pdf"):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    listing[entry.name] = entry.inode() or None
+                except OSError:
+                    listing[entry.name] = None
+    except OSError as e:
+        logging.error(f"Unable to scan {folder_path}: {e}")
+    return listing
+
+
+def _inode_of(path):
+    """Returns the inode of path, or None if it can't be read."""
+    try:
+        return os.stat(path).st_ino or None
+    except OSError:
+        return None
+
+
+class MailboxModel(QAbstractListModel):
+    """
+    Sorted list of inbox PDFs with check state and identity.
+
+        globals.files is the backing list and globals.checked_files the
+        check state, so the rest of the app keeps reading them directly.
+    """
+    checked_changed = Signal()
+    file_renamed = Signal(str, str)  # old filename, new filename
+    identities_loaded = Signal(str, list)  # folder, filenames read in the background
+
+    def __init__(self, globals_obj, parent=None):
+        super().__init__(parent)
+        self.globals = globals_obj
+        self.globals.files = []
+        self.globals.checked_files = set()
+        if not isinstance(getattr(self.globals, "file_identity", None), IdentityStore):
+            self.globals.file_identity = IdentityStore()
+        self._inodes = {}  # filename -> inode, used to spot renames
+        self.folder_path = None
+        self.thumbnails = None  # ThumbnailCache, set by MailboxWidget
+
+        # Identities the metadata index doesn't know yet are read off the GUI
+        # thread; the signal brings the result back to repaint those rows
+        self.identities_loaded.connect(self._on_identities_loaded)
+        self.globals.file_identity.add_listener(self.identities_loaded.emit)
+
+    # ---- Qt model interface ----
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.globals.files)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.globals.files):
+            return None
+        filename = self.globals.files[index.row()]
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return os.path.splitext(filename)[0]
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if filename in self.globals.checked_files else Qt.Unchecked
+        if role == FilenameRole:
+            return filename
+        if role == IdentityRole:
+            return self.globals.file_identity.get(filename, "Invoice")
+        if role == ThumbnailRole:
+            if self.thumbnails is None or not self.folder_path:
+                return None
+            return self.thumbnails.get(os.path.join(self.folder_path, filename))
+        if role == Qt.ToolTipRole:
+            return filename
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid():
+            return False
+        filename = self.globals.files[index.row()]
+        if role == Qt.CheckStateRole:
+            if value in (Qt.Checked, Qt.Checked.value):
+                self.globals.checked_files.add(filename)
+            else:
+                self.globals.checked_files.discard(filename)
+            self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+            self.checked_changed.emit()
+            logging.debug(f"Checked: {filename}")
+            return True
+        if role == Qt.EditRole:
+            return self.rename_file(index.row(), value)
+        return False
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return (Qt.ItemIsEnabled | Qt.ItemIsSelectable |
+                Qt.ItemIsEditable | Qt.ItemIsUserCheckable)
+
+    # ---- Helpers ----
+
+    def filename(self, row):
+        """Returns the filename at row, or None if out of range."""
+        if 0 <= row < len(self.globals.files):
+            return self.globals.files[row]
+        return None
+
+    def row_of(self, filename):
+        """Returns the row of filename, or -1 if it is not listed."""
+        position = bisect.bisect_left(self.globals.files, filename)
+        if position < len(self.globals.files) and self.globals.files[position] == filename:
+            return position
+        return -1
+
+    def thumbnail_updated(self, path):
+        """Repaints the row whose thumbnail just finished rendering."""
+        if not self.folder_path or os.path.dirname(path) != self.folder_path:
+            return
+        row = self.row_of(os.path.basename(path))
+        if row >= 0:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [ThumbnailRole])
+
+    def _on_identities_loaded(self, folder, filenames):
+        """Runs in the MAIN thread; repaints rows whose identity was read in the background."""
+        if folder != self.folder_path:
+            return
+        for filename in filenames:
+            row = self.row_of(filename)
+            if row >= 0:
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [IdentityRole])
+
+    def sync(self, folder_path):
+        """
+        Syncs the model with the PDFs in folder_path, touching only changed rows.
+
+            Renames are detected by inode and applied as row moves, so
+            check state and the view's selection follow the file.
+        """
+        if folder_path != self.folder_path or not os.path.isdir(folder_path):
+            self.folder_path = folder_path
+            self._reset({} if not os.path.isdir(folder_path) else _scan_pdfs(folder_path))
+            return
+
+        listing = _scan_pdfs(folder_path)
+        current = set(self.globals.files)
+        removed = [f for f in self.globals.files if f not in listing]
+        added = [f for f in listing if f not in current]
+        if not (removed or added):
+            return
+
+        if len(removed) + len(added) > RESET_THRESHOLD:
+            self._reset(listing)
+            return
+
+        # Pair removed and added names that share an inode as renames
+        removed_by_inode = {self._inodes[f]: f for f in removed
+                            if self._inodes.get(f) is not None}
+        renamed = []
+        for filename in added:
+            old_name = removed_by_inode.pop(listing[filename], None)
+            if old_name:
+                renamed.append((old_name, filename))
+        renamed_old = {old for old, _ in renamed}
+        renamed_new = {new for _, new in renamed}
+
+        for filename in removed:
+            if filename not in renamed_old:
+                self._remove_row(filename)
+        for old_name, new_name in renamed:
+            self._move_row(old_name, new_name)
+        for filename in added:
+            if filename not in renamed_new:
+                self._insert_row(filename, listing[filename])
+
+        self.checked_changed.emit()
+        logging.debug(
+            f"Mailbox synced: {len(added) - len(renamed)} added, "
+            f"{len(removed) - len(renamed)} removed, {len(renamed)} renamed")
+
+    def apply_changes(self, changes):
+        """
+        Applies a watchdog ChangeSet without rescanning the folder.
+
+            Only paths directly inside the current folder are considered.
+            Large bursts fall back to a full sync.
+        """
+        if not self.folder_path or not os.path.isdir(self.folder_path):
+            return
+        if len(changes) > RESET_THRESHOLD:
+            self.sync(self.folder_path)
+            return
+
+        folder = os.path.normcase(os.path.normpath(self.folder_path))
+
+        def local_name(path):
+            """Returns the filename if path is a PDF in this folder, else None."""
+            if not path or not path.lower().endswith(".pdf"):
+                return None
+            if os.path.normcase(os.path.dirname(os.path.normpath(path))) != folder:
+                return None
+            return os.path.basename(path)
+
+        for path in changes.removed:
+            filename = local_name(path)
+            if filename:
+                self._remove_row(filename)
+
+        replaced = set()
+        for old_path, new_path in changes.renamed.items():
+            old_name, new_name = local_name(old_path), local_name(new_path)
+            if old_name and new_name and self.row_of(old_name) >= 0:
+                if self.row_of(new_name) >= 0:
+                    self._remove_row(new_name)  # Overwrote an existing file
+                self._move_row(old_name, new_name)
+                continue
+            if old_name:
+                self._remove_row(old_name)
+            # Moved in, or renamed from a PDF that wasn't listed
+            if new_name and self.row_of(new_name) >= 0:
+                replaced.add(new_path)
+            elif new_name and os.path.isfile(new_path):
+                self._insert_row(new_name, _inode_of(new_path))
+
+        for path in changes.added:
+            filename = local_name(path)
+            if not filename:
+                continue
+            if self.row_of(filename) >= 0:
+                replaced.add(path)  # Atomic replace of a listed file
+            elif os.path.isfile(path):
+                self._insert_row(filename, _inode_of(path))
+
+        for path in changes.modified | replaced:
+            filename = local_name(path)
+            row = self.row_of(filename) if filename else -1
+            if row >= 0:
+                if self.thumbnails is not None:
+                    self.thumbnails.forget(os.path.join(self.folder_path, filename))
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+
+        self.checked_changed.emit()
+        logging.debug(f"Mailbox applied changes: {changes}")
+
+    def set_all_checked(self, checked):
+        """Checks or unchecks every row with a single dataChanged emission."""
+        if checked:
+            self.globals.checked_files.update(self.globals.files)
+        else:
+            self.globals.checked_files.clear()
+        if self.globals.files:
+            self.dataChanged.emit(self.index(0), self.index(len(self.globals.files) - 1),
+                                  [Qt.CheckStateRole])
+        self.checked_changed.emit()
+
+    def cycle_identity(self, row):
+        """Cycles the identity of the file at row (Invoice, Card, Purchase)."""
+        filename = self.filename(row)
+        if filename is None:
+            return
+        current = self.globals.file_identity.get(filename, "Invoice")
+        position = IDENTITY_TYPES.index(current) if current in IDENTITY_TYPES else 0
+        new_type = IDENTITY_TYPES[(position + 1) % len(IDENTITY_TYPES)]
+        self.globals.file_identity[filename] = new_type
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [IdentityRole])
+        logging.info(f"{filename} changed to {new_type}")
+
+    def rename_file(self, row, new_base):
+        """Renames the file at row on disk and moves its row. Returns success."""
+        filename = self.filename(row)
+        new_base = str(new_base or "").strip()
+        if filename is None or not new_base or not self.folder_path:
+            return False
+
+        new_filename = new_base + ".pdf"
+        if new_filename == filename:
+            return False
+        old_path = os.path.join(self.folder_path, filename)
+        new_path = os.path.join(self.folder_path, new_filename)
+
+        if os.path.exists(new_path):
+            logging.error(f"File exists: {new_filename}")
+            return False
+
+        try:
+            os.rename(old_path, new_path)
+        except Exception as e:
+            logging.error(f"Rename failed: {e}")
+            return False
+
+        self._move_row(filename, new_filename)
+        logging.debug(f"Renamed: {filename} -> {new_filename}")
+        return True
+
+    # ---- Row bookkeeping ----
+
+    def _reset(self, listing):
+        """Replaces every row, keeping check state for files that remain."""
+        if self.folder_path and os.path.isdir(self.folder_path):
+            self.globals.file_identity.load(self.folder_path, listing, background=True)
+        self.beginResetModel()
+        self.globals.files[:] = sorted(listing)
+        self._inodes = dict(listing)
+        self.globals.checked_files.intersection_update(listing)
+        self.endResetModel()
+        self.checked_changed.emit()
+
+    def _insert_row(self, filename, inode=None):
+        self.globals.file_identity.load(self.folder_path, [filename], background=True)
+        position = bisect.bisect_left(self.globals.files, filename)
+        self.beginInsertRows(QModelIndex(), position, position)
+        self.globals.files.insert(position, filename)
+        self._inodes[filename] = inode
+        self.endInsertRows()
+
+    def _remove_row(self, filename):
+        position = self.row_of(filename)
+        if position < 0:
+            return
+        self.beginRemoveRows(QModelIndex(), position, position)
+        del self.globals.files[position]
+        self._inodes.pop(filename, None)
+        self.globals.checked_files.discard(filename)
+        self.endRemoveRows()
+
+    def _move_row(self, old_filename, new_filename):
+        """Renames a row and moves it to its new sorted position."""
+        old_position = self.row_of(old_filename)
+        if old_position < 0:
+            return
+        files_without = self.globals.files[:old_position] + self.globals.files[old_position + 1:]
+        new_position = bisect.bisect_left(files_without, new_filename)
+
+        def carry_state():
+            if old_filename in self.globals.checked_files:
+                self.globals.checked_files.discard(old_filename)
+                self.globals.checked_files.add(new_filename)
+            self.globals.file_identity.rename(old_filename, new_filename)
+            self._inodes[new_filename] = self._inodes.pop(old_filename, None)
+            if self.thumbnails is not None and self.folder_path:
+                self.thumbnails.move(os.path.join(self.folder_path, old_filename),
+                                     os.path.join(self.folder_path, new_filename))
+
+        if new_position == old_position:
+            self.globals.files[old_position] = new_filename
+            carry_state()
+            index = self.index(old_position)
+            self.dataChanged.emit(index, index)
+        else:
+            # Qt expects the destination relative to the list before the move
+            destination = new_position if new_position < old_position else new_position + 1
+            self.beginMoveRows(QModelIndex(), old_position, old_position,
+                               QModelIndex(), destination)
+            del self.globals.files[old_position]
+            self.globals.files.insert(new_position, new_filename)
+            carry_state()
+            self.endMoveRows()
+
+        if getattr(self.globals, 'selected_file', None) == old_filename:
+            self.globals.selected_file = new_filename
+        self.file_renamed.emit(old_filename, new_filename)
+
+
+class MailboxDelegate(QStyledItemDelegate):
+    """Paints the checkbox, identity icon, thumbnail and label for each mailbox row."""
+    ROW_HEIGHT = 50
+    MARGIN = 10
+    CHECKBOX_SIZE = 18
+    ICON_SIZE = 24
+    THUMBNAIL_SIZE = QSize(36, 46)
+
+    def __init__(self, globals_obj, parent=None):
+        super().__init__(parent)
+        self.globals = globals_obj
+        self.icons = self._load_identity_icons()
+
+    def _load_identity_icons(self):
+        """Loads one QIcon per identity from the spreadsheet icon settings."""
+        paths = {
+            "Invoice": getattr(self.globals, 'invoice_icon_path', "assets/invoice-1.png"),
+            "Card": getattr(self.globals, 'card_icon_path', "assets/card-1.png"),
+            "Purchase": getattr(self.globals, 'po_icon_path', "assets/invoice-2.png"),
+        }
+        icons = {}
+        for identity, path in paths.items():
+            try:
+                icons[identity] = QIcon(load_data_path("config", path))
+            except Exception as e:
+                logging.warning(f"Could not load {identity} icon: {e}")
+                icons[identity] = QIcon()
+        return icons
+
+    # ---- Geometry ----
+
+    def _checkbox_rect(self, rect):
+        top = rect.top() + (rect.height() - self.CHECKBOX_SIZE) // 2
+        return QRect(rect.left() + self.MARGIN, top, self.CHECKBOX_SIZE, self.CHECKBOX_SIZE)
+
+    def _icon_rect(self, rect):
+        left = self._checkbox_rect(rect).right() + self.MARGIN
+        top = rect.top() + (rect.height() - self.ICON_SIZE) // 2
+        return QRect(left, top, self.ICON_SIZE, self.ICON_SIZE)
+
+    def _thumbnail_rect(self, rect):
+        left = self._icon_rect(rect).right() + self.MARGIN
+        top = rect.top() + (rect.height() - self.THUMBNAIL_SIZE.height()) // 2
+        return QRect(left, top, self.THUMBNAIL_SIZE.width(), self.THUMBNAIL_SIZE.height())
+
+    def _text_rect(self, rect):
+        left = self._thumbnail_rect(rect).right() + self.MARGIN
+        return QRect(left, rect.top(), rect.right() - left - self.MARGIN, rect.height())
+
+    def sizeHint(self, option, index):
+        return QSize(0, self.ROW_HEIGHT)
+
+    def _is_checked(self, index):
+        return index.data(FilenameRole) in self.globals.checked_files
+
+    # ---- Painting ----
+
+    def paint(self, painter, option, index):
+        painter.save()
+        rect = option.rect
+        selected = bool(option.state & QStyle.State_Selected)
+        hovered = bool(option.state & QStyle.State_MouseOver)
+
+        # Background and bottom divider
+        if selected:
+            painter.fillRect(rect, QColor("#3a3a3a"))
+        elif hovered:
+            painter.fillRect(rect, QColor("#333"))
+        painter.setPen(QPen(QColor("#333")))
+        painter.drawLine(rect.bottomLeft(), rect.bottomRight())
+
+        # Checkbox
+        checkbox = QStyleOptionButton()
+        checkbox.rect = self._checkbox_rect(rect)
+        checkbox.state = QStyle.State_Enabled
+        if self._is_checked(index):
+            checkbox.state |= QStyle.State_On
+        else:
+            checkbox.state |= QStyle.State_Off
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawPrimitive(QStyle.PE_IndicatorCheckBox, checkbox, painter, option.widget)
+
+        # Identity icon
+        icon = self.icons.get(index.data(IdentityRole))
+        if icon and not icon.isNull():
+            icon.paint(painter, self._icon_rect(rect))
+
+        # Thumbnail, or a placeholder until the worker has rendered it
+        thumbnail_rect = self._thumbnail_rect(rect)
+        pixmap = index.data(ThumbnailRole)
+        if pixmap is not None and not pixmap.isNull():
+            size = pixmap.size().scaled(thumbnail_rect.size(), Qt.KeepAspectRatio)
+            target = QRect(0, 0, size.width(), size.height())
+            target.moveCenter(thumbnail_rect.center())
+            painter.drawPixmap(target, pixmap)
+        else:
+            painter.fillRect(thumbnail_rect, QColor("#3a3a3a"))
+
+        # Label
+        text_rect = self._text_rect(rect)
+        font = QFont(option.font)
+        font.setPixelSize(14)
+        painter.setFont(font)
+        painter.setPen(QColor("#2ecc71") if selected else QColor("white"))
+        text = painter.fontMetrics().elidedText(
+            index.data(Qt.DisplayRole) or "", Qt.ElideRight, text_rect.width())
+        painter.drawText(text_rect, Qt.AlignLeft | Qt.AlignVCenter, text)
+
+        painter.restore()
+
+    # ---- Interaction ----
+
+    def editorEvent(self, event, model, option, index):
+        """Toggles the checkbox or cycles the identity when they are clicked."""
+        if event.type() in (QEvent.MouseButtonPress, QEvent.MouseButtonRelease,
+                            QEvent.MouseButtonDblClick):
+            if event.button() != Qt.LeftButton:
+                return False
+            pos = event.position().toPoint()
+            on_checkbox = self._checkbox_rect(option.rect).adjusted(-4, -4, 4, 4).contains(pos)
+            on_icon = self._icon_rect(option.rect).contains(pos)
+            if not (on_checkbox or on_icon):
+                return False
+            # Swallow presses so clicking a control doesn't change the preview
+            if event.type() == QEvent.MouseButtonRelease:
+                if on_checkbox:
+                    model.setData(index, Qt.Unchecked if self._is_checked(index) else Qt.Checked,
+                                  Qt.CheckStateRole)
+                else:
+                    model.cycle_identity(index.row())
+            return True
+        return super().editorEvent(event, model, option, index)
+
+    def createEditor(self, parent, option, index):
+        line_edit = QLineEdit(parent)
+        line_edit.setStyleSheet("""
+            QLineEdit {
+                background-color: #333;
+                color: white;
+                border: 1px solid #555;
+                border-radius: 3px;
+                font-size: 14px;
+                font-family: inherit;
+            }
+            QLineEdit:focus { border: 1px solid #2ecc71; }
+        """)
+        return line_edit
+
+    def setEditorData(self, editor, index):
+        editor.setText(index.data(Qt.EditRole) or "")
+        editor.selectAll()
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.text(), Qt.EditRole)
+
+    def updateEditorGeometry(self, editor, option, index):
+        text_rect = self._text_rect(option.rect)
+        height = 25
+        top = text_rect.top() + (text_rect.height() - height) // 2
+        editor.setGeometry(QRect(text_rect.left(), top, text_rect.width(), height))
+
 
 class MailboxWidget(QWidget):
     def __init__(self, globals_obj, parent=None):
         super().__init__(parent)
         self.globals = globals_obj
-        self.globals.files = []  # Store ALL filenames
         self.selected_files = set()
-        self.globals.checked_files = set()
 
         # Layout
         layout = QVBoxLayout(self)
@@ -33,8 +581,8 @@ class MailboxWidget(QWidget):
         # Header Label
         self.header_label = QLabel("Inbox")
         self.header_label.setStyleSheet("""
-            font-size: 18px; 
-            font-weight: bold; 
+            font-size: 18px;
+            font-weight: bold;
             color: white;
             padding: 0; /* No extra padding, let the layout handle it */
             border-bottom: 1px solid #333; /* Just the bottom line */
@@ -45,113 +593,71 @@ class MailboxWidget(QWidget):
 
         layout.addLayout(header_layout)
 
-        # The List
-        self.list_widget = QListWidget()
-        self.list_widget.setStyleSheet("""
-            QListWidget {
+        # Model, Delegate and View
+        self.model = MailboxModel(globals_obj, self)
+        self.delegate = MailboxDelegate(globals_obj, self)
+        self.thumbnails = ThumbnailCache(self)
+        self.thumbnails.thumbnail_ready.connect(self.model.thumbnail_updated)
+        self.model.thumbnails = self.thumbnails
+
+        self.list_view = QListView()
+        self.list_view.setModel(self.model)
+        self.list_view.setItemDelegate(self.delegate)
+        self.list_view.setUniformItemSizes(True)  # Lets Qt skip per-row size queries
+        self.list_view.setMouseTracking(True)  # Needed for hover painting
+        self.list_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.list_view.setEditTriggers(
+            QAbstractItemView.DoubleClicked | QAbstractItemView.EditKeyPressed)
+        self.list_view.setStyleSheet("""
+            QListView {
                 background-color: #2b2b2b;
                 border: none;
                 color: white;
                 font-size: 14px;
                 outline: none;
             }
-            QListWidget::item {
-                padding: 10px;
-                border-bottom: 1px solid #333;
-            }
-            QListWidget::item:selected {
-                background-color: #3a3a3a;
-                color: #2ecc71;
-            }
-            QListWidget::item:hover {
-                background-color: #333;
-            }
         """)
-        self.list_widget.setSelectionMode(QListWidget.SingleSelection)
 
         # Connect signals
-        self.list_widget.itemClicked.connect(self._on_item_click)
-        self.list_widget.itemDoubleClicked.connect(self._on_double_click)
+        self.list_view.selectionModel().currentChanged.connect(self._on_current_changed)
+        self.model.checked_changed.connect(self._sync_master_checkbox)
+        self.model.file_renamed.connect(self._on_file_renamed)
+        self.model.identities_loaded.connect(self._on_identities_loaded)
 
-        layout.addWidget(self.list_widget)
+        layout.addWidget(self.list_view)
 
         # Store reference
         globals_obj.mailbox_widget = self
+        globals_obj.thumbnailer = self.thumbnails
 
     def refresh_files(self, folder_path):
-        """Clears the list and repopulates with PDFs from folder."""
-        self.list_widget.clear()
-        self.globals.files = []
-        self.selected_files.clear()
-        self.globals.checked_files.clear()
+        """Syncs the list with the PDFs in folder without rebuilding it."""
+        self.model.sync(folder_path)
+
+        # Re-select the previewed file if a model reset dropped the selection
+        selected = getattr(self.globals, 'selected_file', None)
+        if selected and not self.list_view.currentIndex().isValid():
+            row = self.model.row_of(selected)
+            if row >= 0:
+                self.list_view.selectionModel().blockSignals(True)
+                self.list_view.setCurrentIndex(self.model.index(row))
+                self.list_view.selectionModel().blockSignals(False)
+
+    def apply_changes(self, changes):
+        """Applies a coalesced watchdog ChangeSet to the list."""
+        self.model.apply_changes(changes)
 
-        # Reset Master Checkbox
-        self.master_checkbox.setChecked(False)
+    def get_checked_files(self):
+        """Returns a list of filenames whose checkboxes are checked."""
+        return list(self.globals.checked_files)
 
-        if not os.path.isdir(folder_path):
+    def _on_current_changed(self, current, previous):
+        """Loads the newly selected file into the preview (click or arrow keys)."""
+        filename = self.model.filename(current.row()) if current.isValid() else None
+        if not filename:
             return
-
-        # Get PDFs
-        pdf_files = sorted([f for f in os.listdir(folder_path) 
-                            if f.lower().endswith(".pdf")])
-
-        for filename in pdf_files:
-            self.globals.files.append(filename)
-
-            item = QListWidgetItem()
-            item.setSizeHint(QSize(0, 50))
-            self.list_widget.addItem(item)
-
-            row_widget = self._create_row_widget(filename, folder_path)
-            self.list_widget.setItemWidget(item, row_widget)
-
-    def _create_row_widget(self, filename, folder_path):
-        row = QFrame()
-        row.setFrameShape(QFrame.NoFrame)
-        row.setStyleSheet("background-color: transparent;")
-        row_layout = QHBoxLayout(row)
-        row_layout.setContentsMargins(10, 5, 10, 5)
-        row_layout.setSpacing(10)
-
-        # CHECKBOX
-        checkbox = QCheckBox()
-        checkbox.setStyleSheet("QCheckBox { spacing: 0; border: 2px solid #555}")
-        checkbox.setCursor(Qt.PointingHandCursor)
-        checkbox.toggled.connect(lambda checked, f=filename: self._on_checkbox_toggled(f, checked))
-        row_layout.addWidget(checkbox)
-
-        # Label
-        base_name = os.path.splitext(filename)[0] 
-        label = QLabel(base_name)
-        label.setStyleSheet("color: white; font-size: 14px;")
-        label.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        label.setWordWrap(False)
-        label.setCursor(Qt.PointingHandCursor)
-        label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
-
-        # Double click starts editing
-        label.mouseDoubleClickEvent = lambda event: self._start_editing(filename, folder_path, label, row, row_layout)
-
-        row_layout.addWidget(label)
-
-        row.file_data = {
-            'filename': filename,
-            'folder_path': folder_path,
-            'label': label,
-            'row': row,
-            'row_layout': row_layout
-        }
-
-        return row
-
-    def _on_item_click(self, item):
-        """Handle single click."""
-        # Get the filename from our internal list
-        filename = self.globals.files[self.list_widget.row(item)]
         self.globals.selected_file = filename
 
-        # Construct the full path
-        # IMPORTANT: Ensure globals.inbox is the correct absolute path
         if hasattr(self.globals, 'inbox') and self.globals.inbox:
             full_path = os.path.join(self.globals.inbox, filename)
 
@@ -160,241 +666,39 @@ class MailboxWidget(QWidget):
             # Check if the viewer exists and load the file
             if hasattr(self.globals, 'pdf_viewer') and self.globals.pdf_viewer:
                 self.globals.pdf_viewer.load_pdf(full_path)
+                show_file_details(self.globals, full_path)
+
+                # Warm the neighbours so arrow-key browsing is instant
+                neighbours = [self.model.filename(current.row() + step) for step in (1, -1)]
+                self.globals.pdf_viewer.prefetch(
+                    [os.path.join(self.globals.inbox, name) for name in neighbours if name])
             else:
                 logging.error("PDF Viewer not found in globals!")
         else:
             logging.error("Inbox path not set in globals!")
 
-    def _on_double_click(self, item):
-        """Handle double click (start editing)."""
-        filename = self.globals.files[self.list_widget.row(item)]
-        row_widget = self.list_widget.itemWidget(item)
-
-        if row_widget and hasattr(row_widget, 'file_data'):
-            file_data = row_widget.file_data
-            self._start_editing(
-                file_data['filename'],
-                file_data['folder_path'],
-                file_data['label'],
-                file_data['row'],
-                file_data['row_layout']
-            )
-
-    def _on_checkbox_toggled(self, filename, checked):
-        """Tracks which files have their checkboxes checked and updates master."""
-        if checked:
-            self.globals.checked_files.add(filename)
-        else:
-            self.globals.checked_files.discard(filename)
-
-        # Update Master Checkbox State
-        # BLOCK SIGNALS so this doesn't trigger _toggle_all recursively
-        self.master_checkbox.blockSignals(True)
+    def _on_file_renamed(self, old_filename, new_filename):
+        """Reloads the preview when the previewed file is renamed."""
+        if getattr(self.globals, 'selected_file', None) != new_filename:
+            return
+        if hasattr(self.globals, 'pdf_viewer') and self.globals.pdf_viewer and self.model.folder_path:
+            self.globals.pdf_viewer.load_pdf(os.path.join(self.model.folder_path, new_filename))
 
-        if len(self.globals.checked_files) == len(self.globals.files) and len(self.globals.files) > 0:
-            self.master_checkbox.setChecked(True)
-        else:
-            self.master_checkbox.setChecked(False)
+    def _on_identities_loaded(self, folder, filenames):
+        """Refreshes the details pane if the previewed file's identity just loaded."""
+        selected = getattr(self.globals, 'selected_file', None)
+        if selected in filenames and folder == self.model.folder_path:
+            show_file_details(self.globals, os.path.join(folder, selected))
 
+    def _sync_master_checkbox(self):
+        """Sets the master checkbox to match the rows without recursion."""
+        self.master_checkbox.blockSignals(True)
+        self.master_checkbox.setChecked(
+            len(self.globals.files) > 0 and
+            len(self.globals.checked_files) == len(self.globals.files))
         self.master_checkbox.blockSignals(False)
 
-        logging.debug(f"Checked: {filename}")
-
-    def get_checked_files(self):
-        """Returns a list of filenames whose checkboxes are checked."""
-        return list(self.globals.checked_files)
-
     def _toggle_all(self, checked):
         """Checks or unchecks all files based on the master checkbox."""
-        # Update internal state
-        if checked:
-            self.globals.checked_files = set(self.globals.files)
-        else:
-            self.globals.checked_files.clear()
-
-        # Update the UI of all rows
-        # BLOCK SIGNALS on the list items so we don't trigger _on_checkbox_toggled recursively
-        self.list_widget.blockSignals(True)
-
-        for i in range(self.list_widget.count()):
-            item = self.list_widget.item(i)
-            row_widget = self.list_widget.itemWidget(item)
-            if row_widget:
-                checkbox = row_widget.findChild(QCheckBox)
-                if checkbox:
-                    checkbox.setChecked(checked)
-
-        self.list_widget.blockSignals(False)
-
+        self.model.set_all_checked(checked)
         logging.debug(f"Master toggle: {'All Checked' if checked else 'All Unchecked'}")
-
-    def _start_editing(self, filename, folder_path, label, row, row_layout):
-        """Creates a Line Edit on the fly."""
-
-        # Close any existing editor first (One at a time)
-        if hasattr(self, 'active_editor') and self.active_editor:
-            self.active_editor.deleteLater()
-            self.active_editor = None
-
-        label.hide()
-
-        line_edit = QLineEdit(os.path.splitext(filename)[0])
-
-        # Explicitly set line edit height
-        line_edit.setMinimumHeight(20)
-        line_edit.setMaximumHeight(25)
-
-        line_edit.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
-        line_edit.setStyleSheet("""
-            QLineEdit {
-                background-color: #333;
-                color: white;
-                border: 1px solid #555;
-                border-radius: 3px;
-                font-size: 14px; 
-                font-family: inherit;
-            }
-            QLineEdit:focus { border: 1px solid #2ecc71; }
-        """)
-
-        row_layout.insertWidget(1, line_edit)
-        line_edit.selectAll()
-        line_edit.setFocus()
-
-        self.active_editor = line_edit
-        self.active_label = label
-        self.active_filename = filename
-        self.active_folder = folder_path
-
-        def finish(save=True):
-            if self.active_editor is None:
-                return  # Already finished, don't run again
-
-            if not save:
-                line_edit.deleteLater()
-                label.show()
-                self.active_editor = None
-                return
-
-            new_base = line_edit.text().strip()
-            if not new_base:
-                line_edit.deleteLater()
-                label.show()
-                self.active_editor = None
-                return
-
-            new_filename = new_base + ".pdf"
-            old_path = os.path.join(folder_path, filename)
-            new_path = os.path.join(folder_path, new_filename)
-
-            if os.path.exists(new_path) and new_path != old_path:
-                logging.error(f"File exists: {new_filename}")
-                line_edit.deleteLater()
-                label.show()
-                self.active_editor = None
-                return
-
-            try:
-                os.rename(old_path, new_path)
-                if filename in self.globals.files:
-                    self.globals.files[self.globals.files.index(filename)] = new_filename
-                label.setText(new_base)
-                line_edit.deleteLater()
-                label.show()
-                self.active_editor = None
-
-                if hasattr(self.globals, 'selected_file') and self.globals.selected_file == filename:
-                    self.globals.selected_file = new_filename
-                    if hasattr(self.globals, 'pdf_viewer'):
-                        self.globals.pdf_viewer.load_pdf(new_path)
-            except Exception as e:
-                logging.error(f"Rename failed: {e}")
-                line_edit.deleteLater()
-                label.show()
-                self.active_editor = None
-
-        line_edit.returnPressed.connect(lambda: finish(save=True))
-        # Handle Click Away: Override focusOutEvent (more reliable than editingFinished)
-        original_focus_out = line_edit.focusOutEvent
-        def custom_focus_out(event):
-            finish(save=False)  # Click away = cancel
-            original_focus_out(event)
-        line_edit.focusOutEvent = custom_focus_out
-
-        # Handle Escape
-        original_key = line_edit.keyPressEvent
-        def custom_key(event):
-            if event.key() == Qt.Key_Escape:
-                finish(save=False)
-            else:
-                original_key(event)
-        line_edit.keyPressEvent = custom_key
-
-    def eventFilter(self, obj, event):
-        """Global event filter to catch Escape key for the active editor."""
-        if event.type() == QEvent.KeyPress and event.key() == Qt.Key_Escape:
-            if obj == self.active_editor:
-                obj.deleteLater()
-                row_layout = obj.parent().layout()
-                label = row_layout.itemAt(1).widget()
-                for i in range(row_layout.count()):
-                    w = row_layout.itemAt(i).widget()
-                    if isinstance(w, QLabel):
-                        w.show()
-                        break
-                self.active_editor = None
-                return True
-        return super().eventFilter(obj, event)
-
-    def _save_edit(self, old_filename, folder_path, label, line_edit):
-        """Saves the edited filename and renames the file on disk."""
-        new_base = line_edit.text().strip()
-
-        if not new_base:
-            # Empty name, cancel edit
-            line_edit.hide()
-            label.show()
-            return
-
-        # Preserve the .pdf extension
-        new_filename = new_base + ".pdf"
-
-        # Build full paths
-        old_path = os.path.join(folder_path, old_filename)
-        new_path = os.path.join(folder_path, new_filename)
-
-        # Check if new name already exists
-        if os.path.exists(new_path) and new_path != old_path:
-            logging.error(f"File already exists: {new_filename}")
-            line_edit.hide()
-            label.show()
-            return
-
-        try:
-            # Rename the file on disk
-            os.rename(old_path, new_path)
-
-            # Update internal file list
-            if old_filename in self.globals.files:
-                idx = self.globals.files.index(old_filename)
-                self.globals.files[idx] = new_filename
-
-            # Update the label text
-            label.setText(new_base)
-
-            # Switch back to label view
-            line_edit.hide()
-            label.show()
-
-            logging.debug(f"Renamed: {old_filename} -> {new_filename}")
-
-            # Refresh the PDF viewer if this file is currently selected
-            if hasattr(self.globals, 'selected_file') and self.globals.selected_file == old_filename:
-                self.globals.selected_file = new_filename
-                if hasattr(self.globals, 'pdf_viewer') and self.globals.pdf_viewer:
-                    self.globals.pdf_viewer.load_pdf(new_path)
-
-        except Exception as e:
-            logging.error(f"Failed to rename file: {e}")
-            line_edit.hide()
-            label.show()
@@ -0,0 +1,222 @@
+# src/qt_interface/qt_components/qt_thumbnails.py
+from PySide6.QtCore import Qt, QObject, QThread, QSize, QSizeF, Signal
+from PySide6.QtGui import QImage, QPixmap
+from PySide6.QtPdf import QPdfDocument
+from src.utils.load_settings import load_data_path
+from src.managers.metadata_index import content_hash
+from collections import OrderedDict, deque
+import os
+import threading
+import logging
+
+# Rendered at twice the painted size so thumbnails stay sharp on high-DPI screens
+THUMBNAIL_SIZE = QSize(72, 92)
+
+# Disk cache bound; oldest thumbnails are removed once it is exceeded
+THUMBNAIL_CACHE_BUDGET = 64 * 1024 * 1024  # bytes
+THUMBNAIL_CACHE_TRIM_TO = 0.8  # fraction of the budget kept after eviction
+
+# Decoded pixmaps kept in memory for painting
+THUMBNAIL_MEMORY_LIMIT = 512
+
+# Pending requests; the oldest are dropped when scrolling quickly and asked
+# for again if their rows are painted later
+THUMBNAIL_QUEUE_LIMIT = 64
+
+
+class ThumbnailWorker(QThread):
+    """
+    Renders first-page thumbnails on a low-priority thread.
+
+        Requests are served newest first so the rows on screen win over
+        rows that have already scrolled past. Rendered images are stored in
+        a disk cache keyed by content hash, so renames and moves are free.
+    """
+    rendered = Signal(str, object)  # path, QImage or None if it couldn't be rendered
+
+    def __init__(self, cache_dir, parent=None):
+        super().__init__(parent)
+        self.cache_dir = cache_dir
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._paused = False
+        self._stopping = False
+        self._hashes = {}  # (path, mtime_ns, size) -> content hash
+        self._cache_bytes = 0
+
+    # ---- Called from the main thread ----
+
+    def request(self, path):
+        """Queues path to render next. Returns the paths dropped to stay under the queue limit."""
+        dropped = []
+        with self._condition:
+            if path in self._queue:
+                self._queue.remove(path)
+            self._queue.append(path)
+            while len(self._queue) > THUMBNAIL_QUEUE_LIMIT:
+                dropped.append(self._queue.popleft())
+            self._condition.notify()
+        return dropped
+
+    def pause(self):
+        """Holds new renders until resume(); the current one still finishes."""
+        with self._condition:
+            self._paused = True
+
+    def resume(self):
+        with self._condition:
+            self._paused = False
+            self._condition.notify()
+
+    def stop(self):
+        with self._condition:
+            self._stopping = True
+            self._queue.clear()
+            self._condition.notify()
+
+    # ---- Worker thread ----
+
+    def run(self):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._cache_bytes = sum(size for _, _, size in self._cache_entries())
+        except OSError as e:
+            logging.error(f"Unable to prepare thumbnail cache {self.cache_dir}: {e}")
+            return
+
+        # Created here so it belongs to this thread
+        document = QPdfDocument()
+        while True:
+            with self._condition:
+                while not self._stopping and (self._paused or not self._queue):
+                    self._condition.wait()
+                if self._stopping:
+                    break
+                path = self._queue.pop()
+            try:
+                image = self._thumbnail(document, path)
+            except Exception as e:
+                logging.debug(f"Thumbnail failed for {path}: {e}")
+                image = None
+            self.rendered.emit(path, image)
+        document.close()
+
+    def _thumbnail(self, document, path):
+        """Returns the cached thumbnail for path, rendering it on a miss."""
+        cache_path = os.path.join(self.cache_dir, f"{self._hash(path)}.png")
+        if os.path.exists(cache_path):
+            image = QImage(cache_path)
+            if not image.isNull():
+                os.utime(cache_path)  # Mark as recently used for eviction
+                return image
+
+        if document.load(path) != QPdfDocument.Error.None_ or document.pageCount() == 0:
+            document.close()
+            return None
+        page_size = QSizeF(document.pagePointSize(0)).scaled(
+            QSizeF(THUMBNAIL_SIZE), Qt.KeepAspectRatio).toSize()
+        image = document.render(0, page_size)
+        document.close()
+        if image.isNull():
+            return None
+
+        if image.save(cache_path, "PNG"):
+            self._cache_bytes += os.path.getsize(cache_path)
+            if self._cache_bytes > THUMBNAIL_CACHE_BUDGET:
+                self._evict()
+        return image
+
+    def _hash(self, path):
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        digest = self._hashes.get(key)
+        if digest is None:
+            if len(self._hashes) > 4096:
+                self._hashes.clear()
+            digest = self._hashes[key] = content_hash(path)
+        return digest
+
+    def _cache_entries(self):
+        """Returns (mtime, path, size) for each cached thumbnail."""
+        entries = []
+        with os.scandir(self.cache_dir) as listing:
+            for entry in listing:
+                if entry.name.endswith(".png"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.path, stat.st_size))
+        return entries
+
+    def _evict(self):
+        """Removes least recently used thumbnails until well under budget."""
+        target = THUMBNAIL_CACHE_BUDGET * THUMBNAIL_CACHE_TRIM_TO
+        removed = 0
+        for _, path, size in sorted(self._cache_entries()):
+            if self._cache_bytes <= target:
+                break
+            try:
+                os.remove(path)
+                self._cache_bytes -= size
+                removed += 1
+            except OSError as e:
+                logging.debug(f"Unable to evict thumbnail {path}: {e}")
+        logging.debug(f"Evicted {removed} thumbnails from the cache")
+
+
+class ThumbnailCache(QObject):
+    """
+    Serves thumbnail pixmaps to the mailbox, requesting missing ones lazily.
+
+        get() is only called while painting, so only rows on screen are ever
+        rendered.
+    """
+    thumbnail_ready = Signal(str)  # path
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pixmaps = OrderedDict()  # path -> QPixmap, or None if rendering failed
+        self._requested = set()
+        self.worker = ThumbnailWorker(load_data_path("cache", "thumbnails"))
+        self.worker.rendered.connect(self._on_rendered)
+        self.worker.start(QThread.IdlePriority)
+
+    def get(self, path):
+        """Returns the pixmap for path, or None while it is being rendered."""
+        if path in self._pixmaps:
+            self._pixmaps.move_to_end(path)
+            return self._pixmaps[path]
+        if path not in self._requested:
+            self._requested.add(path)
+            # Dropped rows are requested again the next time they're painted
+            self._requested.difference_update(self.worker.request(path))
+        return None
+
+    def forget(self, path):
+        """Drops the thumbnail for a file whose contents changed."""
+        self._pixmaps.pop(path, None)
+        self._requested.discard(path)
+
+    def move(self, old_path, new_path):
+        """Carries a thumbnail over to a renamed file."""
+        if old_path in self._pixmaps:
+            self._pixmaps[new_path] = self._pixmaps.pop(old_path)
+
+    def pause(self):
+        """Keeps the worker idle while heavier work like auto-name runs."""
+        self.worker.pause()
+
+    def resume(self):
+        self.worker.resume()
+
+    def stop(self):
+        self.worker.stop()
+        self.worker.wait(2000)
+
+    def _on_rendered(self, path, image):
+        """Runs in the MAIN thread; QPixmaps can only be made here."""
+        if path not in self._requested:
+            return  # Forgotten while rendering
+        self._requested.discard(path)
+        self._pixmaps[path] = QPixmap.fromImage(image) if image is not None else None
+        while len(self._pixmaps) > THUMBNAIL_MEMORY_LIMIT:
+            self._pixmaps.popitem(last=False)
+        self.thumbnail_ready.emit(path)
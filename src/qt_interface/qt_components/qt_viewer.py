@@ -2,15 +2,159 @@
 from PySide6.QtWidgets import QWidget, QVBoxLayout
 from PySide6.QtPdf import QPdfDocument
 from PySide6.QtPdfWidgets import QPdfView
-from PySide6.QtCore import Qt, QBuffer, QByteArray
+from PySide6.QtCore import Qt, QBuffer, QFile, QIODevice, QObject, QTimer, Signal
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import os
 import logging
 
+# Preview cache limits
+PREVIEW_CACHE_BUDGET = 200 * 1024 * 1024  # bytes
+PREVIEW_CACHE_MAX_DOCS = 16
+
+# Files at least this large are loaded straight from the path so pdfium
+# pulls pages from disk on demand instead of holding the whole file in memory.
+# Windows locks files opened this way against rename and delete, so it always
+# reads into memory there.
+FILE_BACKED_THRESHOLD = 16 * 1024 * 1024  # bytes
+FILE_BACKED_COST = 4 * 1024 * 1024  # estimated resident size of a file-backed document
+FILE_BACKED = os.name != 'nt'
+
+# Delay before laying out the remaining pages, giving page one a paint first
+MULTIPAGE_DELAY_MS = 50
+
+
+def _cache_key(file_path):
+    """Returns (path, mtime_ns, size) so edited files are never served stale, or None."""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return (os.path.normcase(os.path.abspath(file_path)), stat.st_mtime_ns, stat.st_size)
+
+
+def _is_file_backed(key):
+    return FILE_BACKED and key[2] >= FILE_BACKED_THRESHOLD
+
+
+def _read_file(file_path):
+    """
+    Reads a file straight into a QByteArray.
+
+        Qt fills the array itself, so there is no intermediate Python bytes
+        copy, and the file handle is closed before returning.
+    """
+    file = QFile(file_path)
+    if not file.open(QIODevice.ReadOnly):
+        raise OSError(file.errorString())
+    try:
+        return file.readAll()
+    finally:
+        file.close()
+
+
+def _warm_page_cache(file_path):
+    """Asks the OS to read a file ahead so a later path load hits memory."""
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    finally:
+        os.close(fd)
+
+
+class PreviewCache:
+    """
+    LRU cache of loaded QPdfDocuments keyed by path and mtime.
+
+        Entries are evicted least-recently-used first once the total cost
+        (bytes held in memory) passes the budget. The document on screen is
+        never evicted; an older version of a file that is still on screen
+        is kept until the view moves off it.
+    """
+    def __init__(self, budget=PREVIEW_CACHE_BUDGET, max_docs=PREVIEW_CACHE_MAX_DOCS):
+        self.budget = budget
+        self.max_docs = max_docs
+        self.total_cost = 0
+        self._entries = OrderedDict()  # key -> (document, buffer or None, cost)
+        self._stale = set()  # keys replaced by a newer version of the same file
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """Returns the cached document for key and marks it most recently used."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, document, buffer, cost, pinned=None):
+        """Adds a document, then evicts old entries until back under budget."""
+        if key in self._entries:
+            return
+        # Older versions of the same file go once they are off screen
+        self._stale.update(k for k in self._entries if k[0] == key[0])
+        self._entries[key] = (document, buffer, cost)
+        self.total_cost += cost
+        self.drop_stale(pinned=pinned)
+        self._shrink(keep=(key,), pinned=pinned)
+
+    def drop_stale(self, pinned=None):
+        """Evicts replaced versions of files, except the document on screen."""
+        for key in list(self._stale):
+            if key in self._entries and self._entries[key][0] is pinned:
+                continue
+            self._stale.discard(key)
+            if key in self._entries:
+                self._evict(key)
+
+    def _shrink(self, keep=(), pinned=None):
+        for key in list(self._entries):
+            if self.total_cost <= self.budget and len(self._entries) <= self.max_docs:
+                break
+            if key in keep or self._entries[key][0] is pinned:
+                continue
+            self._evict(key)
+
+    def _evict(self, key):
+        document, buffer, cost = self._entries.pop(key)
+        self._stale.discard(key)
+        self.total_cost -= cost
+        document.close()
+        document.deleteLater()
+        if buffer is not None:
+            # Frees the QByteArray too; the buffer is parented to the viewer
+            buffer.close()
+            buffer.deleteLater()
+        logging.debug(f"Preview cache evicted: {key[0]}")
+
+
+class _PrefetchSignaler(QObject):
+    """Thread-safe bridge: hands files read in the background to the main thread."""
+    loaded = Signal(object, object, bool)  # cache key, QByteArray or None if file-backed, success
+
+
 class NativePdfViewer(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
 
         self.doc = QPdfDocument(self)
         self.view = QPdfView(self)
+        self.cache = PreviewCache()
+        self._pending_prefetch = set()
+
+        # Single background reader so prefetching never competes with itself
+        self._prefetch_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Preview Prefetch")
+        self._signaler = _PrefetchSignaler()
+        self._signaler.loaded.connect(self._on_prefetched)
+
+        # Switches to MultiPage once the first page has had a chance to paint
+        self._multipage_timer = QTimer(self)
+        self._multipage_timer.setSingleShot(True)
+        self._multipage_timer.setInterval(MULTIPAGE_DELAY_MS)
+        self._multipage_timer.timeout.connect(self._show_all_pages)
 
         # Removes the scroll bar to prevent crashing
         self.view.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
@@ -25,26 +169,107 @@ class NativePdfViewer(QWidget):
         layout.addWidget(self.view)
 
     def load_pdf(self, file_path):
-        """Loads a PDF file into the viewer."""
+        """Loads a PDF file into the viewer, reusing a cached document if possible."""
         if not file_path:
             return
 
-        logging.debug(f"Loading PDF: {file_path}")
-
-        # Load the file as a buffer
-        with open(file_path, 'rb') as f:
-            data = f.read()
+        key = _cache_key(file_path)
+        if key is None:
+            logging.warning(f"Cannot preview missing file: {file_path}")
+            return
 
-        self.buffer = QBuffer()
-        self.buffer.setData(QByteArray(data))
-        self.buffer.open(QBuffer.ReadOnly)
-        self.doc.load(self.buffer)
+        document = self.cache.get(key)
+        if document is not None:
+            logging.debug(f"Loading PDF from preview cache: {file_path}")
+        else:
+            logging.debug(f"Loading PDF: {file_path}")
+            try:
+                data = None if _is_file_backed(key) else _read_file(file_path)
+            except OSError as e:
+                logging.error(f"Unable to read {file_path} for preview: {e}")
+                return
+            document = self._add_to_cache(key, file_path, data)
 
-        # Set the mode immediately. Qt will apply it when the doc is ready.
-        # Use MultiPage for scrolling through all pages.
-        self.view.setPageMode(QPdfView.PageMode.MultiPage)
+        self.doc = document
+        self.view.setDocument(document)
+        self.cache.drop_stale(pinned=document)  # The version shown before, if the file changed
         self.view.setZoomMode(QPdfView.ZoomMode.FitInView)
 
+        # Show page one on its own first. MultiPage lays out every page before
+        # painting, which is slow on long scans, so it is applied just after.
+        self.view.setPageMode(QPdfView.PageMode.SinglePage)
+        self._multipage_timer.start()
+
         # Force a repaint to ensure the UI updates
         self.view.update()
         self.view.repaint()
+
+    def _show_all_pages(self):
+        """Use MultiPage for scrolling through all pages."""
+        if self.doc.pageCount() > 1:
+            self.view.setPageMode(QPdfView.PageMode.MultiPage)
+
+    def prefetch(self, file_paths):
+        """
+        Reads files in the background and caches their documents.
+
+            Used for the rows next to the selection so arrow-key browsing
+            doesn't wait on disk or network reads.
+        """
+        for file_path in file_paths:
+            if not file_path:
+                continue
+            key = _cache_key(file_path)
+            if key is None or key in self.cache or key in self._pending_prefetch:
+                continue
+            self._pending_prefetch.add(key)
+            self._prefetch_pool.submit(self._read_in_background, key, file_path)
+
+    def _read_in_background(self, key, file_path):
+        """Runs on the prefetch thread. Reads through its own QFile; documents are made in the MAIN thread."""
+        data = None
+        try:
+            if _is_file_backed(key):
+                _warm_page_cache(file_path)
+            else:
+                data = _read_file(file_path)
+            ok = True
+        except OSError as e:
+            logging.debug(f"Prefetch failed for {file_path}: {e}")
+            ok = False
+        self._signaler.loaded.emit(key, data, ok)
+
+    def _on_prefetched(self, key, data, ok):
+        """Runs in the MAIN thread once the prefetch thread has read a file."""
+        self._pending_prefetch.discard(key)
+        if not ok or key in self.cache:
+            return
+        self._add_to_cache(key, key[0], data)
+        logging.debug(f"Prefetched preview: {key[0]}")
+
+    def _add_to_cache(self, key, file_path, data):
+        """
+        Creates a QPdfDocument and caches it.
+
+            Arguments:
+                data: QByteArray of the file, wrapped in a QBuffer owned by the
+                    cache entry and freed on eviction. None loads straight
+                    from file_path instead.
+        """
+        document = QPdfDocument(self)
+        if data is None:
+            buffer = None
+            document.load(file_path)
+            cost = FILE_BACKED_COST
+        else:
+            buffer = QBuffer(self)
+            buffer.setData(data)
+            buffer.open(QIODevice.ReadOnly)
+            document.load(buffer)
+            cost = data.size()
+        self.cache.put(key, document, buffer, cost, pinned=self.doc)
+        return document
+
+    def shutdown(self):
+        """Stops the prefetch thread without waiting on queued reads."""
+        self._prefetch_pool.shutdown(wait=False, cancel_futures=True)
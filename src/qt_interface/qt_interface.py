@@ -104,11 +104,12 @@ def create_qt_interface(globals):
         else:
             logging.warning("Cannot refresh mailbox: globals.inbox is not set.")
 
-    globals.observers = {}
+    def apply_mailbox_changes(changes):
+        if hasattr(globals, 'inbox') and globals.inbox:
+            mailbox.apply_changes(changes)
+
     if hasattr(globals, 'inbox') and globals.inbox:
-        observer = setup_observer(globals, globals.inbox, key='inbox', callback=update_mailbox_view)
-        if observer:
-            globals.observers['inbox'] = observer
+        if setup_observer(globals, globals.inbox, key='inbox', on_changes=apply_mailbox_changes):
             update_mailbox_view()
 
     # 9.5 ENABLE CURSOR FEEDBACK & RESIZE (SIMPLIFIED)
@@ -1,11 +1,66 @@
 # src/qt_interface/qt_preview.py
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, 
                                QLabel, QPushButton, QFrame, QScrollArea)
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QObject, Signal
 from src.qt_interface.qt_components.qt_viewer import NativePdfViewer
 from src.interface.components.gui_actions import smart_spreadsheet_button, pdf_button
 from src.managers.printers import print_selected_files
 from src.managers.file_management import archive_files, send_to_trash
+from src.managers.metadata_index import get_index
+import os
+
+# Index column -> label shown above the preview
+DETAIL_LABELS = {"company": "Company", "date": "Date", "invoice": "Invoice #", "card": "Card Number"}
+
+
+_details_signaler = None
+
+
+class _DetailsSignaler(QObject):
+    """Thread-safe bridge: hands records scanned in the background to the main thread."""
+    scanned = Signal(object, str, object)  # globals, path, record or None
+
+
+def show_file_details(globals, path):
+    """
+    Shows the identity and extracted fields of path from the metadata index.
+
+        Only what the index already knows is shown right away. A file it
+        hasn't seen, or that changed, is scanned in the background and its
+        details filled in once that's done.
+    """
+    global _details_signaler
+    label = getattr(globals, 'preview_meta', None)
+    if label is None:
+        return
+    index = get_index()
+    record = index.cached_many([path]).get(path) if index is not None else None
+    if record is None and index is not None:
+        if _details_signaler is None:
+            _details_signaler = _DetailsSignaler()
+            _details_signaler.scanned.connect(_on_details_scanned)
+        signaler = _details_signaler
+        index.scan_in_background([path], lambda records: signaler.scanned.emit(globals, path, records.get(path)))
+    _set_details(globals, path, record or {})
+
+
+def _on_details_scanned(globals, path, record):
+    """Runs in the MAIN thread; fills in the details if path is still the one previewed."""
+    if record is not None and getattr(globals, 'selected_file', None) == os.path.basename(path):
+        _set_details(globals, path, record)
+
+
+def _set_details(globals, path, record):
+    """Writes the identity and the record's fields to the details label."""
+    label = getattr(globals, 'preview_meta', None)
+    if label is None:
+        return
+    identity = globals.file_identity.get(os.path.basename(path)) or record.get("identity") or "Invoice"
+    lines = [identity] + [f"{name}: {record[column]}" for column, name in DETAIL_LABELS.items()
+                          if record.get(column)]
+    label.setText("\n".join(lines))
+    label.setStyleSheet("color: white;")
+
 
 def create_preview_pane(globals):
     """Creates the right pane with PDF preview and action buttons."""
@@ -72,11 +127,18 @@ def create_preview_pane(globals):
 
     layout.addWidget(actions_frame)
 
+    # Print job status, shown once something has been printed
+    print_status = QLabel("")
+    print_status.setStyleSheet("color: #aaa; font-style: italic;")
+    print_status.setVisible(False)
+    layout.addWidget(print_status)
+
     # Store references
     globals.preview_meta = meta_title
     globals.btn_autoname = btn_autoname
     globals.btn_enter = btn_enter
     globals.btn_archive = btn_archive
     globals.btn_delete = btn_delete
+    globals.print_status = print_status
 
     return pane
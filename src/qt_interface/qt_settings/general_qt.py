@@ -1,10 +1,29 @@
 # src/qt_interface/qt_settings/general_qt.py
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QCheckBox, QComboBox
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
+                               QCheckBox, QComboBox, QPushButton)
 from PySide6.QtCore import Qt
-from src.managers.printers import query_printers
+from src.managers.printers import cached_printers, refresh_printers
 import logging
 
 
+def fill_printer_combo(globals, printer_combo, printers):
+    """Fills the printer combobox, keeping the current or saved printer selected."""
+    current_printer = printer_combo.currentText() or getattr(globals, 'default_printer', None)
+    if not printers:
+        # Keep the saved printer while discovery is still running
+        printers = [current_printer] if current_printer else ["No Printers Found"]
+
+    printer_combo.blockSignals(True)
+    printer_combo.clear()
+    printer_combo.addItems(printers)
+    if current_printer and current_printer in printers:
+        printer_combo.setCurrentText(current_printer)
+    else:
+        # Default to first if nothing saved or invalid
+        printer_combo.setCurrentIndex(0)
+    printer_combo.blockSignals(False)
+
+
 def create_general_settings_tab(globals):
     """
     Create the General Settings tab for Qt interface.
@@ -91,27 +110,35 @@ def create_general_settings_tab(globals):
         }
     """)
 
-    # Populate with current printers
+    # Populate from the printer cache; discovery refills it in the background
     try:
-        printers = query_printers()
-        if not printers:
-            printers = ["No Printers Found"]
-
-        printer_combo.addItems(printers)
-
-        # Set the current selection based on globals
-        current_printer = getattr(globals, 'default_printer', None)
-        if current_printer and current_printer in printers:
-            printer_combo.setCurrentText(current_printer)
-        elif printers:
-            # Default to first if nothing saved or invalid
-            printer_combo.setCurrentIndex(0)
-
+        fill_printer_combo(globals, printer_combo, cached_printers(globals))
+        globals.printer_listeners.append(
+            lambda printers: fill_printer_combo(globals, printer_combo, printers))
     except Exception as e:
         logging.error(f"Failed to load printers: {e}")
         printer_combo.addItem("Error Loading Printers")
 
-    printer_layout.addWidget(printer_combo)
+    # Refresh Button
+    refresh_printers_btn = QPushButton("Refresh")
+    refresh_printers_btn.setStyleSheet("color: white; background-color: #333; border: 1px solid #555; "
+                                       "border-radius: 4px; padding: 5px 10px; font-size: 14px;")
+    refresh_printers_btn.setCursor(Qt.PointingHandCursor)
+    refresh_printers_btn.clicked.connect(lambda: refresh_printers(globals, force=True))
+
+    printer_row = QHBoxLayout()
+    printer_row.addWidget(printer_combo)
+    printer_row.addWidget(refresh_printers_btn)
+    printer_row.addStretch()
+    printer_layout.addLayout(printer_row)
+
+    # Merge Print Jobs
+    merge_print_checkbox = QCheckBox("Print Selections as One Job")
+    merge_print_checkbox.setStyleSheet("color: white; font-size: 14px; margin-left: 10px;")
+    merge_print_checkbox.setToolTip("Combines selected files into a single print job. "
+                                    "Very large selections are split into several jobs.")
+    merge_print_checkbox.setChecked(globals.merge_print_jobs)
+    printer_layout.addWidget(merge_print_checkbox)
 
     # Store reference for the save function
     globals.printer_combo = printer_combo
@@ -129,5 +156,6 @@ def create_general_settings_tab(globals):
     globals.beta_checkbox = beta_checkbox
     globals.window_checkbox = window_checkbox
     globals.legacy_checkbox = legacy_checkbox
+    globals.merge_print_checkbox = merge_print_checkbox
 
     return tab_widget
@@ -14,7 +14,8 @@ def load_data_path(direct=None, filename=None, default=False):
     """
     # ==================== DEFAULT FILES ====================
     default_files = [
-        "settings.json", "company_map.json", "folder_maps.json",
+        "settings.json", "company_map.json", "folder_maps.json", "pattern_packs.json",
+        "vendor_templates.json", "custom_fields.json",
         "FY26-Blank_Workbook.xlsx", "paths.json", "spreadsheet.json",
         "assets/icon.png", "assets/add-1.png", "assets/add-2.png", "assets/add-3.png",
         "assets/archive.png", "assets/auto.png", "assets/card-1.png", "assets/card-2.png",
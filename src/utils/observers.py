@@ -3,10 +3,15 @@ import time
 import os
 import platform
 import ctypes
+import re
 import logging
+import threading
 from watchdog.observers import Observer
-from watchdog.observers.polling import PollingObserver
-from watchdog.events import FileSystemEventHandler
+from watchdog.observers.api import (BaseObserver, EventEmitter,
+                                    DEFAULT_OBSERVER_TIMEOUT)
+from watchdog.events import (FileSystemEventHandler, FileCreatedEvent,
+                             FileDeletedEvent, FileModifiedEvent,
+                             FileMovedEvent)
 
 try:
     from PySide6.QtCore import QTimer, QObject, Signal
@@ -21,17 +26,331 @@ if PYSIDE6_AVAILABLE:
         file_changed = Signal()
 
 
-class FolderEventHandler(FileSystemEventHandler):
-    """Handles filesystem events for a single watched folder"""
-    def __init__(self, globals, update_callback, debounce_delay=0.6):
+# Paths we wrote ourselves -> time of the write, so their echo can be dropped
+_own_writes = {}
+_own_writes_lock = threading.Lock()
+OWN_WRITE_WINDOW = 2.0  # seconds
+
+
+def mark_own_write(path):
+    """
+    Flags a path as just written by Invoice Buddy (ex: metadata saves).
+
+        'modified' events for the path are ignored for OWN_WRITE_WINDOW
+        seconds so our own writes don't ripple back into the views.
+    """
+    with _own_writes_lock:
+        _own_writes[os.path.normcase(os.path.abspath(path))] = time.monotonic()
+
+
+def _is_own_write(path):
+    """Returns True if path was flagged by mark_own_write recently."""
+    key = os.path.normcase(os.path.abspath(path))
+    with _own_writes_lock:
+        stamp = _own_writes.get(key)
+        if stamp is None:
+            return False
+        if time.monotonic() - stamp > OWN_WRITE_WINDOW:
+            del _own_writes[key]
+            return False
+        return True
+
+
+def _is_pdf(path):
+    return bool(path) and path.lower().endswith('.pdf')
+
+
+class ChangeSet:
+    """
+    Coalesced filesystem changes collected during one debounce window.
+
+        added:      Paths that appeared
+        removed:    Paths that disappeared
+        renamed:    {old_path: new_path}
+        modified:   Paths whose contents changed
+
+        Events are folded together as they arrive, so a temp file that is
+        created and deleted inside the window never shows up, a rename
+        chain a -> b -> c becomes a single a -> c, and repeated writes to
+        one file become a single 'modified' entry.
+    """
+    def __init__(self):
+        self.added = set()
+        self.removed = set()
+        self.renamed = {}
+        self.modified = set()
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.renamed or self.modified)
+
+    def __len__(self):
+        return len(self.added) + len(self.removed) + len(self.renamed) + len(self.modified)
+
+    def __repr__(self):
+        return (f"ChangeSet(added={sorted(self.added)}, removed={sorted(self.removed)}, "
+                f"renamed={self.renamed}, modified={sorted(self.modified)})")
+
+    def _renamed_from(self, path):
+        """Returns the original path that was renamed to path, if any."""
+        for old, new in self.renamed.items():
+            if new == path:
+                return old
+        return None
+
+    def record(self, event_type, src_path, dest_path=None):
+        """Folds a single watchdog event into the change set."""
+        if event_type == 'created':
+            if src_path in self.removed:
+                # Deleted then recreated (ex: atomic save) is a modification
+                self.removed.discard(src_path)
+                self.modified.add(src_path)
+            else:
+                self.added.add(src_path)
+
+        elif event_type == 'deleted':
+            if src_path in self.added:
+                self.added.discard(src_path)
+                return
+            origin = self._renamed_from(src_path)
+            if origin:
+                del self.renamed[origin]
+                src_path = origin
+            self.modified.discard(src_path)
+            self.removed.add(src_path)
+
+        elif event_type == 'modified':
+            if src_path in self.added or self._renamed_from(src_path):
+                return
+            self.modified.add(src_path)
+
+        elif event_type == 'moved':
+            # Renames into or out of a PDF name look like a create or delete
+            if not _is_pdf(src_path):
+                self.record('created', dest_path)
+                return
+            if not _is_pdf(dest_path):
+                self.record('deleted', src_path)
+                return
+            if src_path in self.added:
+                self.added.discard(src_path)
+                self.added.add(dest_path)
+                return
+            origin = self._renamed_from(src_path) or src_path
+            self.renamed.pop(origin, None)
+            if origin == dest_path:
+                return  # Renamed back to where it started
+            self.renamed[origin] = dest_path
+            if src_path in self.modified:
+                self.modified.discard(src_path)
+                self.modified.add(dest_path)
+
+
+# Filesystem types (from /proc/self/mountinfo) that inotify can't see remote changes on
+NETWORK_FS_TYPES = {
+    "nfs", "nfs4", "cifs", "smb3", "smbfs", "ncpfs", "afs", "9p", "ceph",
+    "glusterfs", "lustre", "gpfs", "davfs", "fuse.sshfs", "fuse.glusterfs",
+    "fuse.davfs2", "fuse.rclone", "fuse.s3fs", "fuse.cephfs"}
+
+# Adaptive polling intervals (seconds)
+POLL_MIN_INTERVAL = 0.5
+POLL_MAX_INTERVAL = 10.0
+POLL_BACKOFF = 1.5
+
+
+def _linux_fs_type(path):
+    """
+    Returns the filesystem type of the mount holding path, or None.
+
+        Reads /proc/self/mountinfo and picks the longest mount point that
+        contains the path. Mount points escape spaces etc. as octal (\\040).
+    """
+    try:
+        target = os.path.realpath(path)
+        best_mount, best_type = "", None
+        with open("/proc/self/mountinfo", "r", encoding="utf-8") as f:
+            for line in f:
+                fields, _, tail = line.partition(" - ")
+                fields = fields.split()
+                tail = tail.split()
+                if len(fields) < 5 or not tail:
+                    continue
+                mount_point = re.sub(r'\\([0-7]{3})',
+                                     lambda m: chr(int(m.group(1), 8)),
+                                     fields[4])
+                if target != mount_point and not target.startswith(mount_point.rstrip("/") + "/"):
+                    continue
+                if len(mount_point) >= len(best_mount):
+                    best_mount, best_type = mount_point, tail[0]
+        return best_type
+    except Exception as e:
+        logging.debug(f"Could not read mountinfo for {path}: {e}")
+        return None
+
+
+def is_network_drive(globals, path):
+    """
+    Check if a path is on a network drive.
+
+        Windows:    GetDriveTypeW reports DRIVE_REMOTE
+        Linux:      The mount's filesystem type is in NETWORK_FS_TYPES
+    """
+    if platform.system().startswith("Windows"):
+        drive, _ = os.path.splitdrive(path)
+        if drive:
+            drive_type = ctypes.windll.kernel32.GetDriveTypeW(drive + '\\')
+            is_remote = drive_type == 4  # DRIVE_REMOTE (network drive)
+            if is_remote:
+                logging.debug(f"{path} is a network drive.")
+            globals.network_drive = is_remote
+            return is_remote
+        # UNC paths (\\server\share) are always remote
+        is_remote = path.startswith('\\\\')
+        globals.network_drive = is_remote
+        return is_remote
+
+    if platform.system() == "Linux":
+        fs_type = _linux_fs_type(path)
+        is_remote = fs_type in NETWORK_FS_TYPES
+        if is_remote:
+            logging.debug(f"{path} is on a network filesystem ({fs_type}).")
+        globals.network_drive = is_remote
+        return is_remote
+
+    return False
+
+
+def _take_snapshot(directory):
+    """
+    Returns {name: (inode, size, mtime_ns)} for files directly in directory.
+
+        Uses os.scandir, which on Windows returns stat data with the
+        listing and on Linux costs one stat per entry.
+    """
+    snapshot = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    snapshot[entry.name] = (entry.inode() or stat.st_ino,
+                                            stat.st_size,
+                                            stat.st_mtime_ns)
+                except OSError:
+                    continue  # Vanished between listing and stat
+    except OSError as e:
+        logging.debug(f"Polling snapshot failed for {directory}: {e}")
+        return None
+    return snapshot
+
+
+class ScandirPollingEmitter(EventEmitter):
+    """
+    Polls a single directory by comparing scandir snapshots.
+
+        Files are compared by size and mtime, and renames are paired by
+        inode plus size and mtime. The polling interval backs off while the folder is idle
+        and snaps back to POLL_MIN_INTERVAL after any change.
+    """
+    def __init__(self, event_queue, watch, timeout=DEFAULT_OBSERVER_TIMEOUT, event_filter=None):
+        super().__init__(event_queue, watch, timeout=timeout, event_filter=event_filter)
+        self._snapshot = None
+        self.interval = POLL_MIN_INTERVAL
+
+    def queue_events(self, timeout):
+        if self.stopped_event.wait(self.interval):
+            return
+
+        directory = self.watch.path
+        new_snapshot = _take_snapshot(directory)
+        if new_snapshot is None:
+            self.interval = POLL_MAX_INTERVAL  # Share unreachable, back off fully
+            return
+        if self._snapshot is None:
+            # First snapshot is taken here so schedule() doesn't block on a slow share
+            self._snapshot = new_snapshot
+            return
+
+        changed = self._queue_differences(directory, self._snapshot, new_snapshot)
+        self._snapshot = new_snapshot
+
+        if changed:
+            self.interval = POLL_MIN_INTERVAL
+        else:
+            self.interval = min(self.interval * POLL_BACKOFF, POLL_MAX_INTERVAL)
+
+    def _queue_differences(self, directory, old, new):
+        """Queues watchdog events for the differences. Returns True if any."""
+        removed = [name for name in old if name not in new]
+        added = [name for name in new if name not in old]
+
+        # Pair removed and added names with identical inode, size and mtime as
+        # moves (matching on inode alone would mistake a reused inode for one)
+        removed_by_key = {old[name]: name for name in removed if old[name][0]}
+        moved = []
+        for name in added:
+            origin = removed_by_key.pop(new[name], None) if new[name][0] else None
+            if origin:
+                moved.append((origin, name))
+        moved_from = {origin for origin, _ in moved}
+        moved_to = {name for _, name in moved}
+
+        for origin, name in moved:
+            self.queue_event(FileMovedEvent(os.path.join(directory, origin),
+                                            os.path.join(directory, name)))
+        for name in removed:
+            if name not in moved_from:
+                self.queue_event(FileDeletedEvent(os.path.join(directory, name)))
+        for name in added:
+            if name not in moved_to:
+                self.queue_event(FileCreatedEvent(os.path.join(directory, name)))
+
+        modified = 0
+        for name, (inode, size, mtime) in new.items():
+            previous = old.get(name)
+            if previous and previous[1:] != (size, mtime):
+                self.queue_event(FileModifiedEvent(os.path.join(directory, name)))
+                modified += 1
+
+        return bool(removed or added or modified)
+
+
+class AdaptivePollingObserver(BaseObserver):
+    """Polling observer for network folders built on ScandirPollingEmitter."""
+    def __init__(self, timeout=DEFAULT_OBSERVER_TIMEOUT):
+        super().__init__(ScandirPollingEmitter, timeout=timeout)
+
+
+class WatcherService(FileSystemEventHandler):
+    """
+    Watches every folder through one shared observer and one debounce timer.
+
+        Folders are registered under a key (ex: 'inbox' or a buddy name)
+        and can be added or removed at runtime with watch() and unwatch().
+        Local folders share a single native Observer and network folders
+        share a single AdaptivePollingObserver; both are started once and
+        never restarted.
+
+        Events are routed to folders by their parent directory and coalesced
+        into one ChangeSet per folder. When the debounce window closes, each
+        key's callback is called with no arguments and its subscribers with
+        that folder's ChangeSet.
+    """
+    def __init__(self, globals, debounce_delay=0.6):
         self.globals = globals
-        self.update_callback = update_callback
         self.debounce_delay = debounce_delay
-        self.last_event_time = 0
         self.scheduled_update = None
+        self._observer = None  # Native observer, started on first use
+        self._polling_observer = None  # Polling observer for network folders
+        self._folders = {}  # normalized folder -> {"path", "watch", "keys"}
+        self._keys = {}  # key -> {"folder", "callback", "subscribers"}
+        self._pending = {}  # normalized folder -> ChangeSet
+        self._lock = threading.RLock()
 
         # Qt mode: Set up thread-safe signaling
-        if PYSIDE6_AVAILABLE and hasattr(globals, 'legacy_mode') and not globals.legacy_mode:
+        self._qt_mode = PYSIDE6_AVAILABLE and hasattr(globals, 'legacy_mode') and not globals.legacy_mode
+        if self._qt_mode:
             self._signaler = _WatchdogSignaler()
             self._signaler.file_changed.connect(self._on_file_changed_qt)
             # Persistent timer that lives in the main thread
@@ -39,6 +358,123 @@ class FolderEventHandler(FileSystemEventHandler):
             self._debounce_timer.setSingleShot(True)
             self._debounce_timer.timeout.connect(self._trigger_update)
 
+    # ---- Registry ----
+
+    def watch(self, key, directory, callback=None, on_changes=None):
+        """
+        Starts watching directory under key. Returns True on success.
+
+            Re-registering an existing key moves it to the new directory.
+        """
+        if not directory or not os.path.isdir(directory):
+            logging.warning(
+                f"Cannot setup observer for {key}: Invalid directory {directory}")
+            return False
+
+        with self._lock:
+            if key in self._keys:
+                self.unwatch(key)
+
+            folder = _folder_key(directory)
+            if folder not in self._folders:
+                try:
+                    observer = self._observer_for(directory, key)
+                    watch = observer.schedule(self, directory, recursive=False)
+                except Exception as e:
+                    logging.error(f"Unable to watch {directory} for {key}: {e}")
+                    return False
+                self._folders[folder] = {"path": directory,
+                                         "observer": observer,
+                                         "watch": watch,
+                                         "keys": set()}
+
+            self._folders[folder]["keys"].add(key)
+            self._keys[key] = {"folder": folder,
+                               "callback": callback,
+                               "subscribers": [on_changes] if on_changes else []}
+        logging.debug(f"Watching {directory} as '{key}'")
+        return True
+
+    def unwatch(self, key):
+        """Stops delivering events for key, dropping the folder's watch if unused."""
+        with self._lock:
+            entry = self._keys.pop(key, None)
+            if not entry:
+                return
+            folder = self._folders.get(entry["folder"])
+            if not folder:
+                return
+            folder["keys"].discard(key)
+            if folder["keys"]:
+                return
+            try:
+                folder["observer"].unschedule(folder["watch"])
+            except Exception as e:
+                logging.debug(f"Unable to unschedule {folder['path']}: {e}")
+            del self._folders[entry["folder"]]
+            self._pending.pop(entry["folder"], None)
+        logging.debug(f"Stopped watching '{key}'")
+
+    def subscribe(self, key, callback):
+        """Registers callback(changes) for the folder watched under key."""
+        with self._lock:
+            entry = self._keys.get(key)
+            if entry and callback not in entry["subscribers"]:
+                entry["subscribers"].append(callback)
+
+    def unsubscribe(self, key, callback):
+        """Removes a callback registered with subscribe."""
+        with self._lock:
+            entry = self._keys.get(key)
+            if entry and callback in entry["subscribers"]:
+                entry["subscribers"].remove(callback)
+
+    def watched(self):
+        """Returns {key: directory} for every registered key."""
+        with self._lock:
+            return {key: self._folders[entry["folder"]]["path"]
+                    for key, entry in self._keys.items()}
+
+    def stop(self, timeout=10.0):
+        """Stops the observer threads. Safe to call more than once."""
+        if self.scheduled_update and not self._qt_mode:
+            try:
+                self.globals.root.after_cancel(self.scheduled_update)
+            except Exception:
+                pass
+            self.scheduled_update = None
+        if self._qt_mode:
+            self._debounce_timer.stop()
+
+        with self._lock:
+            observers = [o for o in (self._observer, self._polling_observer) if o]
+            self._observer = None
+            self._polling_observer = None
+            self._folders.clear()
+            self._keys.clear()
+            self._pending.clear()
+
+        for observer in observers:
+            if observer.is_alive():
+                observer.stop()
+                observer.join(timeout=timeout)
+
+    def _observer_for(self, directory, key):
+        """Returns the shared observer suited to directory, starting it if needed."""
+        if is_network_drive(self.globals, directory):
+            if self._polling_observer is None:
+                self._polling_observer = AdaptivePollingObserver()
+                self._polling_observer.start()
+            logging.info(
+                f"Using AdaptivePollingObserver for network drive: {directory} (key: {key})")
+            return self._polling_observer
+        if self._observer is None:
+            self._observer = Observer()
+            self._observer.start()
+        return self._observer
+
+    # ---- Event handling ----
+
     def on_any_event(self, event):
         """Ignores directories and irrelevant event types."""
         # Only proceed upon specific events
@@ -48,18 +484,35 @@ class FolderEventHandler(FileSystemEventHandler):
                                                           'moved']:
             return
 
+        dest_path = getattr(event, 'dest_path', None) or None
+
         # Only proceed if an event involves a pdf file
         if event.event_type == 'moved':
-            if not (event.src_path.lower().endswith('.pdf') or
-                    (event.dest_path and
-                     event.dest_path.lower().endswith('.pdf'))):
+            if not (_is_pdf(event.src_path) or _is_pdf(dest_path)):
                 return
-        elif not event.src_path.lower().endswith('.pdf'):
+        elif not _is_pdf(event.src_path):
+            return
+
+        # Drop the echo of our own metadata writes
+        if event.event_type == 'modified' and _is_own_write(event.src_path):
             return
 
-        current_time = time.time()
+        with self._lock:
+            src_folder = _folder_key(os.path.dirname(event.src_path))
+            if event.event_type == 'moved':
+                dest_folder = _folder_key(os.path.dirname(dest_path))
+                if src_folder == dest_folder:
+                    self._record(src_folder, 'moved', event.src_path, dest_path)
+                else:
+                    # Moves between watched folders split into a delete and a create
+                    if _is_pdf(event.src_path):
+                        self._record(src_folder, 'deleted', event.src_path)
+                    if _is_pdf(dest_path):
+                        self._record(dest_folder, 'created', dest_path)
+            else:
+                self._record(src_folder, event.event_type, event.src_path)
 
-        if PYSIDE6_AVAILABLE and hasattr(self.globals, 'legacy_mode') and not self.globals.legacy_mode:
+        if self._qt_mode:
             self._signaler.file_changed.emit()
         else:
             # Tkinter Mode: Cancel and reschedule
@@ -71,7 +524,11 @@ class FolderEventHandler(FileSystemEventHandler):
             self.scheduled_update = self.globals.root.after(
                 delay_ms, self._trigger_update)
 
-        self.last_event_time = current_time
+    def _record(self, folder, event_type, src_path, dest_path=None):
+        """Adds an event to a watched folder's pending ChangeSet."""
+        if folder not in self._folders:
+            return
+        self._pending.setdefault(folder, ChangeSet()).record(event_type, src_path, dest_path)
 
     def _on_file_changed_qt(self):
         """Runs in the MAIN thread when the signal is received. Handles debouncing."""
@@ -81,51 +538,63 @@ class FolderEventHandler(FileSystemEventHandler):
 
     def _trigger_update(self):
         self.scheduled_update = None
-        self.update_callback()
-        logging.debug(f"Watchdog: Folder change detected, updated counts.")
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            deliveries = []
+            for folder, changes in pending.items():
+                if not changes or folder not in self._folders:
+                    continue  # Everything cancelled out (ex: temp files)
+                for key in self._folders[folder]["keys"]:
+                    entry = self._keys[key]
+                    deliveries.append((key, changes, entry["callback"], list(entry["subscribers"])))
 
+        # Callbacks run outside the lock so they may watch/unwatch freely
+        for key, changes, callback, subscribers in deliveries:
+            if callback:
+                try:
+                    callback()
+                except Exception as e:
+                    logging.error(f"Watchdog callback for '{key}' failed: {e}")
+            for subscriber in subscribers:
+                try:
+                    subscriber(changes)
+                except Exception as e:
+                    logging.error(f"Watchdog subscriber for '{key}' failed: {e}")
+            logging.debug(f"Watchdog: '{key}' changed: {changes}")
 
-def is_network_drive(globals, path):
-    """
-    Check if a path is on a network drive (Windows only).
-    Returns False on Linux.
-    """
-    if not platform.system().startswith("Windows"):
-        return False
-    drive, _ = os.path.splitdrive(path)
-    if drive:
-        drive_type = ctypes.windll.kernel32.GetDriveTypeW(drive + '\\')
-        logging.debug(f"{path} is a network drive.")
-        globals.network_drive = True
-        return drive_type == 4  # DRIVE_REMOTE (network drive)
-    return False
 
+def _folder_key(path):
+    """Normalizes a folder path for routing events."""
+    return os.path.normcase(os.path.normpath(os.path.abspath(path)))
 
-def setup_observer(globals, direct, key, callback=None):
-    """Sets up watchdog observers."""
-    directory = direct
-    if not directory or not os.path.isdir(directory):
-        logging.warning(
-            f"Cannot setup observer for {key}: Invalid directory {directory}")
-        return None
-    if key in globals.observers and globals.observers[key] and globals.observers[key].is_alive():
-        globals.observers[key].stop()
-        globals.observers[key].join()
 
-    if callback is None:
-        if hasattr(globals, 'update_file_counts'):
+def get_watcher(globals):
+    """Returns the app's WatcherService, creating it on first use."""
+    if getattr(globals, 'watcher', None) is None:
+        globals.watcher = WatcherService(globals)
+    return globals.watcher
+
+
+def setup_observer(globals, direct, key, callback=None, on_changes=None):
+    """
+    Registers a folder with the shared watcher. Returns True on success.
+
+        callback:       Called with no arguments after each debounced burst
+        on_changes:     Called with the coalesced ChangeSet for the burst
+    """
+    if callback is None and on_changes is None:
+        if getattr(globals, 'update_file_counts', None):
             callback = globals.update_file_counts
         else:
             logging.warning("No callback provided and no globals.update_file_counts found.")
-            return None
-
-    handler = FolderEventHandler(globals, callback)
-    if is_network_drive(globals, directory):
-        observer = PollingObserver(timeout=1)
-        logging.info(
-            f"Using PollingObserver for network drive: {directory} (key: {key})")
-    else:
-        observer = Observer()
-    observer.schedule(handler, directory, recursive=False)
-    observer.start()
-    return observer
+            return False
+
+    return get_watcher(globals).watch(key, direct, callback=callback, on_changes=on_changes)
+
+
+def stop_observers(globals):
+    """Shuts down the shared watcher, if one was started."""
+    watcher = getattr(globals, 'watcher', None)
+    if watcher:
+        watcher.stop()
+        globals.watcher = None
@@ -16,6 +16,7 @@ def save_qt_settings(globals):
     new_beta = globals.beta_checkbox.isChecked()
     new_window_size = globals.window_checkbox.isChecked()
     new_printer = globals.printer_combo.currentText()
+    new_merge_print_jobs = globals.merge_print_checkbox.isChecked()
     new_legacy_mode = globals.legacy_checkbox.isChecked()
     new_logging_level = globals.logging_level_box.currentText().upper()
 
@@ -56,6 +57,7 @@ def save_qt_settings(globals):
     globals.beta = new_beta
     globals.dynamic_window_size = new_window_size
     globals.default_printer = new_printer
+    globals.merge_print_jobs = new_merge_print_jobs
     globals.legacy_mode = new_legacy_mode
     globals.logging_level = new_logging_level
     globals.inbox = new_inbox
@@ -68,6 +70,7 @@ def save_qt_settings(globals):
     current_settings["beta"] = new_beta
     current_settings["dynamic_window_size"] = new_window_size
     current_settings["default_printer"] = new_printer
+    current_settings["merge_print_jobs"] = new_merge_print_jobs
     current_settings["legacy_mode"] = new_legacy_mode
     current_settings["logging_level"] = new_logging_level
     current_settings["use_google"] = new_google
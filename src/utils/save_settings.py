@@ -7,9 +7,9 @@ from src.utils.load_settings import (load_settings,
                                  load_folder_map,
                                  load_data_path)
 from src.managers.history_manager import load_history
-from pypdf import PdfReader, PdfWriter
 from config import apply_theme
 from src.utils.toast import show_toast
+from src.managers.identity_store import IdentityStore
 
 
 def save_all_settings(globals, reject_toast=False, reject_metadata=False):
@@ -281,37 +281,19 @@ def save_folder_map(globals):
 
 
 def save_metadata(globals):
-    # Save file identities to PDF metadata
-    if hasattr(globals, "file_identity") and globals.file_identity:
-        inbox_dir = globals.sources.get("inbox", "")
-        if os.path.isdir(inbox_dir):
-            try:
-                saved_count = 0
-                for filename, identity_type in globals.file_identity.items():
-                    filepath = os.path.join(inbox_dir, filename)
-                    if not os.path.isfile(filepath):
-                        continue
-                    try:
-                        reader = PdfReader(filepath)
-                        writer = PdfWriter()
-                        for page in reader.pages:
-                            writer.add_page(page)
-                        if reader.metadata:
-                            writer.add_metadata(reader.metadata)
-                        writer.add_metadata({"/Identity": identity_type})
-                        with open(filepath, "wb") as f:
-                            writer.write(f)
-                        saved_count += 1
-                    except Exception as e:
-                        logging.warning(
-                            f"Could not save identity to {filename}: {e}")
-                logging.info(
-                    f"Saved identity metadata to {saved_count} PDF files.")
-            except ImportError:
-                logging.warning(
-                    "pypdf not available — skipping PDF metadata save.")
-            except Exception as e:
-                logging.error(f"Error saving PDF identities: {e}")
+    """
+    Writes file identities changed since the last flush to their PDFs.
+
+        Unchanged files aren't touched, so this is cheap to call before
+        anything that moves or reads the inbox files. Identities still
+        loading in the background aren't waited for; they can't be dirty
+        unless the user changed them, and then the user's value is written.
+    """
+    try:
+        if isinstance(getattr(globals, "file_identity", None), IdentityStore):
+            globals.file_identity.flush(globals.sources.get("inbox", ""))
+    except Exception as e:
+        logging.error(f"Error saving PDF identities: {e}")
 
 
 def configure_labels(globals):
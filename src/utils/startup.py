@@ -205,6 +205,11 @@ def setup_settings():
             changed = True
             logging.info(
                 f"Added missing or nonconforming 'default_printer' key to settings.json")
+        if "merge_print_jobs" not in data or not isinstance(data["merge_print_jobs"], bool):
+            data["merge_print_jobs"] = False
+            changed = True
+            logging.info(
+                f"Added missing or nonconforming 'merge_print_jobs' key to settings.json")
         if "github_check" not in data or not isinstance(data["github_check"], bool):
             data["github_check"] = False
             changed = True
@@ -230,6 +235,12 @@ def setup_settings():
             changed = True
             logging.info(
                 f"Added missing or nonconforming 'use_google' key to settings.json")
+        if "extraction_regions" not in data or not isinstance(data["extraction_regions"], list):
+            data["extraction_regions"] = [{"page": 1, "top": 0.0, "bottom": 0.33},
+                                          {"page": 1, "top": 0.85, "bottom": 1.0}]
+            changed = True
+            logging.info(
+                f"Added missing or nonconforming 'extraction_regions' key to settings.json")
 
         # Check to make sure paths are valid
         if not os.path.isfile(data["history_path"]) and data["history_path"]:
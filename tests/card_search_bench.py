@@ -0,0 +1,94 @@
+import os
+import re
+import sys
+import time
+import random
+
+# Run from anywhere: python tests/card_search_bench.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.managers.autoname.card_num_search import find_card_number, CARD_TRIGGERS
+
+RECEIPTS = [
+    "visa xxxxxxxxxxxx{n4}", "mastercard ending in {n4}", "c/c# ************{n4}",
+    "payment ccard {n4}", "visa chip xxxxxxxxxxxx{n4}", "card number: {n4}", "amex {n4}",
+    "card #### #### #### {n4}", "visa credit approved xxxxxxxxxxxx {n4}", "mc - {n4}",
+    "chip (visa) **** {n4}", "charged to account xxxxxxxxxxxxxxxx{n4}", "thank you",
+]
+FILLER = ["the", "and", "item", "description", "unit", "price", "tax", "subtotal", "total",
+          "customer", "service", "date", "page", "of", "net", "terms", "due", "upon", "receipt"]
+
+
+def make_receipt(rng, words):
+    """Builds a normalized, receipt-like text of about `words` tokens."""
+    def fill(match):
+        return "".join(rng.choice("0123456789") for _ in range(int(match.group(1))))
+
+    tokens = [rng.choice(FILLER) for _ in range(words)]
+    tokens.insert(rng.randrange(len(tokens) + 1), re.sub(r"\{n(\d+)\}", fill, rng.choice(RECEIPTS)))
+    return " ".join(tokens)
+
+
+def adversarial_texts(length):
+    """Long inputs that made the old `.*?` triggers rescan the rest of the text per keyword."""
+    return {
+        "Repeated keywords": ("visa payment credit charged " * length)[:length],
+        "Keywords, no spaces": ("visamastercard" * length)[:length],
+        "Keyword then filler": "visa " + "a" * length,
+        "Short masks": ("xxxx 12 " * length)[:length],
+        "Long mask run": "x" * length,
+    }
+
+
+def old_search(text):
+    """The previous search: re.search over the whole text with the unbounded triggers."""
+    for pattern in CARD_TRIGGERS:
+        match = re.search(pattern, text)
+        if match:
+            candidate = match.groups()[-1].strip().lower()
+            candidate = candidate.replace('o', '0').replace('l', '1').replace('i', '1')
+            if re.match(r'^\d{4}$', candidate):
+                return candidate.upper()
+    return None
+
+
+def timed(search, text):
+    start = time.perf_counter()
+    search(text)
+    return time.perf_counter() - start
+
+
+def card_search_bench():
+    """Checks windowed results on ordinary receipts, then times both searches on adversarial input."""
+    rng = random.Random(7)
+    corpus = [make_receipt(rng, rng.choice([10, 60, 300])) for _ in range(2000)]
+    for text in corpus:
+        find_card_number(text)  # Compile outside the timings
+
+    start = time.perf_counter()
+    expected = [old_search(text) for text in corpus]
+    old_time = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = [(find_card_number(text) or (None,))[0] for text in corpus]
+    new_time = time.perf_counter() - start
+    mismatches = [(text, want, got) for text, want, got in zip(corpus, expected, actual)
+                  if want != got]
+    print(f"Receipts: {len(corpus)} texts, {sum(1 for result in expected if result)} with a card")
+    print(f"  Old: {old_time * 1000:.1f} ms, windowed: {new_time * 1000:.1f} ms")
+    for text, want, got in mismatches[:5]:
+        print(f"Mismatch: {want} != {got}\n  {text[:200]}")
+    assert not mismatches
+
+    # Doubling the input should roughly double the windowed time, not quadruple it
+    for name in adversarial_texts(1):
+        old_times = [timed(old_search, adversarial_texts(n)[name]) for n in (2000, 4000, 8000)]
+        new_times = [timed(find_card_number, adversarial_texts(n)[name])
+                     for n in (2000, 4000, 8000, 64000, 128000)]
+        print(f"{name}:")
+        print("  Old      2k/4k/8k:        " + " / ".join(f"{t * 1000:.1f}" for t in old_times) + " ms")
+        print("  Windowed 2k/4k/8k/64k/128k: " + " / ".join(f"{t * 1000:.1f}" for t in new_times)
+              + " ms")
+        assert new_times[-1] < 4 * new_times[-2] + 0.01, f"{name} is not scaling linearly"
+    print("Card number search OK")
+
+
+card_search_bench()
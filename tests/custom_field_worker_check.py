@@ -0,0 +1,56 @@
+import os
+import sys
+import json
+import tempfile
+import importlib.util
+
+# Run from anywhere: python tests/custom_field_worker_check.py
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import src.managers.autoname.custom_search as custom_search
+from src.managers.autoname.search_helpers import as_masked, normalize_text
+
+APP_MODULES = ("config", "customtkinter", "PySide6.QtWidgets")
+
+
+def load_entry_point():
+    """Loads invoicebuddy.py the way a spawned worker does, as a module that isn't __main__."""
+    spec = importlib.util.spec_from_file_location("__mp_main__", os.path.join(ROOT, "invoicebuddy.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.__spec__ = None  # As for a script that is run, so children load it by path
+    return module
+
+
+def custom_field_worker_check():
+    """Starts the regex worker from the app entry point and runs a rule in it."""
+    entry_point = load_entry_point()
+    loaded = [name for name in APP_MODULES if name in sys.modules]
+    print(f"App modules loaded by the entry point: {loaded} (expected none)")
+    assert not loaded
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, custom_search.CUSTOM_FIELDS_FILENAME)
+        with open(path, "w") as f:
+            json.dump({"fields": [{"name": "Job Code", "timeout_ms": 5000,
+                                   "pattern": r"job code\s*[:#]?\s*(?P<value>[a-z]{2}-\d{3,5})"}]}, f)
+        custom_search._fields = custom_search.CustomFields(path)
+
+        # A spawned child runs whatever module is __main__ when it starts
+        main_module = sys.modules["__main__"]
+        sys.modules["__main__"] = entry_point
+        runner = custom_search.CustomFieldRunner()
+        try:
+            found = runner.search(as_masked(normalize_text("Invoice 1001 Job Code: AB-2207 Total 10.00")))
+        finally:
+            sys.modules["__main__"] = main_module
+            runner.close()
+
+    print(f"Found: { {name: hit.value for name, hit in found.items()} }")
+    assert not runner._failed, "the worker could not be started"
+    assert found["Job Code"].value == "AB-2207"
+    print("Custom field worker OK")
+
+
+if __name__ == "__main__":
+    custom_field_worker_check()
@@ -0,0 +1,96 @@
+import os
+import sys
+import time
+import tempfile
+
+# Run from anywhere: python tests/extraction_backend_bench.py [folder of PDFs]
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from src.managers.autoname.text_backends import (BACKENDS, open_document, usable_text,
+                                                 DOCUMENT_TEXT_LIMIT)
+
+# Page 1 is a cover sheet with too little text, page 2 is the invoice
+COVER_PAGES = ("Scanned cover",
+               "Invoice Number: INV-20931 Acme Corporation Date 03/14/2026 Total Due 1,234.56")
+
+
+def time_backend(backend, path):
+    """Returns (milliseconds, characters, usable) for reading path with one backend."""
+    start = time.perf_counter()
+    document = backend(path)
+    try:
+        text = document.text(DOCUMENT_TEXT_LIMIT)
+    finally:
+        document.discard()
+    return (time.perf_counter() - start) * 1000, len(text), usable_text(text)
+
+
+def write_pdf(path, pages):
+    """Writes a PDF with one line of Helvetica text on each page."""
+    fonts = 3 + 2 * len(pages)
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>",
+               "<< /Type /Pages /Kids [" + " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages)))
+               + f"] /Count {len(pages)} >>"]
+    for i, text in enumerate(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R "
+                       f"/Resources << /Font << /F1 {fonts} 0 R >> >> >>")
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    pdf, offsets = "%PDF-1.4\n", []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n{body}\nendobj\n"
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    pdf += "".join(f"{offset:010} 00000 n \n" for offset in offsets)
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    with open(path, "w", encoding="latin-1") as f:
+        f.write(pdf)
+
+
+def cover_page_check():
+    """A PDF whose page 1 isn't usable should still be read from its text layer, not OCR."""
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "cover_page.pdf")
+        write_pdf(path, COVER_PAGES)
+        document = open_document(path)
+        try:
+            text = document.text(DOCUMENT_TEXT_LIMIT)
+        finally:
+            document.discard()
+    print(f"Cover page PDF: picked {document.name}, {len(text)} chars")
+    assert document.name != "ocr", "a usable page 2 should keep the text layer backend"
+    assert "INV-20931" in text
+
+
+def extraction_backend_bench():
+    """Times every backend on each PDF and shows which one open_document picks."""
+    folder = sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT, "defaults")
+    paths = [os.path.join(folder, name) for name in sorted(os.listdir(folder))
+             if name.lower().endswith(".pdf")]
+    totals = {name: 0.0 for name in BACKENDS}
+
+    for path in paths:
+        print(os.path.basename(path))
+        for name, (backend, available) in BACKENDS.items():
+            if not available:
+                print(f"  {name:<11} not installed")
+                continue
+            try:
+                ms, chars, usable = time_backend(backend, path)
+            except Exception as e:
+                print(f"  {name:<11} failed: {e}")
+                continue
+            totals[name] += ms
+            print(f"  {name:<11} {ms:8.1f} ms  {chars:6} chars  {'usable' if usable else 'not usable'}")
+        document = open_document(path)
+        document.discard()
+        print(f"  Picked: {document.name} (probe {document.probe_seconds * 1000:.1f} ms)")
+
+    print("Totals: " + ", ".join(f"{name} {ms:.1f} ms" for name, ms in totals.items()))
+
+
+cover_page_check()
+extraction_backend_bench()
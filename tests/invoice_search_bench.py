@@ -0,0 +1,95 @@
+import os
+import re
+import sys
+import time
+import random
+
+# Run from anywhere: python tests/invoice_search_bench.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.managers.autoname.inv_num_search import (find_invoice_number, INVOICE_TRIGGERS,
+                                                  VALID_INVOICE)
+
+FRAGMENTS = [
+    "invoice # {n5}", "invoice no. {n6}", "inv {n4}", "invoice number: {a8}", "invoice: {n7}x",
+    "order # : {a10}", "order number {n9}", "order id {a6}", "order #{n5}", "order id: {hex24}",
+    "your order number is ab{n7}", "vs a{n8}", "sales slip # {n6}", "receipt # {n5}-{n4}",
+    "transaction id {n14}", "trans # {n10}", "txn {n16}", "invoice wa {n5} 01/02/2024 {n4}",
+    "order {n12}-{n2}", "id # {hex20}",
+    "{n2}/{n2}/{n4}", "{n2}-{n2}-{n2}", "call {n3}-{n3}-{n4}", "{n6}", "{n7} /{n2}", "{n8}-{n2}",
+    "total due ${n3}.{n2}", "qty {n1} @ {n2}.{n2}", "thank you for your business",
+    "amount paid", "balance", "ship to 123 main st", "account {n5} {n2}",
+]
+FILLER = ["the", "and", "payment", "item", "description", "unit", "price", "tax", "subtotal",
+          "customer", "service", "date", "page", "of", "net", "terms", "due", "upon", "receipt"]
+
+
+def make_text(rng, words):
+    """Builds a normalized, invoice-like text of about `words` tokens."""
+    def fill(match):
+        kind = match.group(1)
+        if kind.startswith("hex"):
+            return "".join(rng.choice("0123456789abcdef") for _ in range(int(kind[3:])))
+        if kind.startswith("a"):
+            return "".join(rng.choice("abcdefghjk0123456789") for _ in range(int(kind[1:])))
+        return "".join(rng.choice("0123456789") for _ in range(int(kind[1:])))
+
+    tokens = []
+    while len(tokens) < words:
+        if rng.random() < 0.15:
+            tokens.append(re.sub(r"\{(\w+)\}", fill, rng.choice(FRAGMENTS)))
+        else:
+            tokens.append(rng.choice(FILLER))
+    return " ".join(tokens)
+
+
+def sequential_search(text):
+    """The original search: each trigger in turn, first match only."""
+    for priority, pattern in enumerate(INVOICE_TRIGGERS):
+        match = re.search(pattern, text)
+        if match:
+            candidate = match.group(1).strip().upper()
+            if VALID_INVOICE.match(candidate):
+                return (candidate, match.group(0), priority)
+    return None
+
+
+def time_both(corpus):
+    """Returns (sequential results, scanner results, sequential seconds, scanner seconds)."""
+    start = time.perf_counter()
+    expected = [sequential_search(text) for text in corpus]
+    sequential_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [find_invoice_number(text) for text in corpus]
+    scanner_time = time.perf_counter() - start
+    return expected, actual, sequential_time, scanner_time
+
+
+def invoice_search_bench():
+    """Checks the scanner against the sequential search on a random corpus and times both."""
+    rng = random.Random(42)
+    corpus = [make_text(rng, rng.choice([5, 20, 80, 300, 900])) for _ in range(3000)]
+    # Long texts with no triggers make every sequential pattern scan to the end
+    no_triggers = [" ".join(rng.choice(FILLER) for _ in range(900)) for _ in range(50)]
+
+    # Compile outside the timings
+    for text in corpus + no_triggers:
+        find_invoice_number(text)
+
+    mismatches = []
+    for name, texts in (("Mixed corpus", corpus), ("No triggers", no_triggers)):
+        expected, actual, sequential_time, scanner_time = time_both(texts)
+        mismatches += [(text, want, got) for text, want, got in zip(texts, expected, actual)
+                       if want != got]
+        found = sum(1 for result in expected if result)
+        print(f"{name}: {len(texts)} texts, {found} with an invoice number")
+        print(f"  Sequential: {sequential_time * 1000:.1f} ms, scanner: {scanner_time * 1000:.1f} ms "
+              f"({sequential_time / scanner_time:.2f}x)")
+
+    for text, want, got in mismatches[:5]:
+        print(f"Mismatch: {want} != {got}\n  {text[:200]}")
+    assert not mismatches
+    print("Invoice number search OK")
+
+
+invoice_search_bench()
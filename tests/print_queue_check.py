@@ -0,0 +1,116 @@
+import os
+import sys
+import stat
+import tempfile
+
+# Run from anywhere: python tests/print_queue_check.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.managers.print_queue import PrintQueue, COMPLETED
+from pypdf import PdfWriter
+
+FAKE_LP = """#!{python}
+import json, os, sys
+state = os.path.join(os.path.dirname(__file__), "jobs.json")
+jobs = json.load(open(state)) if os.path.exists(state) else {{}}
+args = sys.argv[1:]
+printer = args[args.index("-d") + 1] if "-d" in args else "default"
+files = [a for i, a in enumerate(args) if a != "-d" and (i == 0 or args[i - 1] != "-d")]
+if printer == "offline":
+    print("lp: The printer or class does not exist.", file=sys.stderr)
+    sys.exit(1)
+job_id = f"{{printer}}-{{len(jobs) + 1}}"
+jobs[job_id] = 2  # Listed by lpstat twice before it completes
+json.dump(jobs, open(state, "w"))
+with open(os.path.join(os.path.dirname(__file__), "lp.log"), "a") as log:
+    log.write(" ".join(files) + "\\n")
+print(f"request id is {{job_id}} ({{len(files)}} file(s))")
+"""
+
+FAKE_LPSTAT = """#!{python}
+import json, os
+state = os.path.join(os.path.dirname(__file__), "jobs.json")
+jobs = json.load(open(state)) if os.path.exists(state) else {{}}
+for job_id, remaining in list(jobs.items()):
+    if remaining <= 0:
+        continue
+    print(f"{{job_id}}  user  1024  Mon 01 Jan 2026 09:00:00 AM")
+    jobs[job_id] = remaining - 1
+json.dump(jobs, open(state, "w"))
+"""
+
+
+def install_fakes(bin_dir):
+    """Writes fake lp and lpstat scripts and puts them first on PATH."""
+    for name, source in (("lp", FAKE_LP), ("lpstat", FAKE_LPSTAT)):
+        path = os.path.join(bin_dir, name)
+        with open(path, "w") as f:
+            f.write(source.format(python=sys.executable))
+        os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    os.environ["PATH"] = bin_dir + os.pathsep + os.environ["PATH"]
+
+
+def print_queue_check():
+    """Prints 120 files through fake CUPS tools and checks batching and tracking."""
+    with tempfile.TemporaryDirectory() as bin_dir, tempfile.TemporaryDirectory() as inbox:
+        install_fakes(bin_dir)
+        files = []
+        for i in range(120):
+            path = os.path.join(inbox, f"receipt {i:03}.pdf")
+            open(path, "wb").close()
+            files.append(path)
+
+        updates = []
+        print_queue = PrintQueue(on_update=lambda job: updates.append((job.job_id, job.state)),
+                                 batch_size=50, poll_interval=0.05)
+        jobs = print_queue.submit(files, "office")
+        failed = print_queue.submit(files[:1], "offline")
+        print_queue.wait(10)
+
+        with open(os.path.join(bin_dir, "lp.log")) as log:
+            calls = log.read().splitlines()
+        print(f"Accepted lp calls: {len(calls)} (expected 3)")
+        for job in print_queue.jobs:
+            print(job.describe())
+        print(f"Updates: {updates}")
+
+        assert len(calls) == 3
+        assert [len(job.files) for job in jobs] == [50, 50, 20]
+        assert all(job.state == COMPLETED for job in jobs)
+        assert failed[0].state == "failed"
+        print("Print queue OK")
+
+
+def merged_print_check():
+    """Merges 30 three-page PDFs under a 40 page limit and checks the split."""
+    with tempfile.TemporaryDirectory() as bin_dir, tempfile.TemporaryDirectory() as inbox:
+        install_fakes(bin_dir)
+        files = []
+        for i in range(30):
+            writer = PdfWriter()
+            for _ in range(3):
+                writer.add_blank_page(612, 792)
+            path = os.path.join(inbox, f"statement {i:02}.pdf")
+            with open(path, "wb") as f:
+                writer.write(f)
+            files.append(path)
+        broken = os.path.join(inbox, "broken.pdf")
+        with open(broken, "wb") as f:
+            f.write(b"not a pdf")
+
+        print_queue = PrintQueue(poll_interval=0.05, merge_max_pages=40)
+        print_queue.submit(files + [broken], "office", merge=True)
+        print_queue.wait(30)
+
+        for job in print_queue.jobs:
+            print(job.describe())
+        jobs = print_queue.jobs
+        # 13 files of 3 pages fit under 40 pages
+        assert [len(job.sources) for job in jobs] == [13, 13, 4]
+        assert all(job.state == COMPLETED for job in jobs)
+        assert "Skipped 1" in jobs[0].message
+        assert not any(os.path.exists(job.files[0]) for job in jobs)
+        print("Merged printing OK")
+
+
+print_queue_check()
+merged_print_check()